@@ -0,0 +1,18 @@
+-- Column statistics gathered while profiling an upload, one row per field of
+-- app_mgmt.sys_config_table_field_info. top_values is a JSON list of
+-- [value, count] pairs and histogram a JSON list of equi-depth bucket bounds.
+CREATE TABLE IF NOT EXISTS app_mgmt.sys_config_table_field_stats (
+    src_nm VARCHAR(255) NOT NULL,
+    src_table_nm VARCHAR(255) NOT NULL,
+    field_nm VARCHAR(255) NOT NULL,
+    field_posn_nbr INTEGER NOT NULL,
+    row_cnt BIGINT,
+    null_ratio NUMERIC(5,4),
+    distinct_cnt BIGINT,
+    min_val TEXT,
+    max_val TEXT,
+    top_values JSONB,
+    histogram JSONB,
+    profiled_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (src_nm, src_table_nm, field_posn_nbr)
+);
@@ -0,0 +1,4 @@
+-- Average run length of equal consecutive values in file order, used to
+-- pick RUNLENGTH column encodings in the generated Redshift DDL.
+ALTER TABLE app_mgmt.sys_config_table_field_stats
+    ADD COLUMN IF NOT EXISTS avg_run_len NUMERIC(12,2);
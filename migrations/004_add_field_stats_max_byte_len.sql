@@ -0,0 +1,4 @@
+-- Longest value in UTF-8 bytes, used to size VARCHAR columns in the
+-- generated Redshift DDL (Redshift VARCHAR lengths count bytes).
+ALTER TABLE app_mgmt.sys_config_table_field_stats
+    ADD COLUMN IF NOT EXISTS max_byte_len INTEGER;
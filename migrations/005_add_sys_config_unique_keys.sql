@@ -0,0 +1,12 @@
+-- Unique indexes on the columns that identify each sys_config row. The
+-- default "on_conflict" sys_config sync (INSERT ... ON CONFLICT DO UPDATE)
+-- needs them; unlike MERGE it runs on PostgreSQL before 15. Rows that
+-- duplicate a key must be removed before this migration can run.
+CREATE UNIQUE INDEX IF NOT EXISTS ux_sys_config_dataset_info_key
+    ON app_mgmt.sys_config_dataset_info (src_nm, dataset_nm);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_sys_config_pre_proc_info_key
+    ON app_mgmt.sys_config_pre_proc_info (src_nm, dataset_nm);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_sys_config_table_info_key
+    ON app_mgmt.sys_config_table_info (src_nm, dataset_nm, src_table_nm);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_sys_config_table_field_info_key
+    ON app_mgmt.sys_config_table_field_info (src_nm, src_table_nm, field_nm);
@@ -0,0 +1,261 @@
+"""
+Layered streaming decompression for Data Onboarding Framework.
+
+Uploads such as .csv.gz, .tar.gz or ZIPs of gzipped CSVs are walked as a
+tree of streams: compression layers (.gz, .bz2, .zst) are unwrapped on the
+fly and containers (.tar, .zip) are iterated member by member, recursively,
+so supported tables are read straight from the decompressed stream without
+extracting anything to disk. ArchiveLimits caps the total decompressed
+bytes, the number of members and the nesting depth to guard against
+decompression bombs.
+"""
+import bz2
+import gzip
+import io
+import logging
+import os
+import tarfile
+import zipfile
+
+from modules.config import config
+
+logger = logging.getLogger(__name__)
+
+PROFILING_CONFIG = config.get('profiling', {})
+ARCHIVE_MAX_BYTES = int(PROFILING_CONFIG.get('archive_max_mb', 10240) * 1024 * 1024)
+ARCHIVE_MAX_MEMBERS = PROFILING_CONFIG.get('archive_max_members', 1000)
+ARCHIVE_MAX_DEPTH = PROFILING_CONFIG.get('archive_max_depth', 4)
+
+COMPRESSION_EXTENSIONS = [".gz", ".bz2", ".zst"]
+CONTAINER_EXTENSIONS = [".tar", ".zip"]
+# Shorthand suffixes and the layers they stand for.
+COMPOUND_EXTENSIONS = {".tgz": ".tar.gz", ".tbz2": ".tar.bz2", ".tzst": ".tar.zst"}
+ARCHIVE_EXTENSIONS = COMPRESSION_EXTENSIONS + CONTAINER_EXTENSIONS + list(COMPOUND_EXTENSIONS)
+
+READ_CHUNK_BYTES = 1024 * 1024
+# Bytes of a forward-only stream kept so readers can seek back to its start.
+# Measuring a table without a recorded size reads one byte past the stream
+# threshold before rewinding, and the CSV sniff prefix fits in the extra chunk.
+REPLAY_BYTES = int(PROFILING_CONFIG.get('stream_threshold_mb', 256) * 1024 * 1024) + READ_CHUNK_BYTES
+
+
+class ArchiveLimitError(ValueError):
+    """Raised when an archive exceeds the decompressed size, member or depth caps."""
+
+
+class ArchiveLimits:
+    """Budget shared by every layer of one upload."""
+
+    def __init__(self, max_bytes=ARCHIVE_MAX_BYTES, max_members=ARCHIVE_MAX_MEMBERS,
+                 max_depth=ARCHIVE_MAX_DEPTH):
+        self.max_bytes = max_bytes
+        self.max_members = max_members
+        self.max_depth = max_depth
+        self.bytes_read = 0
+        self.members = 0
+
+    def consume(self, size):
+        self.bytes_read += size
+        if self.bytes_read > self.max_bytes:
+            raise ArchiveLimitError(
+                f"Archive expands beyond {self.max_bytes} bytes; refusing to decompress further"
+            )
+
+    def add_member(self, name):
+        self.members += 1
+        if self.members > self.max_members:
+            raise ArchiveLimitError(f"Archive has more than {self.max_members} members at {name}")
+
+    def check_depth(self, depth, name):
+        if depth > self.max_depth:
+            raise ArchiveLimitError(f"Archive nesting deeper than {self.max_depth} at {name}")
+
+
+class _CountingReader(io.RawIOBase):
+    """Read-only stream that charges every decompressed byte to ArchiveLimits."""
+
+    def __init__(self, raw, limits):
+        self.raw = raw
+        self.limits = limits
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.raw.read(len(buffer))
+        self.limits.consume(len(data))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+class ReplayReader(io.RawIOBase):
+    """
+    Seekable view of a forward-only stream. Everything read is kept until
+    max_buffer bytes, so a sniffer or header probe can seek back to the start.
+    """
+
+    def __init__(self, raw, max_buffer=None):
+        self.raw = raw
+        self.max_buffer = REPLAY_BYTES if max_buffer is None else max_buffer
+        self._buffer = bytearray()
+        self._position = 0
+        self._recording = True
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence != os.SEEK_SET:
+            raise io.UnsupportedOperation("ReplayReader cannot seek from the end")
+        if offset == self._position:
+            return offset
+        if not self._recording or offset > len(self._buffer):
+            raise io.UnsupportedOperation("Position is outside the replay buffer")
+        self._position = offset
+        return offset
+
+    def readinto(self, buffer):
+        size = len(buffer)
+        data = bytes(self._buffer[self._position:self._position + size])
+        if len(data) < size:
+            fresh = self.raw.read(size - len(data))
+            if self._recording:
+                if len(self._buffer) + len(fresh) <= self.max_buffer:
+                    self._buffer.extend(fresh)
+                else:
+                    self._recording = False
+                    self._buffer = bytearray()
+            data += fresh
+        self._position += len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def split_layers(name):
+    """
+    Split a file name into (inner name, outer layer extension), e.g.
+    "a.csv.gz" -> ("a.csv", ".gz") and "a.tgz" -> ("a.tar", ".gz").
+    The layer is None when the name is not compressed or a container.
+    """
+    stem, ext = os.path.splitext(name)
+    ext = ext.lower()
+    if ext in COMPOUND_EXTENSIONS:
+        inner, outer = os.path.splitext(COMPOUND_EXTENSIONS[ext])
+        return stem + inner, outer
+    if ext in COMPRESSION_EXTENSIONS or ext in CONTAINER_EXTENSIONS:
+        return stem, ext
+    return name, None
+
+
+def is_archive(name):
+    return split_layers(name)[1] is not None
+
+
+def strip_compression(name):
+    """Name inside any compression layers ("a.csv.gz" -> "a.csv", "a.tgz" -> "a.tar")."""
+    while True:
+        inner, layer = split_layers(name)
+        if layer not in COMPRESSION_EXTENSIONS:
+            return name
+        name = inner
+
+
+def _decompress(stream, layer):
+    if layer == ".gz":
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if layer == ".bz2":
+        return bz2.BZ2File(stream, mode="rb")
+    # zstandard is only needed for .zst uploads.
+    import zstandard
+    return zstandard.ZstdDecompressor().stream_reader(stream, closefd=False)
+
+
+def _seekable(stream):
+    try:
+        return stream.seekable()
+    except AttributeError:
+        # Members of a streamed tar wrap an object without seekable().
+        return False
+
+
+def buffer_stream(stream):
+    """Read a stream into memory (needed for formats that seek, e.g. xlsx or Parquet)."""
+    buf = io.BytesIO()
+    for block in iter(lambda: stream.read(READ_CHUNK_BYTES), b""):
+        buf.write(block)
+    buf.seek(0)
+    return buf
+
+
+def walk(stream, name, is_table, limits=None, depth=0, size=None):
+    """
+    Yield (path, stream, size) for every member whose name satisfies is_table,
+    unwrapping compression layers and recursing into containers. size is
+    the uncompressed size when known (pass it for stream itself), otherwise
+    None. Paths of nested members are joined with "/". Each yielded stream
+    must be consumed before the generator is advanced.
+    """
+    limits = limits or ArchiveLimits()
+    limits.check_depth(depth, name)
+    inner, layer = split_layers(name)
+    if layer in COMPRESSION_EXTENSIONS:
+        decompressed = io.BufferedReader(
+            _CountingReader(_decompress(stream, layer), limits), READ_CHUNK_BYTES
+        )
+        if is_archive(inner):
+            yield from walk(decompressed, inner, is_table, limits, depth + 1)
+        elif is_table(inner):
+            limits.add_member(inner)
+            yield inner, ReplayReader(decompressed), None
+    elif layer == ".tar":
+        with tarfile.open(fileobj=stream, mode="r|") as archive:
+            for member in archive:
+                if member.isfile():
+                    yield from _walk_member(
+                        archive.extractfile(member), member.name, member.size,
+                        is_table, limits, depth
+                    )
+    elif layer == ".zip":
+        if not _seekable(stream):
+            # The ZIP directory sits at the end of the file.
+            stream = buffer_stream(stream)
+        with zipfile.ZipFile(stream) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if info.file_size > limits.max_bytes - limits.bytes_read:
+                    raise ArchiveLimitError(
+                        f"{info.filename} expands to {info.file_size} bytes, over the archive cap"
+                    )
+                with archive.open(info) as member:
+                    counted = io.BufferedReader(_CountingReader(member, limits), READ_CHUNK_BYTES)
+                    yield from _walk_member(
+                        counted, info.filename, info.file_size, is_table, limits, depth
+                    )
+    elif is_table(name):
+        limits.add_member(name)
+        yield name, ReplayReader(stream), size
+
+
+def _walk_member(stream, path, size, is_table, limits, depth):
+    if is_archive(path):
+        # A compressed table keeps its own (uncompressed) path; tables inside
+        # a nested container are listed under the container's path.
+        container = is_archive(strip_compression(path))
+        for inner_path, inner, inner_size in walk(stream, path, is_table, limits, depth + 1):
+            yield (f"{path}/{inner_path}" if container else inner_path), inner, inner_size
+    elif is_table(path):
+        limits.add_member(path)
+        yield path, ReplayReader(stream), size
@@ -5,6 +5,7 @@ import bcrypt
 import uuid
 from botocore.exceptions import ClientError
 from .config import get_config
+from .credentials import secret_cache
 
 class AuthManager:
     def __init__(self, secret_name):
@@ -14,24 +15,33 @@ class AuthManager:
     def _load_users_from_secret(self):
         """Load users from AWS Secrets Manager"""
         try:
-            session = boto3.session.Session()
-            client = session.client(service_name='secretsmanager')
-            response = client.get_secret_value(SecretId=self.secret_name)
-            secret_data = json.loads(response['SecretString'])
+            # Cached, so every new session doesn't call Secrets Manager
+            secret_data = secret_cache.get(self.secret_name)
             return secret_data.get('users', [])
         except ClientError as e:
             if e.response['Error']['Code'] == 'ResourceNotFoundException':
                 # Create new secret if it doesn't exist
+                session = boto3.session.Session()
+                client = session.client(service_name='secretsmanager')
                 empty_users = {'users': []}
                 client.create_secret(
                     Name=self.secret_name,
                     SecretString=json.dumps(empty_users)
                 )
+                secret_cache.put(self.secret_name, None, empty_users)
                 return []
             else:
                 st.error(f"Error accessing secret: {str(e)}")
                 return []
     
+    def _reload_users(self):
+        """
+        Re-read users right before a write so changes made by other sessions
+        since the cached copy was loaded aren't overwritten. Errors propagate,
+        so a failed read never saves an empty user list.
+        """
+        self.users = secret_cache.get(self.secret_name, refresh=True).get('users', [])
+
     def _save_users_to_secret(self):
         """Save users back to AWS Secrets Manager"""
         session = boto3.session.Session()
@@ -41,6 +51,7 @@ class AuthManager:
             SecretId=self.secret_name,
             SecretString=json.dumps(secret_data)
         )
+        secret_cache.put(self.secret_name, None, secret_data)
     
     def hash_password(self, password):
         """Generate bcrypt hash from password"""
@@ -52,6 +63,7 @@ class AuthManager:
     
     def add_user(self, username, email, password, role):
         """Add a new user"""
+        self._reload_users()
         # Check if username already exists
         if any(user['username'] == username for user in self.users):
             return False, "Username already exists"
@@ -68,6 +80,7 @@ class AuthManager:
     
     def update_user(self, username, email=None, password=None, role=None):
         """Update an existing user"""
+        self._reload_users()
         for user in self.users:
             if user['username'] == username:
                 if email:
@@ -82,6 +95,7 @@ class AuthManager:
     
     def remove_user(self, username):
         """Remove a user"""
+        self._reload_users()
         initial_count = len(self.users)
         self.users = [user for user in self.users if user['username'] != username]
         if len(self.users) < initial_count:
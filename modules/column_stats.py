@@ -0,0 +1,367 @@
+"""
+Column statistics gathered in the profiling pass.
+
+Alongside type, length and uniqueness, every column can keep its min and
+max (compared as numbers or datetimes while the type lattice still allows
+it, otherwise as text), whether those numbers or datetimes never decrease
+in file order, the average run length of repeated values, its most
+frequent values (Misra-Gries summary) and a
+uniform sample from which equi-depth histogram bounds are read. Every
+piece is mergeable, so chunked, parallel and incremental profiles give the
+same statistics as a single pass.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from modules.config import config
+from modules.type_inference import DATE, DECIMAL, INTEGER, TIMESTAMP
+
+PROFILING_CONFIG = config.get('profiling', {})
+COLUMN_STATS = PROFILING_CONFIG.get('column_stats', True)
+STATS_TOP_K = PROFILING_CONFIG.get('stats_top_k', 10)
+STATS_HISTOGRAM_BUCKETS = PROFILING_CONFIG.get('stats_histogram_buckets', 10)
+STATS_SAMPLE_SIZE = PROFILING_CONFIG.get('stats_sample_size', 1024)
+
+STATS_COLUMNS = [
+    "null_ratio", "min_val", "max_val", "top_values", "histogram", "monotonic", "avg_run_length"
+]
+
+# Counters kept per column; a multiple of top-k keeps the reported counts tight.
+_COUNTERS_PER_K = 10
+
+
+class FrequentItems:
+    """
+    Misra-Gries frequent-items summary. Counts are lower bounds that are
+    off by at most `error`, which grows by at most n / (capacity + 1).
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.error = 0
+
+    def _reduce(self):
+        if len(self.counts) <= self.capacity:
+            return
+        cut = sorted(self.counts.values(), reverse=True)[self.capacity]
+        self.error += cut
+        self.counts = {value: count - cut for value, count in self.counts.items() if count > cut}
+
+    def add_counts(self, values, counts):
+        for value, count in zip(values, counts):
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        self._reduce()
+
+    def merge(self, other):
+        self.error += other.error
+        self.add_counts(other.counts.keys(), other.counts.values())
+        return self
+
+    def top(self, k):
+        """The k most frequent values seen more than once, as [value, count] pairs."""
+        items = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return [[value, count] for value, count in items[:k] if count > 1]
+
+
+class UniformSample:
+    """
+    Fixed-size uniform sample of a column: every value gets a random
+    priority and the lowest priorities are kept, so two samples merge by
+    keeping the lowest priorities of their union.
+    """
+
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.values = []
+        self.priorities = np.empty(0)
+        self._rng = np.random.default_rng(seed)
+
+    def _keep(self, values, priorities):
+        if len(priorities) > self.size:
+            keep = np.argpartition(priorities, self.size)[:self.size]
+            values = [values[idx] for idx in keep]
+            priorities = priorities[keep]
+        self.values, self.priorities = values, priorities
+
+    def add(self, values):
+        priorities = self._rng.random(len(values))
+        if len(priorities) > self.size:
+            keep = np.argpartition(priorities, self.size)[:self.size]
+            values, priorities = values.take(keep).to_pylist(), priorities[keep]
+        else:
+            values = values.to_pylist()
+        self._keep(self.values + values, np.concatenate([self.priorities, priorities]))
+
+    def merge(self, other):
+        self._keep(self.values + other.values, np.concatenate([self.priorities, other.priorities]))
+        return self
+
+
+def _parse_numbers(text):
+    try:
+        return pc.cast(text, pa.float64())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+
+
+def _parse_datetimes(text, datetime_format):
+    try:
+        return pc.strptime(text, format=datetime_format, unit="us", error_is_null=True)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        parsed = pd.to_datetime(
+            pd.Series(text, dtype=pd.ArrowDtype(text.type)), format=datetime_format,
+            errors="coerce"
+        )
+        return pa.array(parsed, from_pandas=True)
+
+
+def _arg_extremes(keys, text):
+    """Return (min text, min key, max text, max key) from aligned parsed keys and texts."""
+    if keys is None or keys.null_count == len(keys):
+        return None
+    extremes = pc.min_max(keys)
+    low, high = extremes["min"], extremes["max"]
+    low_idx = pc.index(keys, low).as_py()
+    high_idx = pc.index(keys, high).as_py()
+    return text[low_idx].as_py(), low.as_py(), text[high_idx].as_py(), high.as_py()
+
+
+class ColumnStats:
+    """Min/max, frequent values and a histogram sample for one column."""
+
+    def __init__(self, top_k=STATS_TOP_K, sample_size=STATS_SAMPLE_SIZE):
+        self.top_k = top_k
+        self.text_range = None
+        self.numeric_range = None
+        self.datetime_range = None
+        # Order of the numeric or datetime values in file order: ascending
+        # stays None until a value is seen and turns False for good on the
+        # first decrease (or once the values stop parsing).
+        self.ascending = None
+        self.order_kind = None
+        self.first_key = None
+        self.last_key = None
+        # Runs of equal consecutive non-null values, and the values at both
+        # ends so runs that span chunks are counted once.
+        self.count = 0
+        self.runs = 0
+        self.first_value = None
+        self.last_value = None
+        # Whether some chunk held a value more than once; for a column
+        # folded in as one chunk, False means its values are distinct.
+        self.repeats = False
+        self.frequent = FrequentItems(max(top_k * _COUNTERS_PER_K, 100))
+        self.sample = UniformSample(sample_size)
+
+    @staticmethod
+    def _widen(current, found):
+        """Widen a (min text, min key, max text, max key) range with another one."""
+        if found is None:
+            return current
+        if current is None:
+            return found
+        low = found[:2] if found[1] < current[1] else current[:2]
+        high = found[2:] if found[3] > current[3] else current[2:]
+        return low + high
+
+    def _track_order(self, keys, kind):
+        """Fold one chunk of parsed keys (None when the values do not parse) into the order state."""
+        if self.ascending is False:
+            return
+        if keys is None or keys.null_count or self.order_kind not in (None, kind):
+            self.ascending = False
+            return
+        ordered = keys.to_numpy(zero_copy_only=False)
+        if (self.last_key is not None and keys[0].as_py() < self.last_key) \
+                or (ordered[1:] < ordered[:-1]).any():
+            self.ascending = False
+            return
+        if self.first_key is None:
+            self.first_key = keys[0].as_py()
+        self.last_key = keys[-1].as_py()
+        self.order_kind = kind
+        self.ascending = True
+
+    def _track_runs(self, text):
+        changes = pc.sum(pc.not_equal(text[1:], text[:-1])).as_py() or 0
+        first, last = text[0].as_py(), text[-1].as_py()
+        self.runs += changes + (first != self.last_value or self.count == 0)
+        if self.count == 0:
+            self.first_value = first
+        self.count += len(text)
+        self.last_value = last
+
+    def update(self, values, type_state):
+        """
+        Fold in one chunk of non-null values (a Series or an Arrow string
+        array). type_state is the column's TypeState after observing the
+        chunk; numbers and datetimes are only parsed while it still allows them.
+        """
+        if isinstance(values, pa.Array):
+            text = values.cast(pa.large_string())
+        else:
+            text = pa.array(values, type=pa.large_string(), from_pandas=True)
+        if len(text) == 0:
+            return
+        extremes = pc.min_max(text)
+        low, high = extremes["min"].as_py(), extremes["max"].as_py()
+        self.text_range = self._widen(self.text_range, (low, low, high, high))
+        keys, kind = None, None
+        if type_state.candidates & (INTEGER | DECIMAL):
+            keys, kind = _parse_numbers(text), "numeric"
+            self.numeric_range = self._widen(self.numeric_range, _arg_extremes(keys, text))
+        else:
+            self.numeric_range = None
+        if type_state.candidates & (DATE | TIMESTAMP) and type_state.datetime_format:
+            keys, kind = _parse_datetimes(text, type_state.datetime_format), "datetime"
+            self.datetime_range = self._widen(self.datetime_range, _arg_extremes(keys, text))
+        else:
+            self.datetime_range = None
+        self._track_order(keys, kind)
+        self._track_runs(text)
+        counts = pc.value_counts(text)
+        frequencies = counts.field("counts").to_numpy()
+        self.repeats = self.repeats or bool(frequencies.max() > 1)
+        if len(frequencies) > self.frequent.capacity:
+            # Only the heaviest values can survive the summary's reduction;
+            # the counts dropped here widen its error like a reduction would.
+            order = np.argpartition(-frequencies, self.frequent.capacity)
+            self.frequent.error += int(frequencies[order[self.frequent.capacity]])
+            order = order[:self.frequent.capacity]
+        else:
+            order = np.arange(len(frequencies))
+        self.frequent.add_counts(
+            counts.field("values").take(order).to_pylist(), frequencies[order]
+        )
+        self.sample.add(text)
+
+    def merge(self, other):
+        self.text_range = self._widen(self.text_range, other.text_range)
+        # A range only survives when both sides could still track it.
+        for name in ("numeric_range", "datetime_range"):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            merged = self._widen(mine, theirs) if mine is not None and theirs is not None else None
+            setattr(self, name, merged)
+        # other holds the rows that come after this side's rows.
+        if other.ascending is not None:
+            if self.ascending is None:
+                self.ascending, self.order_kind = other.ascending, other.order_kind
+                self.first_key = other.first_key
+            else:
+                self.ascending = bool(
+                    self.ascending and other.ascending and self.order_kind == other.order_kind
+                    and other.first_key >= self.last_key
+                )
+            self.last_key = other.last_key
+        if other.count:
+            joined = self.count and self.last_value == other.first_value
+            self.runs += other.runs - bool(joined)
+            if not self.count:
+                self.first_value = other.first_value
+            self.count += other.count
+            self.last_value = other.last_value
+        self.repeats = self.repeats or other.repeats
+        self.frequent.merge(other.frequent)
+        self.sample.merge(other.sample)
+        return self
+
+    @property
+    def monotonic(self):
+        """True when the numeric or datetime values never decrease and are not all equal."""
+        return bool(self.ascending) and self.first_key != self.last_key
+
+    @property
+    def distinct_count(self):
+        """Exact number of distinct values while the frequent-items summary holds them all, else None."""
+        return len(self.frequent.counts) if self.frequent.error == 0 else None
+
+    @property
+    def avg_run_length(self):
+        """Average number of consecutive equal values, or None before any value."""
+        return round(self.count / self.runs, 2) if self.runs else None
+
+    def _ordering(self, datatype, datetime_format):
+        """The min/max range and the sample sort keys matching the final datatype."""
+        sample = pd.Series(self.sample.values, dtype=object)
+        if datatype.startswith("NUMBER") and self.numeric_range is not None:
+            return self.numeric_range, sample, pd.to_numeric(sample, errors="coerce")
+        if datatype in ("DATE", "TIMESTAMP_NTZ") and self.datetime_range is not None:
+            keys = pd.to_datetime(sample, format=datetime_format, errors="coerce")
+            return self.datetime_range, sample, keys
+        return self.text_range, sample, sample
+
+    def summary(self, datatype, datetime_format=None, buckets=STATS_HISTOGRAM_BUCKETS):
+        """
+        Render min_val, max_val, top_values and histogram for the final
+        datatype. The histogram is a JSON list of equi-depth bucket bounds.
+        """
+        value_range, sample, keys = self._ordering(datatype, datetime_format)
+        if value_range is None:
+            return {
+                "min_val": None, "max_val": None, "top_values": "[]", "histogram": "[]",
+                "monotonic": False, "avg_run_length": None,
+            }
+        ordered = sample[np.argsort(keys.to_numpy(), kind="stable")].tolist()
+        bounds = []
+        if ordered:
+            positions = np.linspace(0, len(ordered) - 1, buckets + 1).round().astype(int)
+            bounds = [ordered[pos] for pos in positions]
+        return {
+            "min_val": value_range[0],
+            "max_val": value_range[2],
+            "top_values": json.dumps(self.frequent.top(self.top_k)),
+            "histogram": json.dumps(bounds),
+            "monotonic": self.monotonic,
+            "avg_run_length": self.avg_run_length,
+        }
+
+    def to_state(self):
+        return {
+            "top_k": self.top_k,
+            "text_range": _plain(self.text_range),
+            "numeric_range": _plain(self.numeric_range),
+            "datetime_range": _plain(self.datetime_range),
+            "order": [self.ascending, self.order_kind, self.first_key, self.last_key],
+            "runs": [self.count, self.runs, self.first_value, self.last_value],
+            "repeats": self.repeats,
+            "frequent": [self.frequent.capacity, self.frequent.counts, self.frequent.error],
+            "sample": [self.sample.size, self.sample.values, self.sample.priorities.tolist()],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        stats = cls(state["top_k"], state["sample"][0])
+        stats.text_range = _tuple(state["text_range"])
+        stats.numeric_range = _tuple(state["numeric_range"])
+        stats.datetime_range = _tuple(state["datetime_range"], pd.Timestamp)
+        stats.ascending, stats.order_kind, stats.first_key, stats.last_key = state["order"]
+        stats.count, stats.runs, stats.first_value, stats.last_value = state["runs"]
+        stats.repeats = state.get("repeats", True)
+        stats.frequent.capacity, stats.frequent.counts, stats.frequent.error = state["frequent"]
+        stats.sample.values = list(state["sample"][1])
+        stats.sample.priorities = np.array(state["sample"][2], dtype=float)
+        return stats
+
+
+def _plain(value_range):
+    if value_range is None:
+        return None
+    low_text, low, high_text, high = value_range
+    convert = (lambda key: key.isoformat()) if hasattr(low, "isoformat") else (
+        lambda key: key.item() if hasattr(key, "item") else key
+    )
+    return [low_text, convert(low), high_text, convert(high)]
+
+
+def _tuple(value_range, convert=None):
+    if value_range is None:
+        return None
+    low_text, low, high_text, high = value_range
+    if convert is not None:
+        low, high = convert(low), convert(high)
+    return (low_text, low, high_text, high)
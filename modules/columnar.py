@@ -0,0 +1,302 @@
+"""
+Parquet, ORC and Avro readers for Data Onboarding Framework.
+
+Field names and types come from the file footer (Parquet, ORC) or header
+(Avro), so a schema-only profile never touches the data pages. The data is
+only read when profiling.columnar_profile is "full", to measure lengths and
+find keys; the declared types still win over types inferred from the text.
+"""
+import json
+import logging
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.orc as orc
+import pyarrow.parquet as pq
+
+from modules.config import config
+from modules.logging_setup import log_function
+from modules.profiler import HLL_PRECISION, PROFILE_COLUMNS, profile_chunks
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_EXTENSIONS = [".parquet", ".orc", ".avro"]
+
+PROFILING_CONFIG = config.get('profiling', {})
+# "schema" reads only the footer/header; "full" also reads the data to
+# measure lengths and detect keys.
+COLUMNAR_PROFILE = PROFILING_CONFIG.get('columnar_profile', 'schema')
+STREAM_CHUNK_ROWS = PROFILING_CONFIG.get('stream_chunk_rows', 100000)
+
+AVRO_MAGIC = b"Obj\x01"
+AVRO_SYNC_BYTES = 16
+
+# Decimal digits needed for the largest value of each integer width.
+INTEGER_DIGITS = {8: 3, 16: 5, 32: 10, 64: 19}
+MAX_PRECISION = 38
+
+AVRO_TYPES = {
+    "boolean": "BOOLEAN",
+    "int": "NUMBER(10,0)",
+    "long": "NUMBER(19,0)",
+    "float": "FLOAT",
+    "double": "FLOAT",
+    "bytes": "BINARY",
+    "fixed": "BINARY",
+    "string": "VARCHAR",
+    "enum": "VARCHAR",
+    "null": "VARCHAR",
+    "record": "VARIANT",
+    "array": "VARIANT",
+    "map": "VARIANT",
+}
+AVRO_LOGICAL_TYPES = {
+    "date": "DATE",
+    "time-millis": "TIME",
+    "time-micros": "TIME",
+    "timestamp-millis": "TIMESTAMP_TZ",
+    "timestamp-micros": "TIMESTAMP_TZ",
+    "local-timestamp-millis": "TIMESTAMP_NTZ",
+    "local-timestamp-micros": "TIMESTAMP_NTZ",
+    "uuid": "VARCHAR(36)",
+}
+
+
+def arrow_snowflake_type(arrow_type):
+    """Map an Arrow type to a Snowflake type; strings stay unsized."""
+    if pa.types.is_dictionary(arrow_type):
+        return arrow_snowflake_type(arrow_type.value_type)
+    if pa.types.is_boolean(arrow_type):
+        return "BOOLEAN"
+    if pa.types.is_integer(arrow_type):
+        digits = INTEGER_DIGITS[arrow_type.bit_width]
+        if pa.types.is_unsigned_integer(arrow_type) and arrow_type.bit_width == 64:
+            digits += 1
+        return f"NUMBER({digits},0)"
+    if pa.types.is_floating(arrow_type):
+        return "FLOAT"
+    if pa.types.is_decimal(arrow_type):
+        if arrow_type.precision > MAX_PRECISION:
+            return "VARCHAR"
+        return f"NUMBER({arrow_type.precision},{arrow_type.scale})"
+    if pa.types.is_date(arrow_type):
+        return "DATE"
+    if pa.types.is_timestamp(arrow_type):
+        return "TIMESTAMP_TZ" if arrow_type.tz else "TIMESTAMP_NTZ"
+    if pa.types.is_time(arrow_type):
+        return "TIME"
+    if pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type) \
+            or pa.types.is_fixed_size_binary(arrow_type):
+        return "BINARY"
+    if pa.types.is_nested(arrow_type):
+        return "VARIANT"
+    return "VARCHAR"
+
+
+def avro_snowflake_type(avro_type):
+    """Map an Avro schema type (name, dict or union list) to a Snowflake type."""
+    if isinstance(avro_type, list):
+        # Nullable fields are unions with "null"; other unions become VARIANT.
+        branches = [branch for branch in avro_type if branch != "null"]
+        return avro_snowflake_type(branches[0]) if len(branches) == 1 else "VARIANT"
+    if isinstance(avro_type, dict):
+        logical = avro_type.get("logicalType")
+        if logical == "decimal" and avro_type.get("precision", 0) <= MAX_PRECISION:
+            return f"NUMBER({avro_type['precision']},{avro_type.get('scale', 0)})"
+        if logical in AVRO_LOGICAL_TYPES:
+            return AVRO_LOGICAL_TYPES[logical]
+        return avro_snowflake_type(avro_type["type"])
+    return AVRO_TYPES.get(avro_type, "VARCHAR")
+
+
+def _read_long(file):
+    """Read one zigzag-encoded variable-length Avro long."""
+    shift = 0
+    value = 0
+    while True:
+        byte = file.read(1)
+        if not byte:
+            raise EOFError("Unexpected end of Avro file")
+        value |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return (value >> 1) ^ -(value & 1)
+        shift += 7
+
+
+def _read_bytes(file):
+    return file.read(_read_long(file))
+
+
+def avro_schema(file):
+    """Read the writer schema from an Avro object container file header."""
+    if file.read(len(AVRO_MAGIC)) != AVRO_MAGIC:
+        raise ValueError("Not an Avro object container file")
+    metadata = {}
+    while True:
+        count = _read_long(file)
+        if count == 0:
+            break
+        if count < 0:
+            count = -count
+            _read_long(file)  # byte size of the block
+        for _ in range(count):
+            key = _read_bytes(file).decode("utf-8")
+            metadata[key] = _read_bytes(file)
+    file.read(AVRO_SYNC_BYTES)
+    return json.loads(metadata["avro.schema"])
+
+
+def avro_row_count(file):
+    """Count Avro records from the data block headers, seeking past the data."""
+    rows = 0
+    while True:
+        try:
+            count = _read_long(file)
+        except EOFError:
+            return rows
+        size = _read_long(file)
+        file.seek(size + AVRO_SYNC_BYTES, os.SEEK_CUR)
+        rows += count
+
+
+def _schema_profile(fields, row_count, null_counts=None):
+    """Build a PROFILE_COLUMNS frame from (name, type) pairs without reading data."""
+    names = [name.strip() for name, _ in fields]
+    return pd.DataFrame({
+        "field_nm": names,
+        "row_count": row_count,
+        "null_count": null_counts if null_counts is not None else 0,
+        "max_length": 0,
+        "max_bytes": 0,
+        "datatype_nm": [datatype for _, datatype in fields],
+        "distinct_count": pd.NA,
+        "is_unique": False,
+    }, columns=PROFILE_COLUMNS)
+
+
+def _parquet_null_counts(metadata):
+    """Sum the null counts in every row group's column statistics, if all have them."""
+    counts = []
+    for col in range(metadata.num_columns):
+        total = 0
+        for group in range(metadata.num_row_groups):
+            stats = metadata.row_group(group).column(col).statistics
+            if stats is None or not stats.has_null_count:
+                return None
+            total += stats.null_count
+        counts.append(total)
+    return counts
+
+
+def _declared_types(file, ext):
+    """Return ([(name, snowflake type)], row_count, null_counts) from the schema alone."""
+    file.seek(0)
+    if ext == ".parquet":
+        parquet = pq.ParquetFile(file)
+        schema = parquet.schema_arrow
+        fields = [(field.name, arrow_snowflake_type(field.type)) for field in schema]
+        metadata = parquet.metadata
+        null_counts = _parquet_null_counts(metadata)
+        # Statistics are per leaf column, so they only line up with flat schemas.
+        if null_counts is not None and len(null_counts) != len(fields):
+            null_counts = None
+        return fields, metadata.num_rows, null_counts
+    if ext == ".orc":
+        orc_file = orc.ORCFile(file)
+        fields = [(field.name, arrow_snowflake_type(field.type)) for field in orc_file.schema]
+        return fields, orc_file.nrows, None
+    schema = avro_schema(file)
+    fields = [(field["name"], avro_snowflake_type(field["type"])) for field in schema["fields"]]
+    return fields, avro_row_count(file), None
+
+
+def _text_column(column):
+    """Render an Arrow column as strings so the profiler can measure it."""
+    try:
+        return pc.cast(column, pa.string())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return pa.array([
+            None if value is None else json.dumps(value, default=str)
+            for value in column.to_pylist()
+        ], type=pa.string())
+
+
+def _text_frame(table):
+    """Convert an Arrow table or record batch into a frame of string columns."""
+    return pd.DataFrame({
+        name: pd.Series(_text_column(column), dtype=pd.StringDtype("pyarrow"))
+        for name, column in zip(table.column_names, table.columns)
+    })
+
+
+def _avro_tables(file, chunk_rows):
+    # fastavro is only needed once the Avro data pages are read.
+    import fastavro
+    file.seek(0)
+    records = []
+    for record in fastavro.reader(file):
+        records.append(record)
+        if len(records) >= chunk_rows:
+            yield pa.Table.from_pylist(records)
+            records = []
+    if records:
+        yield pa.Table.from_pylist(records)
+
+
+def _data_tables(file, ext, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield the file's data as Arrow tables or batches of about chunk_rows rows."""
+    file.seek(0)
+    if ext == ".parquet":
+        yield from pq.ParquetFile(file).iter_batches(batch_size=chunk_rows)
+    elif ext == ".orc":
+        orc_file = orc.ORCFile(file)
+        for stripe in range(orc_file.nstripes):
+            yield orc_file.read_stripe(stripe)
+    else:
+        yield from _avro_tables(file, chunk_rows)
+
+
+def apply_declared_types(profile, fields):
+    """
+    Replace inferred types with the declared ones. Unsized VARCHAR columns
+    are sized from the measured max length.
+    """
+    declared = dict((name.strip(), datatype) for name, datatype in fields)
+    profile = profile.copy()
+    profile["datatype_nm"] = [
+        f"VARCHAR({max(int(length), 1)})"
+        if declared.get(name, "VARCHAR") == "VARCHAR" else declared[name]
+        for name, length in zip(profile["field_nm"], profile["max_length"])
+    ]
+    return profile
+
+
+@log_function
+def profile_columnar(file, ext, streamed, profile_mode=None):
+    """
+    Profile a Parquet, ORC or Avro upload.
+    Returns (profile, key_columns). In "schema" mode only the footer or
+    header is read; in "full" mode the data is profiled in memory (or in
+    chunks when streamed) and the declared types are kept.
+    """
+    from modules.metadata import detect_key, profile_table
+    fields, row_count, null_counts = _declared_types(file, ext)
+    if (profile_mode or COLUMNAR_PROFILE) != "full":
+        logger.info(f"Schema-only profile of {len(fields)} columns, {row_count} rows")
+        return _schema_profile(fields, row_count, null_counts), ()
+    if streamed:
+        profile = profile_chunks(
+            (_text_frame(table) for table in _data_tables(file, ext)),
+            PROFILING_CONFIG.get('hll_precision', HLL_PRECISION)
+        )
+        profile["field_nm"] = profile["field_nm"].astype(str).str.strip()
+        key_columns = detect_key(None, profile)
+    else:
+        tables = list(_data_tables(file, ext))
+        if not tables:
+            return _schema_profile(fields, 0), ()
+        df = pd.concat([_text_frame(table) for table in tables], ignore_index=True)
+        profile, key_columns = profile_table(df)
+    return apply_declared_types(profile, fields), key_columns
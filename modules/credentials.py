@@ -0,0 +1,133 @@
+"""
+Cached AWS Secrets Manager lookups for Data Onboarding Framework.
+
+Secrets are cached per (secret name, region) for secrets_cache.ttl_seconds,
+so connections and logins stop paying a Secrets Manager round trip each.
+Concurrent lookups of a stale or missing secret share one fetch
+(single-flight) instead of stampeding the API. connect_with_secret retries
+a database connection once with a freshly fetched secret when the cached
+password is rejected, which keeps RDS secret rotation working.
+"""
+import copy
+import json
+import logging
+import threading
+import time
+
+import boto3
+import psycopg2
+
+from modules.config import config
+
+logger = logging.getLogger(__name__)
+
+SECRETS_CONFIG = config.get('secrets_cache', {})
+SECRET_TTL = SECRETS_CONFIG.get('ttl_seconds', 900)
+# A forced refresh reuses a secret fetched less than this many seconds ago,
+# so a burst of failed logins after a rotation costs a single fetch.
+SECRET_MIN_REFRESH = SECRETS_CONFIG.get('min_refresh_seconds', 5)
+
+# PostgreSQL SQLSTATEs for rejected credentials.
+AUTH_FAILURE_CODES = {"28P01", "28000"}
+
+
+def fetch_secret(secret_name, region_name=None):
+    """Fetch and decode a JSON secret from Secrets Manager."""
+    session = boto3.session.Session()
+    client = session.client(service_name="secretsmanager", region_name=region_name)
+    response = client.get_secret_value(SecretId=secret_name)
+    return json.loads(response["SecretString"])
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SecretCache:
+    """Thread-safe TTL cache of decoded secrets with single-flight refresh."""
+
+    def __init__(self, fetch=fetch_secret, ttl=SECRET_TTL, min_refresh=SECRET_MIN_REFRESH):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self._entries = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get(self, secret_name, region_name=None, refresh=False):
+        """
+        The decoded secret, fetched when missing or older than the TTL.
+        refresh=True also fetches a cached secret unless it is brand new.
+        Callers get their own copy and may modify it.
+        """
+        key = (secret_name, region_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = time.monotonic() - fetched_at
+                if age < (self.min_refresh if refresh else self.ttl):
+                    return copy.deepcopy(value)
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.value)
+        try:
+            logger.debug(f"Fetching secret {secret_name} from Secrets Manager")
+            flight.value = self.fetch(secret_name, region_name)
+            with self._lock:
+                self._entries[key] = (flight.value, time.monotonic())
+            return copy.deepcopy(flight.value)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def put(self, secret_name, region_name, value):
+        """Cache a value just written to Secrets Manager."""
+        with self._lock:
+            self._entries[(secret_name, region_name)] = (copy.deepcopy(value), time.monotonic())
+
+    def invalidate(self, secret_name, region_name=None):
+        with self._lock:
+            self._entries.pop((secret_name, region_name), None)
+
+
+def is_auth_failure(error):
+    """True when a PostgreSQL error means the credentials were rejected."""
+    if not isinstance(error, psycopg2.OperationalError):
+        return False
+    return (
+        getattr(error, "pgcode", None) in AUTH_FAILURE_CODES
+        or "password authentication failed" in str(error)
+    )
+
+
+def connect_with_secret(secret_name, region_name, connect, cache=None):
+    """
+    Call connect(secret) with the cached secret. If the credentials are
+    rejected (e.g. after a rotation), refresh the secret once and retry.
+    """
+    cache = cache or secret_cache
+    try:
+        return connect(cache.get(secret_name, region_name))
+    except Exception as e:
+        if not is_auth_failure(e):
+            raise
+        logger.warning(f"Credentials from {secret_name} were rejected; refreshing the secret")
+    return connect(cache.get(secret_name, region_name, refresh=True))
+
+
+# Process-wide cache shared by every Streamlit session.
+secret_cache = SecretCache()
@@ -1,5 +1,3 @@
-import boto3
-import json
 import psycopg2
 import psycopg2.extras
 import uuid
@@ -9,35 +7,36 @@ import pandas as pd
 from .storage import S3Helper
 # Add config import
 from .config import get_config
+from .credentials import connect_with_secret, secret_cache
+from .db_pool import shared_pool
 
 # Database connection functions
-def get_secret(secret_name, region_name="us-east-1"):
-    """Retrieve database credentials from AWS Secrets Manager"""
-    session = boto3.session.Session()
-    client = session.client(service_name='secretsmanager', region_name=region_name)
-    response = client.get_secret_value(SecretId=secret_name)
-    return json.loads(response['SecretString'])
+def get_secret(secret_name, region_name="us-east-1", refresh=False):
+    """Retrieve database credentials from AWS Secrets Manager (cached, see modules.credentials)"""
+    return secret_cache.get(secret_name, region_name, refresh=refresh)
 
 def get_postgres_connection():
-    """Create and return a PostgreSQL connection"""
+    """Check out a PostgreSQL connection from the shared pool; close() returns it"""
     # Use config module instead of direct file load
     config = get_config()
     
     db_config = config['database']
     
-    # Get credentials from Secrets Manager
-    secret = get_secret(db_config['secret_name'], db_config['region'])
+    def connect_as(secret):
+        return psycopg2.connect(
+            host=db_config['host'],
+            dbname=db_config['dbname'],
+            user=secret['username'],
+            password=secret['password'],
+            port=db_config['port']
+        )
     
-    # Create connection
-    conn = psycopg2.connect(
-        host=db_config['host'],
-        dbname=db_config['dbname'],
-        user=secret['username'],
-        password=secret['password'],
-        port=db_config['port']
-    )
+    def connect():
+        # Credentials come from the Secrets Manager cache, refreshed on rejection
+        return connect_with_secret(db_config['secret_name'], db_config['region'], connect_as)
     
-    return conn
+    pool = shared_pool((db_config['host'], db_config['port'], db_config['dbname']), connect)
+    return pool.checkout()
 
 # SQL Requests Management
 def initialize_sql_requests_table():
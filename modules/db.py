@@ -1,10 +1,12 @@
-import json
+import io
 import logging
-import boto3
 import psycopg2
+from psycopg2.extras import execute_values
 import pandas as pd
 from botocore.exceptions import ClientError
 from modules.config import config
+from modules.credentials import connect_with_secret, secret_cache
+from modules.db_pool import PooledConnection, shared_pool
 from modules.logging_setup import log_function
 
 logger = logging.getLogger(__name__)
@@ -19,16 +21,14 @@ PORT = DB_CONFIG.get('port')
 
 
 @log_function
-def get_db_credentials() -> dict:
+def get_db_credentials(refresh: bool = False) -> dict:
     """
-    Retrieve database credentials from AWS Secrets Manager.
+    Retrieve database credentials from AWS Secrets Manager, through the
+    shared TTL cache (see modules.credentials).
     """
     logger.debug(f"Fetching DB credentials from Secrets Manager: {SECRET_NAME}")
-    session = boto3.session.Session()
-    client = session.client(service_name="secretsmanager", region_name=REGION_NAME)
     try:
-        secret_value = client.get_secret_value(SecretId=SECRET_NAME)
-        secret_dict = json.loads(secret_value["SecretString"])
+        secret_dict = secret_cache.get(SECRET_NAME, REGION_NAME, refresh=refresh)
         logger.info("Database credentials retrieved successfully.")
         return secret_dict
     except ClientError as e:
@@ -36,21 +36,32 @@ def get_db_credentials() -> dict:
         raise Exception(f"Error fetching secrets: {e}")
 
 
-@log_function
-def check_db_connection() -> psycopg2.extensions.connection:
-    """
-    Establish and return a new database connection.
-    """
-    creds = get_db_credentials()
-    try:
-        conn = psycopg2.connect(
+def _connect() -> psycopg2.extensions.connection:
+    def connect(creds):
+        return psycopg2.connect(
             user=creds.get("username"),
             password=creds.get("password"),
             host=HOST,
             dbname=DBNAME,
             port=PORT
         )
-        logger.debug("Database connection established.")
+
+    try:
+        return connect_with_secret(SECRET_NAME, REGION_NAME, connect)
+    except ClientError as e:
+        logger.error(f"Error fetching secrets: {e}")
+        raise Exception(f"Error fetching secrets: {e}")
+
+
+@log_function
+def check_db_connection() -> PooledConnection:
+    """
+    Check out a connection from the shared pool (see modules.db_pool);
+    close() returns it to the pool.
+    """
+    try:
+        conn = shared_pool((HOST, PORT, DBNAME), _connect).checkout()
+        logger.debug("Database connection checked out.")
         return conn
     except Exception as e:
         logger.error(f"Failed to connect to database: {e}")
@@ -96,44 +107,143 @@ def insert_statements_into_postgres(sql_script: str) -> bool:
         conn.close()
 
 
+# How load_dataframes writes rows: "copy" (COPY FROM STDIN) or "values"
+# (multi-row INSERTs through execute_values).
+LOAD_METHOD = DB_CONFIG.get('load_method', 'copy')
+LOAD_PAGE_SIZE = DB_CONFIG.get('load_page_size', 1000)
+_COPY_NULL = "\\N"
+
+
+def copy_dataframe(cur, table_name: str, df: pd.DataFrame) -> None:
+    """Stream df into table_name with COPY FROM STDIN (CSV, NULL as \\N)."""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep=_COPY_NULL)
+    buffer.seek(0)
+    cur.copy_expert(
+        f"COPY {table_name} ({', '.join(df.columns)}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{_COPY_NULL}')",
+        buffer
+    )
+
+
+def insert_dataframe(cur, table_name: str, df: pd.DataFrame, page_size: int = LOAD_PAGE_SIZE) -> None:
+    """Insert df into table_name with parameterised multi-row INSERTs."""
+    rows = [
+        tuple(None if pd.isna(v) else (v.item() if hasattr(v, "item") else v) for v in row)
+        for row in df.itertuples(index=False, name=None)
+    ]
+    execute_values(
+        cur, f"INSERT INTO {table_name} ({', '.join(df.columns)}) VALUES %s", rows,
+        page_size=page_size
+    )
+
+
 @log_function
-def check_existence(src_nm: str, dataset_nm: str, src_table_nm: str) -> bool:
+def load_dataframes(steps, method: str = None) -> int:
     """
-    Check if configuration entries already exist in the database.
-    Returns True if any records found.
+    Write sys_config rows directly in one transaction. steps are run in
+    order: SQL strings as they are, (table_name, df) pairs loaded with COPY
+    or execute_values (method, load_method by default). Everything is
+    rolled back on error. Returns the number of rows loaded.
     """
+    method = method or LOAD_METHOD
+    if method not in ("copy", "values"):
+        raise ValueError(f"Unknown load method: {method}")
     conn = check_db_connection()
+    loaded = 0
     try:
         with conn.cursor() as cur:
-            queries = [
-                (
-                    "SELECT 1 FROM app_mgmt.sys_config_dataset_info WHERE src_nm = %s AND dataset_nm = %s",
-                    (src_nm, dataset_nm),
-                ),
-                (
-                    "SELECT 1 FROM app_mgmt.sys_config_table_info WHERE src_nm = %s AND dataset_nm = %s",
-                    (src_nm, dataset_nm),
-                ),
-                (
-                    "SELECT 1 FROM app_mgmt.sys_config_table_field_info WHERE src_nm = %s AND src_table_nm = %s",
-                    (src_nm, src_table_nm),
-                ),
-                (
-                    "SELECT 1 FROM app_mgmt.sys_config_pre_proc_info WHERE src_nm = %s AND dataset_nm = %s",
-                    (src_nm, dataset_nm),
-                ),
-            ]
-            for q, params in queries:
-                cur.execute(q, params)
-                if cur.fetchone():
-                    logger.info(
-                        f"Configuration exists for src={src_nm}, dataset={dataset_nm}, "
-                        f"table={src_table_nm}"
-                    )
-                    return True
-            return False
+            for step in steps:
+                if isinstance(step, str):
+                    cur.execute(step)
+                    continue
+                table_name, df = step
+                if df.empty:
+                    continue
+                if method == "copy":
+                    copy_dataframe(cur, table_name, df)
+                else:
+                    insert_dataframe(cur, table_name, df)
+                loaded += len(df)
+        conn.commit()
+        logger.info(f"Loaded {loaded} rows in {len(steps)} steps with {method}.")
+        return loaded
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Error loading data: {e}")
+        raise Exception(f"Error loading data: {e}")
+    finally:
+        conn.close()
+
+
+# Config tables checked by check_existence_many, with the key columns each is
+# matched on (the batch keys are src_nm, dataset_nm, src_table_nm).
+EXISTENCE_CHECKS = {
+    "dataset_info": ("app_mgmt.sys_config_dataset_info", ["src_nm", "dataset_nm"]),
+    "table_info": ("app_mgmt.sys_config_table_info", ["src_nm", "dataset_nm", "src_table_nm"]),
+    "field_info": ("app_mgmt.sys_config_table_field_info", ["src_nm", "src_table_nm"]),
+    "pre_proc_info": ("app_mgmt.sys_config_pre_proc_info", ["src_nm", "dataset_nm"]),
+}
+EXISTENCE_KEYS = ["src_nm", "dataset_nm", "src_table_nm"]
+
+
+def existence_query() -> str:
+    """
+    One SELECT answering, for every (src_nm, dataset_nm, src_table_nm) in
+    its VALUES list (the %s placeholder), which config tables have rows.
+    """
+    checks = ",\n".join(
+        f"    EXISTS (SELECT 1 FROM {table} t WHERE "
+        + " AND ".join(f"t.{col} = k.{col}" for col in columns)
+        + f") AS {name}"
+        for name, (table, columns) in EXISTENCE_CHECKS.items()
+    )
+    return (
+        f"SELECT {', '.join(f'k.{col}' for col in EXISTENCE_KEYS)},\n{checks}\n"
+        f"FROM (VALUES %s) AS k ({', '.join(EXISTENCE_KEYS)})"
+    )
+
+
+@log_function
+def check_existence_many(keys) -> pd.DataFrame:
+    """
+    Check which configuration entries already exist for many tables in a
+    single round trip. keys is a list of (src_nm, dataset_nm, src_table_nm)
+    tuples. Returns one row per distinct key with a boolean column per
+    EXISTENCE_CHECKS entry and "exists" when any of them is present.
+    """
+    keys = list(dict.fromkeys(tuple(str(part) for part in key) for key in keys))
+    columns = EXISTENCE_KEYS + list(EXISTENCE_CHECKS) + ["exists"]
+    if not keys:
+        return pd.DataFrame(columns=columns)
+    conn = check_db_connection()
+    try:
+        with conn.cursor() as cur:
+            # One page, so the whole VALUES list goes in one statement.
+            rows = execute_values(cur, existence_query(), keys, page_size=len(keys), fetch=True)
+        result = pd.DataFrame(rows, columns=columns[:-1])
+        result["exists"] = result[list(EXISTENCE_CHECKS)].any(axis=1)
+        logger.info(
+            f"Existence checked for {len(keys)} tables: {int(result['exists'].sum())} configured"
+        )
+        return result
     except Exception as e:
         logger.error(f"Error checking existence: {e}")
         raise Exception(f"Error checking existence: {e}")
     finally:
         conn.close()
+
+
+@log_function
+def check_existence(src_nm: str, dataset_nm: str, src_table_nm: str) -> bool:
+    """
+    Check if configuration entries already exist in the database.
+    Returns True if any records found.
+    """
+    exists = bool(check_existence_many([(src_nm, dataset_nm, src_table_nm)])["exists"].any())
+    if exists:
+        logger.info(
+            f"Configuration exists for src={src_nm}, dataset={dataset_nm}, "
+            f"table={src_table_nm}"
+        )
+    return exists
@@ -0,0 +1,292 @@
+"""
+Process-wide PostgreSQL connection pool for Data Onboarding Framework.
+
+Every Streamlit session and rerun shares the pools kept here, one per
+database (host, port, dbname), instead of paying a fresh TLS handshake per
+query. Connections are health-checked on checkout once they have been idle
+for a while, recycled after sitting idle too long or reaching their maximum
+age, and rolled back when returned mid-transaction. metrics() reports the
+pool's saturation and how long checkouts waited for a free connection.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from modules.config import config
+
+logger = logging.getLogger(__name__)
+
+DB_CONFIG = config.get('database', {})
+POOL_MIN = DB_CONFIG.get('pool_min', 1)
+POOL_MAX = DB_CONFIG.get('pool_max', 10)
+# Seconds a checkout waits for a free connection before giving up.
+POOL_TIMEOUT = DB_CONFIG.get('pool_timeout', 30)
+# Idle connections above pool_min are closed after this many seconds.
+POOL_MAX_IDLE = DB_CONFIG.get('pool_max_idle', 300)
+# Connections are replaced after this many seconds, whatever their use.
+POOL_MAX_LIFETIME = DB_CONFIG.get('pool_max_lifetime', 3600)
+# Connections idle for at least this many seconds run SELECT 1 on checkout.
+POOL_CHECK_AFTER = DB_CONFIG.get('pool_check_after', 30)
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool timeout."""
+
+
+class PooledConnection:
+    """
+    A checked-out connection. It behaves like the psycopg2 connection it
+    wraps, except that close() hands it back to the pool.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise AttributeError(f"connection already returned to the pool: {name}")
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        # Settings such as autocommit belong to the wrapped connection.
+        if name in ("_pool", "_conn"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+
+    @property
+    def closed(self):
+        return 1 if self._conn is None else self._conn.closed
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+
+class ConnectionPool:
+    """Thread-safe pool of connections made by connect()."""
+
+    def __init__(
+        self, connect, minconn=POOL_MIN, maxconn=POOL_MAX, timeout=POOL_TIMEOUT,
+        max_idle=POOL_MAX_IDLE, max_lifetime=POOL_MAX_LIFETIME, check_after=POOL_CHECK_AFTER
+    ):
+        self.connect = connect
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        # Idle connections as (conn, opened_at, returned_at), most recent last.
+        self._idle = deque()
+        self._opened_at = {}
+        self._size = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._stats = dict.fromkeys([
+            "checkouts", "waited_checkouts", "timeouts", "opened", "discarded",
+            "failed_health_checks"
+        ], 0)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _expired_idle(self, now):
+        """Pop the idle connections past max_idle (keeping minconn open) or max_lifetime."""
+        expired = []
+        for entry in list(self._idle):
+            conn, opened_at, returned_at = entry
+            too_old = now - opened_at >= self.max_lifetime
+            too_idle = now - returned_at >= self.max_idle and self._size - len(expired) > self.minconn
+            if too_old or too_idle:
+                self._idle.remove(entry)
+                expired.append(conn)
+        self._size -= len(expired)
+        self._stats["discarded"] += len(expired)
+        return expired
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Ignoring error closing pooled connection: {e}")
+
+    @staticmethod
+    def _healthy(conn):
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Discarding unhealthy pooled connection: {e}")
+            return False
+
+    def _discard(self, conn):
+        self._close(conn)
+        with self._cond:
+            self._opened_at.pop(id(conn), None)
+            self._size -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+
+    def getconn(self):
+        """Check out a raw connection; give it back with putconn."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            conn = None
+            expired = []
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    expired += self._expired_idle(now)
+                    if self._idle:
+                        conn, opened_at, returned_at = self._idle.pop()
+                        break
+                    if self._size < self.maxconn:
+                        self._size += 1
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        logger.warning(f"Connection pool exhausted: {self._metrics()}")
+                        raise PoolTimeout(
+                            f"No database connection free within {self.timeout}s "
+                            f"({self.maxconn} in use)"
+                        )
+                    waited = True
+                    self._waiting += 1
+                    self._cond.wait(remaining)
+                    self._waiting -= 1
+            for stale in expired:
+                self._close(stale)
+            if conn is None:
+                try:
+                    conn = self.connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._opened_at[id(conn)] = time.monotonic()
+                    self._stats["opened"] += 1
+            elif conn.closed or (now - returned_at >= self.check_after and not self._healthy(conn)):
+                with self._cond:
+                    self._stats["failed_health_checks"] += 1
+                self._discard(conn)
+                continue
+            else:
+                with self._cond:
+                    self._opened_at[id(conn)] = opened_at
+            break
+        wait = time.monotonic() - start
+        with self._cond:
+            self._stats["checkouts"] += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            if waited:
+                self._stats["waited_checkouts"] += 1
+        if waited:
+            logger.info(f"Waited {wait * 1000:.0f} ms for a pooled database connection")
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a connection; broken, expired or discarded ones are closed."""
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        now = time.monotonic()
+        with self._cond:
+            opened_at = self._opened_at.pop(id(conn), now)
+            if not (discard or conn.closed or now - opened_at >= self.max_lifetime):
+                self._idle.append((conn, opened_at, now))
+                self._cond.notify()
+                return
+            self._opened_at[id(conn)] = opened_at
+        self._discard(conn)
+
+    def checkout(self):
+        """Check out a PooledConnection whose close() returns it to the pool."""
+        return PooledConnection(self, self.getconn())
+
+    @contextmanager
+    def connection(self):
+        """Context manager around checkout; the connection is returned on exit."""
+        conn = self.getconn()
+        try:
+            yield conn
+        except Exception:
+            self.putconn(conn, discard=bool(conn.closed))
+            raise
+        else:
+            self.putconn(conn)
+
+    def _metrics(self):
+        in_use = self._size - len(self._idle)
+        checkouts = self._stats["checkouts"]
+        return {
+            "size": self._size,
+            "in_use": in_use,
+            "idle": len(self._idle),
+            "max": self.maxconn,
+            "waiting": self._waiting,
+            "saturation": round(in_use / self.maxconn, 3) if self.maxconn else 0.0,
+            **self._stats,
+            "avg_wait_ms": round(1000 * self._wait_total / checkouts, 3) if checkouts else 0.0,
+            "max_wait_ms": round(1000 * self._wait_max, 3),
+        }
+
+    def metrics(self):
+        """Pool size, saturation (in_use / max) and checkout wait-time counters."""
+        with self._cond:
+            return self._metrics()
+
+    def closeall(self):
+        """Close every idle connection; checked-out ones close when returned."""
+        with self._cond:
+            idle = [conn for conn, _, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self.max_lifetime = 0
+        for conn in idle:
+            self._close(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def shared_pool(key, connect):
+    """The process-wide pool for key (e.g. host, port, dbname), created with connect on first use."""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(connect)
+            logger.info(f"Created database connection pool for {key}")
+        return pool
+
+
+def pool_metrics():
+    """metrics() of every shared pool, keyed by the pool key."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {key: pool.metrics() for key, pool in pools.items()}
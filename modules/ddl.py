@@ -0,0 +1,163 @@
+"""
+Column type sizing for generated DDL.
+
+Profiled types (VARCHAR(n), NUMBER(p,s), DATE, ...) are turned into the
+DDL type for a target dialect: VARCHAR lengths get configurable headroom
+and are rounded up (Redshift lengths count UTF-8 bytes, Snowflake's
+characters; unsized VARCHAR gets the dialect maximum), decimals keep their measured scale with a spare digit
+of precision, and integer columns on Redshift use the smallest of
+SMALLINT, INTEGER and BIGINT that fits. storage_savings_report estimates
+the row width saved against the old VARCHAR(255) columns.
+"""
+import logging
+import math
+import re
+
+import pandas as pd
+
+from modules.config import config
+from modules.type_inference import DEFAULT_VARCHAR, MAX_PRECISION
+
+logger = logging.getLogger(__name__)
+
+DIALECT_SNOWFLAKE = "snowflake"
+DIALECT_REDSHIFT = "redshift"
+
+DDL_CONFIG = config.get('ddl', {})
+DDL_DIALECT = DDL_CONFIG.get('dialect', DIALECT_SNOWFLAKE)
+# Fraction of the observed max length added to VARCHAR columns, which are
+# then rounded up to a multiple of varchar_round.
+VARCHAR_HEADROOM = DDL_CONFIG.get('varchar_headroom', 0.25)
+VARCHAR_ROUND = DDL_CONFIG.get('varchar_round', 16)
+# Extra integer digits allowed for numeric columns.
+NUMERIC_HEADROOM_DIGITS = DDL_CONFIG.get('numeric_headroom_digits', 1)
+
+MAX_VARCHAR = {DIALECT_SNOWFLAKE: 16777216, DIALECT_REDSHIFT: 65535}
+
+# Largest integer digit count each Redshift integer type holds in full.
+REDSHIFT_INTEGERS = [(4, "SMALLINT"), (9, "INTEGER"), (18, "BIGINT")]
+REDSHIFT_TYPES = {
+    "TIMESTAMP_NTZ": "TIMESTAMP",
+    "TIMESTAMP_TZ": "TIMESTAMPTZ",
+    "FLOAT": "DOUBLE PRECISION",
+    "VARIANT": "SUPER",
+    "BINARY": "VARBYTE",
+}
+
+# Estimated bytes per value of fixed-width types, used for the savings report.
+FIXED_WIDTHS = {
+    "BOOLEAN": 1, "SMALLINT": 2, "INTEGER": 4, "BIGINT": 8, "DATE": 4, "TIME": 8,
+    "TIMESTAMP": 8, "TIMESTAMP_NTZ": 8, "TIMESTAMP_TZ": 8, "TIMESTAMPTZ": 8,
+    "FLOAT": 8, "DOUBLE PRECISION": 8,
+}
+# Variable-width values carry a length word.
+VARCHAR_OVERHEAD = 4
+
+_TYPE_PATTERN = re.compile(r"^\s*([A-Za-z_ ]+?)\s*(?:\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?\s*$")
+
+
+def parse_type(datatype):
+    """Split a type such as "NUMBER(10,2)" into ("NUMBER", 10, 2); missing parts are None."""
+    match = _TYPE_PATTERN.match(str(datatype))
+    if not match:
+        return str(datatype).strip().upper(), None, None
+    base, size, scale = match.groups()
+    return (
+        base.upper(), int(size) if size else None, int(scale) if scale else None
+    )
+
+
+def type_size_scale(datatype):
+    """
+    The datatype_size_val and datatype_scale_val of a profiled type:
+    precision and scale for NUMBER, the length for VARCHAR, blank otherwise.
+    """
+    base, size, scale = parse_type(datatype)
+    if base in ("NUMBER", "DECIMAL") and size is not None:
+        return size, scale or 0
+    if base == "VARCHAR" and size is not None:
+        return size, ""
+    return "", ""
+
+
+def varchar_length(max_length, dialect=None, headroom=VARCHAR_HEADROOM, round_to=VARCHAR_ROUND):
+    """Observed max length plus headroom, rounded up to a multiple of round_to."""
+    length = math.ceil(max(int(max_length), 1) * (1 + headroom))
+    length = math.ceil(length / round_to) * round_to
+    return min(length, MAX_VARCHAR.get(dialect or DDL_DIALECT, MAX_VARCHAR[DIALECT_SNOWFLAKE]))
+
+
+def right_sized_type(datatype, dialect=None, max_bytes=None):
+    """
+    The DDL type for a profiled type in the target dialect. The profiler's
+    fallback VARCHAR(255), used for columns without any values, is kept.
+    On Redshift, where VARCHAR lengths are bytes, VARCHAR columns are sized
+    from max_bytes (the longest value in UTF-8 bytes) when it is known.
+    """
+    dialect = dialect or DDL_DIALECT
+    if datatype == DEFAULT_VARCHAR:
+        return datatype
+    base, size, scale = parse_type(datatype)
+    if base == "VARCHAR" and size is None:
+        # Redshift reads a bare VARCHAR as VARCHAR(256).
+        return f"VARCHAR({MAX_VARCHAR.get(dialect, MAX_VARCHAR[DIALECT_SNOWFLAKE])})"
+    if base == "VARCHAR":
+        if dialect == DIALECT_REDSHIFT and pd.notna(max_bytes) and max_bytes:
+            size = max(size, int(max_bytes))
+        return f"VARCHAR({varchar_length(size, dialect)})"
+    if base in ("NUMBER", "DECIMAL") and size is not None:
+        scale = scale or 0
+        precision = min(size + NUMERIC_HEADROOM_DIGITS, MAX_PRECISION)
+        if dialect == DIALECT_REDSHIFT:
+            if scale == 0:
+                for digits, integer_type in REDSHIFT_INTEGERS:
+                    if precision <= digits:
+                        return integer_type
+            return f"DECIMAL({precision},{scale})"
+        return f"NUMBER({precision},{scale})"
+    if dialect == DIALECT_REDSHIFT:
+        return REDSHIFT_TYPES.get(base, datatype)
+    return datatype
+
+
+def column_bytes(datatype):
+    """Estimated in-memory width of one value of a DDL type."""
+    base, size, _ = parse_type(datatype)
+    if base in FIXED_WIDTHS:
+        return FIXED_WIDTHS[base]
+    if base in ("NUMBER", "DECIMAL"):
+        # 64-bit up to 18 digits, 128-bit beyond.
+        return 8 if (size or MAX_PRECISION) <= 18 else 16
+    if base in ("VARCHAR", "VARBYTE", "BINARY") and size is not None:
+        return size + VARCHAR_OVERHEAD
+    return parse_type(DEFAULT_VARCHAR)[1] + VARCHAR_OVERHEAD
+
+
+def storage_savings_report(metadata_df, dialect=None, baseline=DEFAULT_VARCHAR):
+    """
+    Per-column estimate of the bytes per row saved by the right-sized types
+    against declaring every column as baseline. Returns field_nm,
+    baseline_type, ddl_type, baseline_bytes and ddl_bytes.
+    """
+    columns = ["field_nm", "baseline_type", "ddl_type", "baseline_bytes", "ddl_bytes"]
+    if metadata_df.empty:
+        return pd.DataFrame(columns=columns)
+    ddl_types = [right_sized_type(datatype, dialect) for datatype in metadata_df["datatype_nm"]]
+    return pd.DataFrame({
+        "field_nm": metadata_df["field_nm"].to_numpy(),
+        "baseline_type": baseline,
+        "ddl_type": ddl_types,
+        "baseline_bytes": column_bytes(baseline),
+        "ddl_bytes": [column_bytes(ddl_type) for ddl_type in ddl_types],
+    }, columns=columns)
+
+
+def savings_summary(report):
+    """One-line summary of a storage_savings_report, used as a DDL comment."""
+    baseline = int(report["baseline_bytes"].sum())
+    sized = int(report["ddl_bytes"].sum())
+    saved = 100 * (baseline - sized) / baseline if baseline else 0
+    return (
+        f"Estimated row width: {sized} bytes vs {baseline} bytes as "
+        f"{DEFAULT_VARCHAR} columns ({saved:.0f}% smaller)"
+    )
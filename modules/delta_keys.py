@@ -0,0 +1,92 @@
+"""
+Delta key detection for incremental loads.
+
+A delta key is the watermark column the ingestion framework filters new
+rows by. Candidates come from the profiling pass, which tracks in file
+order whether each numeric or datetime column never decreases (see
+modules.column_stats):
+- a null-free date or timestamp column named like an update timestamp
+  (updated_at, last_modified_dt, loaded_ts, ...), one that only grows
+  before one that does not;
+- one named like a creation timestamp (created_at, insert_dt, ...), which
+  misses rows updated in place and so only beats unnamed columns;
+- a null-free date or timestamp column that only grows;
+- a unique integer sequence that only grows.
+Each kind wins over the ones after it.
+"""
+import logging
+import re
+
+from modules.config import config
+from modules.ddl import parse_type
+from modules.table_layout import TEMPORAL_TYPES
+
+logger = logging.getLogger(__name__)
+
+PROFILING_CONFIG = config.get('profiling', {})
+DELTA_KEY_DETECTION = PROFILING_CONFIG.get('delta_key_detection', True)
+# Name tokens of columns that record when a row was last written or changed.
+UPDATE_TOKENS = set(PROFILING_CONFIG.get('delta_key_name_tokens', [
+    "upd", "update", "updated", "mod", "modified", "modify", "chg", "change", "changed",
+    "loaded", "ingest", "ingested", "extract", "etl",
+]))
+# Name tokens of columns that record when a row was first written.
+CREATION_TOKENS = set(PROFILING_CONFIG.get('delta_key_creation_tokens', [
+    "created", "create", "crt", "insert", "inserted",
+]))
+
+_TOKEN_PATTERN = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+
+def name_tokens(field_nm):
+    """Lower-case words of a column name, split on separators and camel case."""
+    return [token.lower() for token in _TOKEN_PATTERN.findall(str(field_nm))]
+
+
+def looks_like_update_timestamp(field_nm):
+    return bool(UPDATE_TOKENS.intersection(name_tokens(field_nm)))
+
+
+def looks_like_creation_timestamp(field_nm):
+    return bool(CREATION_TOKENS.intersection(name_tokens(field_nm)))
+
+
+def _rank(row):
+    """
+    0 for growing update timestamps, 1 for other update timestamps, 2 for
+    creation timestamps, 3 for growing timestamps, 4 for growing
+    sequences, else None.
+    """
+    if row["null_count"]:
+        return None
+    base = parse_type(row["datatype_nm"])[0]
+    monotonic = bool(row.get("monotonic", False))
+    if base in TEMPORAL_TYPES:
+        if looks_like_update_timestamp(row["field_nm"]):
+            return 0 if monotonic else 1
+        if looks_like_creation_timestamp(row["field_nm"]):
+            return 2
+        return 3 if monotonic else None
+    scale = parse_type(row["datatype_nm"])[2]
+    if base == "NUMBER" and not scale and monotonic and row["is_unique"]:
+        return 4
+    return None
+
+
+def detect_delta_keys(profile):
+    """
+    The delta key of a profiled table as a list of at most one column;
+    ties within a kind go to the earlier column.
+    """
+    if not DELTA_KEY_DETECTION or profile.empty:
+        return []
+    candidates = []
+    for position, (_, row) in enumerate(profile.iterrows()):
+        rank = _rank(row)
+        if rank is not None:
+            candidates.append((rank, position, row["field_nm"]))
+    if not candidates:
+        return []
+    delta_key = min(candidates)[2]
+    logger.debug(f"Detected delta key: {delta_key}")
+    return [delta_key]
@@ -0,0 +1,191 @@
+"""
+Column compression encodings for generated DDL.
+
+On Redshift every column gets an ENCODE picked from its type and profile:
+RAW for the leading sort key, so range-restricted scans skip blocks
+cheaply; RUNLENGTH when equal values come in long runs; AZ64 for numbers,
+dates and timestamps; BYTEDICT for low-cardinality text; ZSTD otherwise.
+Snowflake compresses its micro-partitions itself, so it gets none.
+estimate_encoded_bytes models the size of a sample of values under each
+encoding, which encoding_benchmark uses to check the picks against RAW and
+ZSTD everywhere.
+"""
+import logging
+import math
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from modules.ddl import (
+    DDL_CONFIG, DDL_DIALECT, DIALECT_REDSHIFT, VARCHAR_OVERHEAD, column_bytes, parse_type,
+    right_sized_type
+)
+
+logger = logging.getLogger(__name__)
+
+COLUMN_ENCODING = DDL_CONFIG.get('column_encoding', True)
+# Average run of equal consecutive values from which RUNLENGTH is used.
+RUNLENGTH_MIN_RUN = DDL_CONFIG.get('runlength_min_run', 8)
+# BYTEDICT keeps a one-byte dictionary of at most 256 values per block.
+BYTEDICT_MAX_DISTINCT = 256
+
+# Dialects whose DDL takes column encodings.
+ENCODING_DIALECTS = {DIALECT_REDSHIFT}
+AZ64_TYPES = {"SMALLINT", "INTEGER", "BIGINT", "DECIMAL", "DATE", "TIMESTAMP", "TIMESTAMPTZ"}
+BYTEDICT_TYPES = {"CHAR", "VARCHAR"}
+ENCODINGS = ["RAW", "AZ64", "BYTEDICT", "RUNLENGTH", "ZSTD"]
+
+# Values per AZ64 frame and bytes of frame header in the size model.
+_AZ64_FRAME = 1024
+_AZ64_HEADER = 16
+
+
+def recommend_encoding(ddl_type, distinct_count=None, avg_run_length=None, sort_key=False):
+    """The Redshift ENCODE for a column of ddl_type with the given profile."""
+    if sort_key:
+        return "RAW"
+    base = parse_type(ddl_type)[0]
+    if pd.notna(avg_run_length) and avg_run_length >= RUNLENGTH_MIN_RUN:
+        return "RUNLENGTH"
+    if base in AZ64_TYPES:
+        return "AZ64"
+    if base in BYTEDICT_TYPES and pd.notna(distinct_count) and distinct_count <= BYTEDICT_MAX_DISTINCT:
+        return "BYTEDICT"
+    return "ZSTD"
+
+
+def column_encodings(metadata_df, field_stats=None, dialect=None):
+    """
+    Map each field_nm of metadata_df to its ENCODE for the dialect, using
+    the distinct counts and run lengths of field_stats
+    (sys_config_table_field_stats rows) when given. Empty for dialects
+    without column encodings or when ddl.column_encoding is off.
+    """
+    dialect = dialect or DDL_DIALECT
+    if not COLUMN_ENCODING or dialect not in ENCODING_DIALECTS or metadata_df.empty:
+        return {}
+    stats = {}
+    if field_stats is not None and not field_stats.empty:
+        stats = {
+            (row["src_table_nm"], row["field_nm"]): (row["distinct_cnt"], row.get("avg_run_len"))
+            for _, row in field_stats.iterrows()
+        }
+    sort_key = None
+    if "sort_key_ind" in metadata_df.columns:
+        flagged = metadata_df.loc[metadata_df["sort_key_ind"] == "X", "field_nm"]
+        sort_key = flagged.iloc[0] if not flagged.empty else None
+    encodings = {}
+    for _, row in metadata_df.iterrows():
+        distinct, run_length = stats.get((row["src_table_nm"], row["field_nm"]), (None, None))
+        encodings[row["field_nm"]] = recommend_encoding(
+            right_sized_type(row["datatype_nm"], dialect), distinct, run_length,
+            sort_key=row["field_nm"] == sort_key
+        )
+    return encodings
+
+
+def _zstd_size(payload):
+    try:
+        # zstandard is optional; zlib stands in for it when missing.
+        import zstandard
+    except ImportError:
+        return len(zlib.compress(payload, 6))
+    return len(zstandard.ZstdCompressor(level=3).compress(payload))
+
+
+def _az64_keys(values, ddl_type):
+    """The values as the integers AZ64 packs, or None when they do not parse."""
+    base, _, scale = parse_type(ddl_type)
+    if base in ("DATE", "TIMESTAMP", "TIMESTAMPTZ"):
+        parsed = pd.to_datetime(values, errors="coerce", format="mixed")
+        if parsed.isna().any():
+            return None
+        return parsed.astype("datetime64[us]").astype("int64").to_numpy()
+    parsed = pd.to_numeric(values, errors="coerce")
+    if parsed.isna().any():
+        return None
+    return np.round(parsed.to_numpy(dtype=float) * 10 ** (scale or 0)).astype(np.int64)
+
+
+def _az64_size(keys):
+    """
+    Frame-of-reference model: each frame stores its deltas, divided by
+    their common factor (e.g. a day of microseconds), at the smallest bit
+    width that holds them.
+    """
+    size = 0
+    for start in range(0, len(keys), _AZ64_FRAME):
+        frame = keys[start:start + _AZ64_FRAME]
+        deltas = np.diff(frame)
+        step = int(np.gcd.reduce(deltas)) if len(deltas) else 0
+        if step:
+            deltas = deltas // abs(step)
+        spread = int(deltas.max() - deltas.min()) if len(deltas) else 0
+        size += _AZ64_HEADER + math.ceil(len(deltas) * max(spread, 1).bit_length() / 8)
+    return size
+
+
+def estimate_encoded_bytes(values, ddl_type, encoding):
+    """
+    Estimated bytes taken by the non-null values (in file order) stored as
+    ddl_type under encoding, or None when the encoding does not apply.
+    """
+    values = pd.Series(values, dtype=object).dropna().astype(str).reset_index(drop=True)
+    if values.empty:
+        return 0
+    base = parse_type(ddl_type)[0]
+    fixed = base not in ("VARCHAR", "CHAR", "VARBYTE", "BINARY", "SUPER", "VARIANT")
+    widths = (
+        pd.Series(column_bytes(ddl_type), index=values.index) if fixed
+        else values.str.encode("utf-8").str.len() + VARCHAR_OVERHEAD
+    )
+    if encoding == "RAW":
+        return int(widths.sum())
+    if encoding == "RUNLENGTH":
+        starts = values.ne(values.shift())
+        # Each run stores its value once plus a one-byte count.
+        return int(widths[starts].sum() + starts.sum())
+    if encoding == "BYTEDICT":
+        if base not in BYTEDICT_TYPES | AZ64_TYPES:
+            return None
+        distinct = ~values.duplicated()
+        if distinct.sum() > BYTEDICT_MAX_DISTINCT:
+            return int(widths.sum())
+        return int(len(values) + widths[distinct].sum())
+    if encoding == "AZ64":
+        keys = _az64_keys(values, ddl_type) if base in AZ64_TYPES else None
+        return None if keys is None else _az64_size(keys)
+    if encoding == "ZSTD":
+        return _zstd_size("\n".join(values).encode("utf-8"))
+    raise ValueError(f"Unknown encoding: {encoding}")
+
+
+def encoding_benchmark(df, metadata_df, field_stats=None, dialect=DIALECT_REDSHIFT):
+    """
+    Estimate the compressed size of the sample df (string columns in file
+    order) under every encoding. Returns one row per column with
+    field_nm, ddl_type, encoding (the pick), encoded_bytes (its estimate)
+    and one estimate column per entry of ENCODINGS.
+    """
+    encodings = column_encodings(metadata_df, field_stats, dialect)
+    rows = []
+    for _, field in metadata_df.iterrows():
+        name = field["field_nm"]
+        if name not in df.columns:
+            continue
+        ddl_type = right_sized_type(field["datatype_nm"], dialect)
+        sizes = {
+            encoding: estimate_encoded_bytes(df[name], ddl_type, encoding)
+            for encoding in ENCODINGS
+        }
+        pick = encodings.get(name, "RAW")
+        rows.append({
+            "field_nm": name, "ddl_type": ddl_type, "encoding": pick,
+            "encoded_bytes": sizes[pick], **sizes,
+        })
+    report = pd.DataFrame(
+        rows, columns=["field_nm", "ddl_type", "encoding", "encoded_bytes"] + ENCODINGS
+    )
+    logger.debug(f"Encoding benchmark over {len(df)} rows: {len(report)} columns")
+    return report
@@ -2,80 +2,661 @@
 File processing utilities for Data Onboarding Framework.
 """
 
+import io
 import logging
 import os
+import shutil
+import tempfile
+import time
+import openpyxl
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
+from pandas.errors import ParserError
+from modules.archives import (
+    ARCHIVE_MAX_BYTES, ARCHIVE_MAX_MEMBERS, READ_CHUNK_BYTES, ArchiveLimitError, ArchiveLimits,
+    buffer_stream, is_archive, strip_compression, walk
+)
+from modules.columnar import COLUMNAR_EXTENSIONS
+from modules.config import config
+from modules.json_profiler import JSON_EXTENSIONS, profile_json
 from modules.logging_setup import log_function
+from modules.profiler import HLL_PRECISION, profile_chunks
+from modules.sniffer import sniff_csv, table_info_values
 
 logger = logging.getLogger(__name__)
 SUPPORTED_EXTENSIONS = [
     ".csv", ".xlsx"
+] + COLUMNAR_EXTENSIONS + JSON_EXTENSIONS
+
+PROFILING_CONFIG = config.get('profiling', {})
+STREAM_CHUNK_ROWS = PROFILING_CONFIG.get('stream_chunk_rows', 100000)
+ZIP_WORKERS = PROFILING_CONFIG.get('zip_workers')
+EXCEL_WORKERS = PROFILING_CONFIG.get('excel_workers', ZIP_WORKERS)
+# Rows read per Excel sheet for profiling; 0 reads every row.
+EXCEL_SAMPLE_ROWS = PROFILING_CONFIG.get('excel_sample_rows', 0)
+
+PARSER_ENGINE_PYARROW = "pyarrow"
+PARSER_ENGINE_PANDAS = "pandas"
+# "pyarrow" parses with the multithreaded Arrow CSV reader and keeps columns
+# as Arrow-backed strings; "pandas" is the original C-engine path.
+PARSER_ENGINE = PROFILING_CONFIG.get('parser_engine', PARSER_ENGINE_PYARROW)
+
+ARROW_STRING = pd.StringDtype("pyarrow")
+# The strings pd.read_csv reads as missing by default, so both engines
+# agree on null counts.
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
 ]
 
 
+def _arrow_strings(df):
+    """Cast every column of a parsed frame to Arrow-backed strings."""
+    return df.astype(ARROW_STRING)
+
+
+def _csv_options(csv_format):
+    """pd.read_csv keyword arguments for a format returned by sniff_csv."""
+    return {
+        "sep": csv_format["delimiter"],
+        "quotechar": csv_format["quotechar"],
+        "encoding": csv_format["encoding"],
+        "header": 0 if csv_format["header_rows"] else None,
+    }
+
+
+def _column_names(count):
+    """Names given to the columns of a file without a header row."""
+    return [f"column_{idx}" for idx in range(1, count + 1)]
+
+
+def _parse_csv(file, engine, csv_format=None):
+    """
+    Parse a CSV file-like object into a frame of string columns, using the
+    delimiter, quoting, encoding and header sniffed from its first bytes
+    unless csv_format is given.
+    The pyarrow engine falls back to the pandas parser on input it rejects,
+    such as short rows, which the C engine pads with nulls.
+    """
+    csv_format = csv_format or sniff_csv(file)
+    options = _csv_options(csv_format)
+    df = None
+    if engine == PARSER_ENGINE_PYARROW:
+        position = file.tell()
+        try:
+            df = pd.read_csv(file, engine="pyarrow", dtype=ARROW_STRING, **options)
+        except ParserError as e:
+            logger.warning(f"pyarrow CSV parser failed, falling back to pandas: {e}")
+            file.seek(position)
+    if df is None:
+        df = pd.read_csv(file, dtype=str, **options)
+    if not csv_format["header_rows"]:
+        df.columns = _column_names(len(df.columns))
+    return df
+
+
+def _cell_text(value):
+    """Render an openpyxl cell value the way pd.read_excel(dtype=str) does."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _sheet_rows(worksheet):
+    """
+    Yield the rows of a read-only worksheet as tuples of text.
+    Blank rows are held back until a non-blank row follows, so trailing
+    blank rows are dropped as pd.read_excel does.
+    """
+    # Read-only sheets trust the stored dimensions, which some writers get wrong.
+    worksheet.reset_dimensions()
+    blank = []
+    for row in worksheet.iter_rows(values_only=True):
+        row = tuple(_cell_text(value) for value in row)
+        if all(value is None for value in row):
+            blank.append(row)
+            continue
+        yield from blank
+        blank = []
+        yield row
+
+
+def _sheet_frame(worksheet, sample_rows, engine, chunk_rows=STREAM_CHUNK_ROWS):
+    """Build a string frame from a worksheet, reading at most sample_rows data rows."""
+    rows = _sheet_rows(worksheet)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    columns = [
+        name if name is not None else f"Unnamed: {idx}" for idx, name in enumerate(header)
+    ]
+    width = len(columns)
+    dtype = ARROW_STRING if engine == PARSER_ENGINE_PYARROW else object
+    chunks = []
+    batch = []
+    read = 0
+    for row in rows:
+        if sample_rows and read >= sample_rows:
+            break
+        batch.append(row[:width] + (None,) * (width - len(row)))
+        read += 1
+        # Rows are converted in chunks so the Python tuples never outnumber
+        # chunk_rows, however long the sheet.
+        if len(batch) >= chunk_rows:
+            chunks.append(pd.DataFrame(batch, columns=columns, dtype=dtype))
+            batch = []
+    if batch or not chunks:
+        chunks.append(pd.DataFrame(batch, columns=columns, dtype=dtype))
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def _open_workbook(file):
+    return openpyxl.load_workbook(file, read_only=True, data_only=True)
+
+
+def excel_sheet_names(file):
+    """Return the worksheet names of an Excel file without reading any rows."""
+    workbook = _open_workbook(file)
+    try:
+        return [worksheet.title for worksheet in workbook.worksheets]
+    finally:
+        workbook.close()
+
+
+def _parse_excel(file, engine, sheet_name=None, sample_rows=None):
+    """
+    Stream one sheet (the first by default) of an Excel file into a frame of
+    string columns with openpyxl in read-only mode.
+    """
+    workbook = _open_workbook(file)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        return _sheet_frame(worksheet, sample_rows, engine)
+    finally:
+        workbook.close()
+
+
 @log_function
-def read_csv(file):
-    """Read CSV file into DataFrame with error handling."""
+def read_csv(file, engine=None, csv_format=None):
+    """
+    Read CSV file into DataFrame with error handling.
+    engine overrides profiling.parser_engine ("pyarrow" or "pandas") and
+    csv_format overrides the format sniffed by modules.sniffer.
+    """
     try:
-        return pd.read_csv(file, dtype=str)
+        return _parse_csv(file, engine or PARSER_ENGINE, csv_format)
     except Exception as e:
         logger.error(f"Error reading CSV file: {e}")
         raise
 
 
+def upload_size(file):
+    """Return the size in bytes of an uploaded file-like object."""
+    size = getattr(file, 'size', None)
+    if size is not None:
+        return size
+    position = file.tell()
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(position)
+    return size
+
+
+def _head(file, csv_format):
+    """
+    The first READ_CHUNK_BYTES of file cut after its last complete line,
+    restoring its position. Header probes parse this rather than the file:
+    the Arrow reader reads megabytes ahead, more than an archive stream
+    can rewind (see modules.archives.ReplayReader).
+    """
+    position = file.tell()
+    head = file.read(READ_CHUNK_BYTES)
+    file.seek(position)
+    if len(head) == READ_CHUNK_BYTES:
+        encoding = csv_format["encoding"]
+        # The encoded newline without any byte order mark.
+        newline = "x\n".encode(encoding)[len("x".encode(encoding)):]
+        if newline in head:
+            head = head[:head.rindex(newline) + len(newline)]
+    return head
+
+
+def _arrow_csv_chunks(file, chunk_rows, csv_format, columns=None):
+    """
+    Yield frames of about chunk_rows Arrow-backed string rows from a CSV
+    file-like object using the streaming Arrow reader, optionally limited
+    to the named columns.
+    """
+    read_options = pv.ReadOptions(
+        encoding=csv_format["encoding"],
+        autogenerate_column_names=not csv_format["header_rows"]
+    )
+    parse_options = pv.ParseOptions(
+        delimiter=csv_format["delimiter"], quote_char=csv_format["quotechar"],
+        newlines_in_values=True
+    )
+    # The header is read first so every column can be forced to string;
+    # per-block type inference would otherwise reject later blocks.
+    with pv.open_csv(
+        io.BytesIO(_head(file, csv_format)), read_options=read_options, parse_options=parse_options
+    ) as reader:
+        names = reader.schema.names
+    convert_options = pv.ConvertOptions(
+        column_types={name: pa.string() for name in names},
+        null_values=NA_VALUES, strings_can_be_null=True
+    )
+    if not csv_format["header_rows"]:
+        read_options.autogenerate_column_names = False
+        read_options.column_names = _column_names(len(names))
+        convert_options.column_types = {name: pa.string() for name in read_options.column_names}
+    if columns is not None:
+        convert_options.include_columns = list(columns)
+    batches = []
+    rows = 0
+    with pv.open_csv(
+        file, read_options=read_options, parse_options=parse_options,
+        convert_options=convert_options
+    ) as reader:
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= chunk_rows:
+                yield _batches_to_frame(batches)
+                batches, rows = [], 0
+    if batches:
+        yield _batches_to_frame(batches)
+
+
+def _batches_to_frame(batches):
+    table = pa.Table.from_batches(batches)
+    return table.to_pandas(types_mapper={pa.string(): ARROW_STRING}.get)
+
+
 @log_function
-def read_excel(file):
-    """Read Excel file into DataFrame with error handling."""
+def profile_csv_stream(
+    file, chunk_rows=STREAM_CHUNK_ROWS, engine=None, csv_format=None, columns=None
+):
+    """
+    Profile a CSV file chunk by chunk without loading it into memory.
+    columns limits parsing to the named columns. The pyarrow engine starts
+    over with the pandas parser on input it rejects, such as short rows.
+    Returns the column profile frame produced by modules.profiler.
+    """
+    precision = PROFILING_CONFIG.get('hll_precision', HLL_PRECISION)
+    csv_format = csv_format or sniff_csv(file)
     try:
-        xls = pd.ExcelFile(file)
-        return xls.parse(xls.sheet_names[0], dtype=str)
+        profile = None
+        if (engine or PARSER_ENGINE) == PARSER_ENGINE_PYARROW:
+            position = file.tell()
+            try:
+                profile = profile_chunks(
+                    _arrow_csv_chunks(file, chunk_rows, csv_format, columns), precision
+                )
+            except pa.ArrowInvalid as e:
+                # e.g. short rows, which the C engine pads with nulls.
+                logger.warning(f"pyarrow CSV reader failed, falling back to pandas: {e}")
+                file.seek(position)
+        if profile is None:
+            options = _csv_options(csv_format)
+            if not csv_format["header_rows"]:
+                # Names are needed up front so every chunk gets the same ones.
+                head = io.BytesIO(_head(file, csv_format))
+                ncols = len(pd.read_csv(head, nrows=1, dtype=str, **options).columns)
+                options["names"] = _column_names(ncols)
+            if columns is not None:
+                options["usecols"] = columns
+            with pd.read_csv(file, dtype=str, chunksize=chunk_rows, **options) as reader:
+                profile = profile_chunks(reader, precision)
+        profile["field_nm"] = profile["field_nm"].astype(str).str.strip()
+        return profile
     except Exception as e:
-        logger.error(f"Error reading Excel file: {e}")
+        logger.error(f"Error streaming CSV file: {e}")
         raise
 
 
 @log_function
-def process_uploaded_zip(uploaded_zip_file, src_nm, table_nm, generate_sys_config_table_info_fn):
+def read_excel(file, engine=None, sheet_name=None, sample_rows=None):
     """
-    Process uploaded ZIP file, extract supported files, and generate metadata and table info.
+    Read one sheet (the first by default) of an Excel file into a DataFrame
+    with error handling. sample_rows caps the data rows read.
     """
-    from modules.metadata import extract_metadata_from_dataframe
-    all_metadata = []
-    table_info_df = pd.DataFrame()
-    with zipfile.ZipFile(uploaded_zip_file) as z:
-        for file_info in z.infolist():
-            if file_info.is_dir():
-                continue
-            base_filename = os.path.basename(file_info.filename)
-            _, ext = os.path.splitext(base_filename)
-            ext = ext.lower()
-            if ext not in SUPPORTED_EXTENSIONS:
-                continue
+    try:
+        return _parse_excel(file, engine or PARSER_ENGINE, sheet_name, sample_rows)
+    except Exception as e:
+        logger.error(f"Error reading Excel file: {e}")
+        raise
+
+
+def _is_table(name):
+    """True for a file name (compressed or not) of a supported table format."""
+    return os.path.splitext(strip_compression(name))[1].lower() in SUPPORTED_EXTENSIONS
+
+
+def _measured_size(stream, limit):
+    """
+    Return the size of stream if it ends within limit bytes, else None,
+    leaving the stream at its start. Used for streams without a recorded size.
+    """
+    size = 0
+    while size <= limit:
+        block = stream.read(min(READ_CHUNK_BYTES, limit + 1 - size))
+        if not block:
+            stream.seek(0)
+            return size
+        size += len(block)
+    stream.seek(0)
+    return None
+
+
+def _profiled_part(profile, key_columns, file_format=None):
+    row_count = int(profile["row_count"].iloc[0]) if not profile.empty else 0
+    return {
+        "profile": profile, "key_columns": key_columns, "row_count": row_count,
+        "file_format": file_format or {},
+    }
+
+
+def _profile_part(stream, path, size, engine):
+    """
+    Parse and profile one table read from an archive stream.
+    CSVs known to be under the stream threshold are profiled in memory with
+    exact keys, larger or unbounded ones chunk by chunk; JSON is always
+    streamed. Returns profile, key_columns, row_count and file_format.
+    """
+    from modules.columnar import profile_columnar
+    from modules.metadata import STREAM_THRESHOLD_BYTES, detect_key, profile_table
+    ext = os.path.splitext(path)[1].lower()
+    file_format = {}
+    if ext == ".csv":
+        csv_format = sniff_csv(stream)
+        file_format = table_info_values(csv_format)
+        if size is None:
+            size = _measured_size(stream, STREAM_THRESHOLD_BYTES)
+        if size is None or size >= STREAM_THRESHOLD_BYTES:
+            profile = profile_csv_stream(stream, engine=engine, csv_format=csv_format)
+            return _profiled_part(profile, detect_key(None, profile), file_format)
+        df = _parse_csv(stream, engine, csv_format)
+    elif ext in JSON_EXTENSIONS:
+        profile = profile_json(stream)
+        return _profiled_part(profile, detect_key(None, profile))
+    elif ext == ".xlsx":
+        # openpyxl seeks around the workbook, which a compressed stream cannot do cheaply.
+        df = _parse_excel(buffer_stream(stream), engine, sample_rows=EXCEL_SAMPLE_ROWS)
+    else:
+        return _profiled_part(*profile_columnar(buffer_stream(stream), ext, False))
+    if df.empty:
+        return {**_profiled_part(pd.DataFrame(), ()), "file_format": file_format}
+    part = _profiled_part(*profile_table(df), file_format)
+    part["row_count"] = len(df)
+    return part
+
+
+def _profile_parts(stream, name, engine, size=None, limits=None):
+    """
+    Profile every table reachable from stream, unwrapping compression and
+    nested archives. Failures are returned per table rather than raised;
+    an archive that breaks a limit or cannot be read yields one error
+    result for name.
+    """
+    results = []
+    try:
+        for path, part_stream, part_size in walk(
+            stream, name, _is_table, limits or ArchiveLimits(), size=size
+        ):
+            start = time.perf_counter()
+            result = {"member": path, "status": "ok", "error": ""}
             try:
-                with z.open(file_info) as file:
-                    if ext == ".csv":
-                        df = pd.read_csv(file, dtype=str)
-                    else:  # .xlsx
-                        xls = pd.ExcelFile(file)
-                        df = xls.parse(
-                            xls.sheet_names[0], dtype=str
-                        )
-                metadata_df = extract_metadata_from_dataframe(
-                    df, src_nm, base_filename
-                )
-                all_metadata.append(metadata_df)
-                if not metadata_df.empty:
-                    temp_table_df = generate_sys_config_table_info_fn(
-                        base_filename
-                    )
-                    table_info_df = pd.concat(
-                        [table_info_df, temp_table_df], ignore_index=True
-                    )
+                result.update(_profile_part(part_stream, path, part_size, engine))
+            except ArchiveLimitError:
+                raise
             except Exception as e:
-                logger.error(f"Error processing file {base_filename} in zip: {e}")
-    all_metadata_df = pd.concat(
-        all_metadata, ignore_index=True
-    ) if all_metadata else pd.DataFrame()
+                result.update(
+                    status="error", error=str(e), row_count=0, profile=pd.DataFrame(),
+                    key_columns=(), file_format={}
+                )
+            result["seconds"] = round(time.perf_counter() - start, 3)
+            results.append(result)
+    except Exception as e:
+        results.append({
+            "member": name, "status": "error", "error": str(e), "row_count": 0,
+            "profile": pd.DataFrame(), "key_columns": (), "file_format": {}, "seconds": 0.0,
+        })
+    return results
+
+
+def _sample_zip_member(z, info, engine):
+    """
+    Profile a plain CSV member from a sample of blocks (see
+    modules.sampling). Returns None when the member is not worth sampling.
+    """
+    from modules.sampling import profile_csv_sample
+    start = time.perf_counter()
+    result = {"member": info.filename, "status": "ok", "error": ""}
+    try:
+        with z.open(info) as file:
+            csv_format = sniff_csv(file)
+            sampled = profile_csv_sample(file, info.file_size, csv_format, engine)
+        if sampled is None:
+            return None
+        result.update(_profiled_part(*sampled, table_info_values(csv_format)))
+    except Exception as e:
+        result.update(
+            status="error", error=str(e), row_count=0, profile=pd.DataFrame(),
+            key_columns=(), file_format={}
+        )
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _profile_zip_member(archive, member_name, engine=PARSER_ENGINE, sample=False,
+                        spare_bytes=ARCHIVE_MAX_BYTES, spare_members=ARCHIVE_MAX_MEMBERS):
+    """
+    Decompress, parse and profile a single ZIP member, which may itself be
+    compressed or an archive. With sample=True a plain CSV member is
+    profiled from a sample of blocks. Runs inside a worker process, so
+    failures are returned rather than raised. Returns a list of results,
+    one per table. spare_bytes and spare_members are this member's share
+    of what the archive caps leave for nested layers.
+    """
+    with zipfile.ZipFile(archive) as z:
+        info = z.getinfo(member_name)
+        if sample and os.path.splitext(member_name)[1].lower() == ".csv":
+            # A ZIP member can seek, at the cost of decompressing up to the offset.
+            result = _sample_zip_member(z, info, engine)
+            if result is not None:
+                return [result]
+        # zipfile stops at the declared size, so only nested layers need a budget.
+        limits = ArchiveLimits(max_bytes=spare_bytes, max_members=1 + spare_members)
+        with z.open(info) as file:
+            return _profile_parts(file, member_name, engine, size=info.file_size, limits=limits)
+
+
+@log_function
+def profile_archive(file, name, engine=None):
+    """
+    Profile every table in a compressed file or tar archive (see
+    modules.archives), streaming straight from the decompressed bytes.
+    Returns results in archive order as dicts with member, status, error,
+    row_count, seconds, profile, key_columns and file_format.
+    """
+    file.seek(0)
+    results = _profile_parts(file, name, engine or PARSER_ENGINE)
+    for result in results:
+        if result["status"] == "error":
+            logger.error(f"Error processing {result['member']} in {name}: {result['error']}")
+    return results
+
+
+def _spool_to_disk(uploaded_file, suffix=".zip"):
+    """Copy an uploaded file object to a temp file so workers can open it by path."""
+    uploaded_file.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(uploaded_file, tmp)
+    return tmp.name
+
+
+def _map_parts(worker, source, parts, max_workers, suffix, *args):
+    """
+    Run worker(source, part, *args) for every part, in a process pool when
+    more than one worker is allowed. File objects are spooled to disk first
+    so each worker process can open the source by path.
+    """
+    workers = min(max_workers, len(parts))
+    if workers <= 1:
+        return [worker(source, part, *args) for part in parts]
+    path = (
+        source if isinstance(source, (str, os.PathLike))
+        else _spool_to_disk(source, suffix)
+    )
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                worker, repeat(path), parts, *(repeat(arg) for arg in args)
+            ))
+    finally:
+        if path is not source:
+            os.remove(path)
+
+
+def _profile_excel_sheet(source, sheet_name, sample_rows, engine):
+    """
+    Parse and profile one sheet of a workbook.
+    Runs inside a worker process, so failures are returned rather than raised.
+    """
+    from modules.metadata import profile_table
+    start = time.perf_counter()
+    result = {
+        "sheet": sheet_name, "status": "ok", "error": "", "row_count": 0,
+        "profile": pd.DataFrame(), "key_columns": (),
+    }
+    try:
+        df = _parse_excel(source, engine, sheet_name, sample_rows)
+        result["row_count"] = len(df)
+        if not df.empty:
+            result["profile"], result["key_columns"] = profile_table(df)
+    except Exception as e:
+        result.update(status="error", error=str(e))
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+@log_function
+def profile_excel_sheets(file, max_workers=None, sample_rows=None, engine=None):
+    """
+    Profile every sheet of an Excel workbook as its own table.
+    Sheets are streamed with openpyxl in read-only mode, capped at
+    sample_rows data rows (profiling.excel_sample_rows by default), and
+    profiled in a process pool of max_workers processes. Results are
+    returned in workbook order as dicts with sheet, status, error,
+    row_count, seconds, profile and key_columns.
+    """
+    if max_workers is None:
+        max_workers = EXCEL_WORKERS or os.cpu_count() or 1
+    if sample_rows is None:
+        sample_rows = EXCEL_SAMPLE_ROWS
+    sheet_names = excel_sheet_names(file)
+    if not isinstance(file, (str, os.PathLike)):
+        file.seek(0)
+    results = _map_parts(
+        _profile_excel_sheet, file, sheet_names, max_workers, ".xlsx",
+        sample_rows, engine or PARSER_ENGINE
+    )
+    for result in results:
+        if result["status"] == "error":
+            logger.error(f"Error processing sheet {result['sheet']}: {result['error']}")
+    return results
+
+
+@log_function
+def profile_zip_members(uploaded_zip_file, max_workers=None, engine=None, sample=False):
+    """
+    Profile every supported member of a ZIP file, including compressed
+    members and nested archives. Members are handled by a process pool of max_workers processes
+    (profiling.zip_workers by default) and returned in archive order as
+    dicts with member, status, error, row_count, seconds, profile and
+    key_columns. sample=True profiles plain CSV members from a sample.
+    """
+    engine = engine or PARSER_ENGINE
+    if max_workers is None:
+        max_workers = ZIP_WORKERS or os.cpu_count() or 1
+    with zipfile.ZipFile(uploaded_zip_file) as z:
+        infos = [
+            info for info in z.infolist()
+            if not info.is_dir() and (_is_table(info.filename) or is_archive(info.filename))
+        ]
+    members = [info.filename for info in infos]
+    # The totals the archive declares are checked up front; whatever the
+    # caps leave over is split evenly between members for nested layers,
+    # since each worker can only count the bytes it decompresses itself.
+    if len(members) > ARCHIVE_MAX_MEMBERS:
+        raise ArchiveLimitError(f"ZIP has more than {ARCHIVE_MAX_MEMBERS} members")
+    declared = sum(info.file_size for info in infos)
+    if declared > ARCHIVE_MAX_BYTES:
+        raise ArchiveLimitError(f"ZIP expands beyond {ARCHIVE_MAX_BYTES} bytes")
+    spare_bytes = (ARCHIVE_MAX_BYTES - declared) // max(len(members), 1)
+    spare_members = (ARCHIVE_MAX_MEMBERS - len(members)) // max(len(members), 1)
+
+    parts = _map_parts(
+        _profile_zip_member, uploaded_zip_file, members, max_workers, ".zip", engine, sample,
+        spare_bytes, spare_members
+    )
+    results = [result for part in parts for result in part]
+    for result in results:
+        if result["status"] == "error":
+            logger.error(f"Error processing file {result['member']} in zip: {result['error']}")
+    return results
+
+
+def zip_member_tables(results):
+    """Convert successful profile_zip_members results into profiled-table entries."""
+    return [{
+        "file_name": os.path.basename(result["member"]),
+        "profile": result["profile"],
+        "key_columns": result["key_columns"],
+        "archive_member": True,
+        "file_format": result["file_format"],
+    } for result in results if result["status"] == "ok"]
+
+
+@log_function
+def process_uploaded_zip(
+    uploaded_zip_file, src_nm, table_nm, generate_sys_config_table_info_fn,
+    max_workers=None, return_report=False, sample=None
+):
+    """
+    Process uploaded ZIP file, extract supported files, and generate metadata and table info.
+    Members are profiled in parallel by profile_zip_members; sample
+    (profiling.sample_uploads by default) profiles plain CSV members from a
+    sample of rows. With return_report=True a third DataFrame with
+    per-member status, error, row count, timing and the lowest column
+    confidence (NaN for members that failed) is returned.
+    """
+    from modules.metadata import render_tables
+    from modules.sampling import SAMPLE_UPLOADS
+    if sample is None:
+        sample = SAMPLE_UPLOADS
+    results = profile_zip_members(uploaded_zip_file, max_workers, sample=sample)
+    tables = zip_member_tables(results)
+    all_metadata_df, table_info_df = render_tables(
+        tables, src_nm, table_nm, generate_sys_config_table_info_fn
+    )
+    if return_report:
+        report_df = pd.DataFrame(
+            results, columns=["member", "status", "error", "row_count", "seconds"]
+        )
+        # Fully profiled members are certain; failed ones have no confidence.
+        report_df["min_confidence"] = [
+            float("nan") if result["status"] != "ok"
+            else float(result["profile"]["confidence"].min())
+            if "confidence" in result["profile"] else 1.0
+            for result in results
+        ]
+        return all_metadata_df, table_info_df, report_df
     return all_metadata_df, table_info_df
@@ -0,0 +1,160 @@
+"""
+Streaming JSON profiler for Data Onboarding Framework.
+
+Reads newline-delimited JSON or a top-level JSON array record by record,
+flattens nested objects into dotted field names ("address.city") and folds
+chunks of records into the same ProfileAccumulator as the streamed CSV path,
+so files larger than memory are profiled with bounded memory. Fields whose
+values are arrays or objects are reported as VARIANT.
+"""
+import codecs
+import io
+import json
+import logging
+
+import pandas as pd
+
+from modules.config import config
+from modules.logging_setup import log_function
+from modules.profiler import HLL_PRECISION, PROFILE_COLUMNS, ProfileAccumulator
+
+logger = logging.getLogger(__name__)
+
+JSON_EXTENSIONS = [".json", ".ndjson", ".jsonl"]
+
+PROFILING_CONFIG = config.get('profiling', {})
+STREAM_CHUNK_ROWS = PROFILING_CONFIG.get('stream_chunk_rows', 100000)
+JSON_PATH_SEPARATOR = PROFILING_CONFIG.get('json_path_separator', '.')
+
+READ_CHUNK_CHARS = 1024 * 1024
+# A single record larger than this is treated as malformed input.
+MAX_RECORD_CHARS = 64 * 1024 * 1024
+
+VARIANT = "VARIANT"
+
+_DECODER = json.JSONDecoder()
+
+
+def _array_records(text):
+    """Yield the elements of a top-level JSON array without loading it whole."""
+    buffer = text.read(READ_CHUNK_CHARS).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Expected a JSON array")
+    position = 1
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            record, end = _DECODER.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof or len(buffer) - position > MAX_RECORD_CHARS:
+                raise
+            chunk = text.read(READ_CHUNK_CHARS)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield record
+        position = end
+        if len(buffer) - position < READ_CHUNK_CHARS and not eof:
+            chunk = text.read(READ_CHUNK_CHARS)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def _line_records(text):
+    for line_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+
+
+def iter_records(file):
+    """
+    Yield records from newline-delimited JSON or a top-level JSON array,
+    detected from the first non-blank character.
+    """
+    position = file.tell()
+    head = file.read(4096).lstrip(codecs.BOM_UTF8).lstrip()
+    file.seek(position)
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        records = _array_records(text) if head.startswith(b"[") else _line_records(text)
+        for record in records:
+            yield record if isinstance(record, dict) else {"value": record}
+    finally:
+        # Leave the caller's file open.
+        text.detach()
+
+
+def _text_value(value):
+    """Render a JSON value as the text the profiler classifies."""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+def flatten_records(records, separator=JSON_PATH_SEPARATOR):
+    """
+    Flatten a list of records into a frame of text columns, one per nested
+    path. Returns (frame, columns holding arrays or objects).
+    """
+    flat = pd.json_normalize(records, sep=separator)
+    nested = {
+        col for col in flat.columns
+        if flat[col].map(lambda value: isinstance(value, (list, dict))).any()
+    }
+    text = pd.DataFrame({
+        col: flat[col].map(_text_value).astype(pd.StringDtype("pyarrow"))
+        for col in flat.columns
+    })
+    return text, nested
+
+
+def _chunks(records, chunk_rows):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@log_function
+def profile_json(file, chunk_rows=STREAM_CHUNK_ROWS, sketch_precision=None):
+    """
+    Profile a JSON or NDJSON file chunk by chunk. Returns a PROFILE_COLUMNS
+    frame with one row per flattened field in order of first appearance;
+    uniqueness is estimated with HyperLogLog sketches as for streamed CSVs.
+    """
+    if sketch_precision is None:
+        sketch_precision = PROFILING_CONFIG.get('hll_precision', HLL_PRECISION)
+    accumulator = ProfileAccumulator([], sketch_precision)
+    nested = set()
+    for records in _chunks(iter_records(file), chunk_rows):
+        frame, chunk_nested = flatten_records(records)
+        nested |= chunk_nested
+        accumulator.add_columns(frame.columns)
+        accumulator.update(frame.reindex(columns=accumulator.columns))
+    if not accumulator.columns:
+        return pd.DataFrame(columns=PROFILE_COLUMNS)
+    logger.debug(
+        f"Profiled {accumulator.row_count} JSON records into {len(accumulator.columns)} fields"
+    )
+    profile = accumulator.result()
+    profile.loc[profile["field_nm"].isin(nested), "datatype_nm"] = VARIANT
+    return profile
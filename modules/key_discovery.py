@@ -0,0 +1,118 @@
+"""
+Composite candidate-key discovery for Data Onboarding Framework.
+
+Finds minimal unique column combinations (UCCs) with a level-wise search in
+the style of TANE: level k only considers combinations whose every
+(k-1)-subset is known to be non-unique, so supersets of a key are never
+tested. Uniqueness is tested on a row sample first (a duplicate in the
+sample is a duplicate in the full data) and confirmed on the full frame only
+for combinations that survive the sample.
+"""
+import logging
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from modules.logging_setup import log_function
+
+logger = logging.getLogger(__name__)
+
+
+class _Encoder:
+    """Integer-coded columns of a frame, factorized on first use."""
+
+    def __init__(self, df):
+        self.df = df
+        self.n_rows = len(df)
+        self._codes = {}
+
+    def column(self, col):
+        if col not in self._codes:
+            codes, uniques = pd.factorize(self.df[col], use_na_sentinel=False)
+            self._codes[col] = (codes.astype(np.int64), len(uniques))
+        return self._codes[col]
+
+    def is_unique(self, combo):
+        """True if no two rows share the same values on every column of combo."""
+        encoded = [self.column(col) for col in combo]
+        if np.prod([float(card) for _, card in encoded]) < self.n_rows:
+            # Too few distinct value combinations to give every row its own.
+            return False
+        codes, card = encoded[0]
+        for other, other_card in encoded[1:]:
+            codes, uniques = pd.factorize(codes * other_card + other)
+            card = len(uniques)
+        return card == self.n_rows
+
+
+def _next_level(non_keys, width):
+    """Apriori join: combinations of width whose every subset is a known non-key."""
+    known = set(non_keys)
+    ordered = sorted(non_keys)
+    candidates = []
+    for i, left in enumerate(ordered):
+        for right in ordered[i + 1:]:
+            if left[:-1] != right[:-1]:
+                break
+            combo = left + (right[-1],)
+            if all(sub in known for sub in combinations(combo, width - 1)):
+                candidates.append(combo)
+    return candidates
+
+
+@log_function
+def discover_keys(
+    df, max_width=3, sample_rows=100000, max_columns=25, columns=None, random_state=0
+):
+    """
+    Return the minimal unique column combinations of df up to max_width
+    columns, narrowest first. Only null-free columns are considered (pass
+    columns to skip the null scan when it is already known), and only the
+    max_columns of them with the most distinct values on the sample.
+    """
+    if df.empty:
+        return []
+    if columns is None:
+        columns = [col for col in df.columns if df[col].notna().all()]
+    sample = df[columns]
+    if len(df) > sample_rows:
+        sample = sample.sample(n=sample_rows, random_state=random_state)
+    sample_enc = _Encoder(sample)
+    full_enc = _Encoder(df[columns])
+
+    ranked = sorted(columns, key=lambda col: -sample_enc.column(col)[1])[:max_columns]
+
+    def _unique(combo):
+        names = [ranked[idx] for idx in combo]
+        return sample_enc.is_unique(names) and full_enc.is_unique(names)
+
+    keys = []
+    # Combinations are tuples of ascending indexes into ranked, which keeps
+    # the apriori join in _next_level a prefix match over a sorted list.
+    level = [(idx,) for idx in range(len(ranked))]
+    width = 1
+    while level:
+        non_keys = []
+        for combo in level:
+            if _unique(combo):
+                keys.append(tuple(ranked[idx] for idx in combo))
+            else:
+                non_keys.append(combo)
+        logger.debug(f"Key discovery level {width}: {len(level)} candidates, {len(keys)} keys so far")
+        width += 1
+        level = _next_level(non_keys, width) if width <= max_width else []
+    return keys
+
+
+def choose_key(keys, max_length=None):
+    """
+    Pick one key from discover_keys output: the narrowest, then the one with
+    the smallest combined max length (cheapest to hash and compare).
+    """
+    if not keys:
+        return ()
+    max_length = max_length or {}
+    return min(keys, key=lambda combo: (
+        len(combo), sum(int(max_length.get(col, 0)) for col in combo)
+    ))
@@ -1,12 +1,54 @@
 import logging
 import os
+import re
 import pandas as pd
+from modules.archives import is_archive, strip_compression
+from modules.columnar import COLUMNAR_EXTENSIONS
+from modules.json_profiler import JSON_EXTENSIONS
+from modules.config import config
+from modules.ddl import type_size_scale
+from modules.delta_keys import detect_delta_keys
+from modules.key_discovery import choose_key, discover_keys
 from modules.logging_setup import log_function
-from modules.sql_generator import infer_snowflake_type
+from modules.profile_cache import cache_key, profile_cache
+from modules.profile_state import batch_digest, profile_state_store
+from modules.profiler import HLL_PRECISION, ProfileAccumulator, profile_dataframe
+from modules.sniffer import sniff_csv, table_info_values
+from modules.table_layout import recommend_layout
 
 logger = logging.getLogger(__name__)
 
-SUPPORTED_EXTENSIONS = [".csv", ".xlsx"]
+SUPPORTED_EXTENSIONS = [".csv", ".xlsx"] + COLUMNAR_EXTENSIONS + JSON_EXTENSIONS
+
+PROFILING_CONFIG = config.get('profiling', {})
+
+# CSV (and fully profiled columnar) uploads at or above this size are
+# profiled in streaming mode.
+STREAM_THRESHOLD_BYTES = int(
+    PROFILING_CONFIG.get('stream_threshold_mb', 256) * 1024 * 1024
+)
+# "exact" or "approximate" (HyperLogLog candidates confirmed exactly).
+KEY_DETECTION = PROFILING_CONFIG.get('key_detection', 'exact')
+KEY_ERROR = PROFILING_CONFIG.get('key_error', 0.01)
+# Composite key discovery; a max width of 1 disables it.
+KEY_MAX_WIDTH = PROFILING_CONFIG.get('key_max_width', 3)
+KEY_SAMPLE_ROWS = PROFILING_CONFIG.get('key_sample_rows', 100000)
+KEY_MAX_COLUMNS = PROFILING_CONFIG.get('key_max_columns', 25)
+
+FIELD_INFO_COLUMNS = [
+    "src_nm", "src_table_nm", "field_nm", "field_posn_nbr", "datatype_nm",
+    "datatype_size_val", "datatype_scale_val", "key_ind", "check_table",
+    "field_desc", "dprct_ind", "partitn_ind", "sort_key_ind", "dist_key_ind",
+    "proc_stage_cd", "catlg_flg", "dblqt_repl_flg", "delta_key_ind"
+]
+
+
+# Column statistics stored in sys_config_table_field_stats, one row per field.
+FIELD_STATS_COLUMNS = [
+    "src_nm", "src_table_nm", "field_nm", "field_posn_nbr", "row_cnt", "null_ratio",
+    "distinct_cnt", "min_val", "max_val", "top_values", "histogram", "avg_run_len",
+    "max_byte_len"
+]
 
 
 """
@@ -15,91 +57,411 @@ Metadata extraction utilities for Data Onboarding Framework.
 
 
 @log_function
-def extract_metadata_from_dataframe(df, src_nm, table_nm):
-    """Extract metadata from DataFrame for a given table."""
+def extract_metadata_from_dataframe(df, src_nm, table_nm, key_detection=None, incremental=False):
+    """
+    Extract metadata from DataFrame for a given table.
+    key_detection overrides profiling.key_detection ("exact" or "approximate").
+    With incremental=True, df holds only the new rows of an already
+    profiled table and is merged into the table's stored profile state.
+    """
     logger.debug(f"Extracting metadata for src={src_nm}, table={table_nm}")
     if df.empty:
         return pd.DataFrame()
-    name_without_ext = os.path.splitext(table_nm)[0]
-    redshift_table_nm = name_without_ext.strip()
+    if incremental:
+        profile, key_columns = profile_table_incremental(df, src_nm, table_nm)
+    else:
+        profile, key_columns = profile_table(df, key_detection)
+    return extract_metadata_from_profile(profile, src_nm, table_nm, key_columns)
+
+
+@log_function
+def profile_table(df, key_detection=None):
+    """
+    Profile a DataFrame and pick its key.
+    Returns (profile, key_columns); this is the expensive, cacheable stage
+    that does not depend on src_nm or the table name.
+    """
     df.columns = df.columns.str.strip()
-    extracted_data = []
-    for counter, col in enumerate(df.columns, start=1):
-        col_data = df[col].dropna()
-        inferred_type = infer_snowflake_type(col_data)
-        max_length = col_data.astype(str).str.len().max() if not col_data.empty else 0
-        primary_key = (
-            "X" if col_data.nunique() == len(df) and not col_data.empty else ""
+    profile = profile_dataframe(
+        df, key_detection=key_detection or KEY_DETECTION, key_error=KEY_ERROR
+    )
+    return profile, detect_key(df, profile)
+
+
+@log_function
+def profile_table_incremental(df, src_nm, table_nm, store=None, batch_id=None):
+    """
+    Profile the new rows in df, merge them into the stored state of
+    (src_nm, table_nm) and save the result. Returns (profile, key_columns)
+    for all rows seen so far; uniqueness across them is estimated from the
+    merged HyperLogLog sketches, so only single-column keys are found and
+    keys found once a stored state is merged are probable, not exact.
+    A batch (identified by batch_id, or by a digest of df) already merged
+    into the state is not merged again.
+    """
+    store = store or profile_state_store
+    df.columns = df.columns.str.strip()
+    batch_id = batch_id or batch_digest(df)
+    previous = store.get(src_nm, table_nm)
+    if previous is not None and batch_id in previous.batches:
+        logger.info(f"Batch {batch_id} is already merged into the profile of {src_nm}.{table_nm}")
+        profile = previous.result()
+        return profile, detect_key(None, profile)
+    accumulator = ProfileAccumulator(
+        df.columns, PROFILING_CONFIG.get('hll_precision', HLL_PRECISION)
+    )
+    accumulator.update(df)
+    accumulator.batches.append(batch_id)
+    if previous is not None:
+        logger.info(
+            f"Merging {len(df)} new rows into the profile of {previous.row_count} rows "
+            f"for {src_nm}.{table_nm}"
         )
-        extracted_data.append({
-            "src_nm": src_nm,
-            "src_table_nm": redshift_table_nm,
-            "field_nm": col,
-            "field_posn_nbr": counter,
-            "datatype_nm": inferred_type,
-            "datatype_size_val": max_length if max_length else "",
-            "datatype_scale_val": max_length if max_length else "",
-            "key_ind": primary_key,
-            "check_table": '',
-            "field_desc": '',
-            "dprct_ind": '',
-            "partitn_ind": '',
-            "sort_key_ind": '',
-            "dist_key_ind": '',
-            "proc_stage_cd": '',
-            "catlg_flg": '',
-            "dblqt_repl_flg": '',
-            "delta_key_ind": ''
-        })
-    return pd.DataFrame(extracted_data)
+        accumulator = previous.merge(accumulator)
+    store.put(src_nm, table_nm, accumulator)
+    profile = accumulator.result()
+    return profile, detect_key(None, profile)
+
+
+@log_function
+def detect_key(df, profile):
+    """
+    Pick the table key: the narrowest single unique column if there is one,
+    otherwise the best minimal composite key found by key discovery.
+    Without the data (df is None, e.g. streamed input) only single columns
+    are considered.
+    """
+    max_length = dict(zip(profile["field_nm"], profile["max_length"]))
+    unique_columns = profile.loc[profile["is_unique"], "field_nm"]
+    if not unique_columns.empty:
+        return choose_key([(col,) for col in unique_columns], max_length)
+    if df is None or KEY_MAX_WIDTH < 2 or profile.empty:
+        return ()
+    keys = discover_keys(
+        df, max_width=KEY_MAX_WIDTH, sample_rows=KEY_SAMPLE_ROWS,
+        max_columns=KEY_MAX_COLUMNS,
+        columns=list(profile.loc[profile["null_count"] == 0, "field_nm"])
+    )
+    return choose_key(keys, max_length)
+
+
+@log_function
+def extract_metadata_from_profile(profile, src_nm, table_nm, key_columns=()):
+    """
+    Shape a column profile into sys_config_table_field_info rows.
+    Columns flagged unique by the profile get key_ind; the columns of the
+    chosen table key get both key_ind and delta_key_ind, which also marks
+    the incremental-load watermark found by modules.delta_keys. partitn_ind,
+    sort_key_ind and dist_key_ind mark the layout recommended by
+    modules.table_layout.
+    """
+    if profile.empty or not profile["row_count"].iloc[0]:
+        return pd.DataFrame()
+    src_table_nm = os.path.splitext(table_nm)[0].strip()
+    in_key = profile["field_nm"].isin(key_columns)
+    size_scale = [type_size_scale(datatype) for datatype in profile["datatype_nm"]]
+    layout = recommend_layout(profile, key_columns)
+    delta_keys = detect_delta_keys(profile)
+
+    def _indicator(columns):
+        return profile["field_nm"].isin(columns).map({True: "X", False: ""})
+
+    return pd.DataFrame({
+        "src_nm": src_nm,
+        "src_table_nm": src_table_nm,
+        "field_nm": profile["field_nm"],
+        "field_posn_nbr": range(1, len(profile) + 1),
+        "datatype_nm": profile["datatype_nm"],
+        "datatype_size_val": [size for size, _ in size_scale],
+        "datatype_scale_val": [scale for _, scale in size_scale],
+        "key_ind": (profile["is_unique"] | in_key).map({True: "X", False: ""}),
+        "partitn_ind": _indicator(layout["partition"]),
+        "sort_key_ind": _indicator(layout["sort_key"]),
+        "dist_key_ind": _indicator(layout["dist_key"]),
+        "delta_key_ind": (in_key | profile["field_nm"].isin(delta_keys)).map({True: "X", False: ""}),
+    }).reindex(columns=FIELD_INFO_COLUMNS, fill_value='')
+
+
+@log_function
+def extract_field_stats_from_profile(profile, src_nm, table_nm):
+    """
+    Shape the column statistics of a profile into
+    sys_config_table_field_stats rows. Profiles without statistics (e.g.
+    schema-only columnar profiles) give an empty frame.
+    """
+    if profile.empty or "null_ratio" not in profile or not profile["row_count"].iloc[0]:
+        return pd.DataFrame(columns=FIELD_STATS_COLUMNS)
+    return pd.DataFrame({
+        "src_nm": src_nm,
+        "src_table_nm": os.path.splitext(table_nm)[0].strip(),
+        "field_nm": profile["field_nm"],
+        "field_posn_nbr": range(1, len(profile) + 1),
+        "row_cnt": profile["row_count"],
+        "null_ratio": profile["null_ratio"],
+        "distinct_cnt": profile["distinct_count"],
+        "min_val": profile["min_val"],
+        "max_val": profile["max_val"],
+        "top_values": profile["top_values"],
+        "histogram": profile["histogram"],
+        "avg_run_len": profile.get("avg_run_length"),
+        "max_byte_len": profile.get("max_bytes"),
+    }, columns=FIELD_STATS_COLUMNS)
 
 
 @log_function
-def extract_metadata_from_excel(xls, src_nm, table_nm):
-    """Extract metadata from first sheet of Excel file."""
+def extract_metadata_from_excel(xls, src_nm, table_nm, sheet_name=None):
+    """
+    Extract metadata from one sheet (the first by default) of an Excel file.
+    xls may be a pd.ExcelFile or a path or file object, which is streamed
+    in read-only mode.
+    """
+    from modules.file_processor import EXCEL_SAMPLE_ROWS, read_excel
     logger.debug(
         f"Extracting metadata from Excel for src={src_nm}, table={table_nm}"
     )
-    sheet_name = xls.sheet_names[0]  # Use first sheet
-    df = xls.parse(sheet_name, dtype=str)
+    if isinstance(xls, pd.ExcelFile):
+        df = xls.parse(sheet_name or xls.sheet_names[0], dtype=str)
+    else:
+        df = read_excel(xls, sheet_name=sheet_name, sample_rows=EXCEL_SAMPLE_ROWS)
     if df.empty:
         return pd.DataFrame()
     df.columns = df.columns.str.strip()
     return extract_metadata_from_dataframe(df, src_nm, table_nm)
 
 
+def _profiling_params(ext, streamed, sample=False):
+    """Settings that change profiling output, used in the profile cache key."""
+    return {
+        "ext": ext,
+        "streamed": streamed,
+        "sample": sample,
+        "key_detection": KEY_DETECTION,
+        "key_error": KEY_ERROR,
+        "key_max_width": KEY_MAX_WIDTH,
+        "key_sample_rows": KEY_SAMPLE_ROWS,
+        "key_max_columns": KEY_MAX_COLUMNS,
+        "profiling": PROFILING_CONFIG,
+    }
+
+
 @log_function
-def extract_from_uploaded_file(uploaded_file, src_nm, table_nm, generate_sys_config_table_info_fn):
-    """Process uploaded file and extract metadata and table config info."""
-    from modules.file_processor import process_uploaded_zip, read_csv, read_excel
+def profile_upload(uploaded_file, ext, streamed, sample=False):
+    """
+    Profile every table in an upload.
+    Returns a list of dicts with file_name, profile, key_columns,
+    archive_member (True for tables that came out of a ZIP), sheet_name and
+    file_format (table-info values sniffed from delimited files).
+    With sample=True CSVs are profiled from a sample of rows where that
+    pays off (see modules.sampling); their profiles carry confidence and
+    full_scan columns.
+    """
+    from modules.columnar import profile_columnar
+    from modules.json_profiler import profile_json
+    from modules.sampling import profile_csv_sample
+    from modules.file_processor import (
+        profile_archive, profile_csv_stream, profile_excel_sheets, profile_zip_members,
+        read_csv, upload_size, zip_member_tables
+    )
+    filename = uploaded_file.name
+    file_format = {}
+    sampled = None
+    if ext == ".csv":
+        csv_format = sniff_csv(uploaded_file)
+        file_format = table_info_values(csv_format)
+        if sample:
+            sampled = profile_csv_sample(uploaded_file, upload_size(uploaded_file), csv_format)
+    if sampled is not None:
+        logger.info(f"Sampled profile for upload: {filename}")
+        tables = [(filename, *sampled, None)]
+    elif ext == ".csv" and streamed:
+        logger.info(f"Streaming profile for large upload: {filename}")
+        profile = profile_csv_stream(uploaded_file, csv_format=csv_format)
+        tables = [(filename, profile, detect_key(None, profile), None)]
+    elif ext == ".csv":
+        df = read_csv(uploaded_file, csv_format=csv_format)
+        profile, key_columns = (
+            profile_table(df) if not df.empty else (pd.DataFrame(), ())
+        )
+        tables = [(filename, profile, key_columns, None)]
+    elif ext == ".xlsx":
+        tables = _sheet_tables(filename, profile_excel_sheets(uploaded_file))
+    elif ext in COLUMNAR_EXTENSIONS:
+        profile, key_columns = profile_columnar(uploaded_file, ext, streamed)
+        tables = [(filename, profile, key_columns, None)]
+    elif ext in JSON_EXTENSIONS:
+        profile = profile_json(uploaded_file)
+        tables = [(filename, profile, detect_key(None, profile), None)]
+    elif ext == ".zip":
+        return zip_member_tables(profile_zip_members(uploaded_file, sample=sample))
+    elif is_archive(filename):
+        results = profile_archive(uploaded_file, filename)
+        if is_archive(strip_compression(filename)):
+            return zip_member_tables(results)
+        if not results:
+            raise ValueError("Unsupported file type.")
+        # A single compressed file is one table, named as if uncompressed.
+        result = results[0]
+        if result["status"] == "error":
+            raise ValueError(f"Error reading {filename}: {result['error']}")
+        file_format = result["file_format"]
+        tables = [(
+            strip_compression(filename), result["profile"], result["key_columns"], None
+        )]
+    else:
+        raise ValueError("Unsupported file type.")
+    return [{
+        "file_name": file_name,
+        "profile": profile,
+        "key_columns": key_columns,
+        "archive_member": False,
+        "sheet_name": sheet_name,
+        "file_format": file_format,
+    } for file_name, profile, key_columns, sheet_name in tables]
+
+
+def _sheet_tables(filename, results):
+    """
+    Turn profile_excel_sheets results into (file_name, profile, key_columns,
+    sheet_name) tuples. A workbook with a single non-empty sheet stays one
+    table named after the upload; otherwise every non-empty sheet is its
+    own table.
+    """
+    for result in results:
+        if result["status"] == "error":
+            raise ValueError(f"Error reading sheet {result['sheet']}: {result['error']}")
+    sheets = [result for result in results if not result["profile"].empty]
+    if len(sheets) <= 1:
+        result = sheets[0] if sheets else results[0]
+        return [(filename, result["profile"], result["key_columns"], None)]
+    return [
+        (filename, result["profile"], result["key_columns"], result["sheet"])
+        for result in sheets
+    ]
+
+
+def sheet_table_name(table_nm, sheet_name):
+    """Name of the table profiled from one sheet of a multi-sheet workbook."""
+    sheet = re.sub(r"\W+", "_", sheet_name).strip("_")
+    return f"{os.path.splitext(table_nm)[0].strip()}_{sheet}"
+
+
+def _apply_file_format(table_info_df, file_format):
+    """
+    Prefill table-info columns from the sniffed file format. The header
+    count always comes from the file; the delimiter, encoding and newline
+    only fill values the user left blank.
+    """
+    if not file_format:
+        return table_info_df
+    table_info_df = table_info_df.copy()
+    for column, value in file_format.items():
+        if column not in table_info_df.columns:
+            continue
+        blank = table_info_df[column].isna() | (table_info_df[column].astype(str) == "")
+        if column == "file_hdr_cnt":
+            blank[:] = True
+        table_info_df.loc[blank, column] = value
+    return table_info_df
+
+
+def _table_names(table, table_nm):
+    """(table name, table-info file name) of one profile_upload entry."""
+    info_name = table["file_name"]
+    name = table["file_name"] if table["archive_member"] else table_nm
+    if table.get("sheet_name") is not None:
+        name = sheet_table_name(table_nm, table["sheet_name"])
+        info_name = name + os.path.splitext(table["file_name"])[1]
+    return name, info_name
+
+
+@log_function
+def render_field_stats(tables, src_nm, table_nm):
+    """Column statistics of profile_upload output, named as render_tables names the tables."""
+    frames = [
+        extract_field_stats_from_profile(table["profile"], src_nm, _table_names(table, table_nm)[0])
+        for table in tables
+    ]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=FIELD_STATS_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+@log_function
+def render_tables(tables, src_nm, table_nm, generate_sys_config_table_info_fn):
+    """
+    Turn profile_upload output into the metadata and table-info frames.
+    A single uploaded file is named after table_nm, and each sheet of a
+    multi-sheet workbook after table_nm plus the sheet name; ZIP members are
+    named after their file name and only get table info when they have
+    columns.
+    """
+    all_metadata = []
+    table_infos = []
+    for table in tables:
+        name, info_name = _table_names(table, table_nm)
+        metadata_df = extract_metadata_from_profile(
+            table["profile"], src_nm, name, table["key_columns"]
+        )
+        all_metadata.append(metadata_df)
+        if not table["archive_member"] or not metadata_df.empty:
+            table_infos.append(_apply_file_format(
+                generate_sys_config_table_info_fn(info_name), table.get("file_format")
+            ))
+    if len(tables) == 1 and not tables[0]["archive_member"]:
+        return all_metadata[0], table_infos[0]
+    metadata_df = pd.concat(
+        all_metadata, ignore_index=True
+    ) if all_metadata else pd.DataFrame()
+    table_info_df = pd.concat(
+        table_infos, ignore_index=True
+    ) if table_infos else pd.DataFrame()
+    return metadata_df, table_info_df
+
+
+@log_function
+def extract_from_uploaded_file(
+    uploaded_file, src_nm, table_nm, generate_sys_config_table_info_fn,
+    sample=None, return_report=False, return_stats=False
+):
+    """
+    Process uploaded file and extract metadata and table config info.
+    Profiles are cached by file content and profiling settings, so a rerun
+    or re-upload only re-renders the frames for the current src_nm and
+    table-info settings.
+    sample (profiling.sample_uploads by default) profiles large CSVs from a
+    sample of rows. With return_report=True a DataFrame with the
+    confidence of every column is appended to the result, and with
+    return_stats=True one with the column statistics (FIELD_STATS_COLUMNS).
+    """
+    from modules.file_processor import upload_size
+    from modules.sampling import SAMPLE_UPLOADS, confidence_report
+    if sample is None:
+        sample = SAMPLE_UPLOADS
     filename = uploaded_file.name
     ext = os.path.splitext(filename)[1].lower()
     logger.info(f"Processing uploaded file: {filename}")
     try:
-        if ext == ".csv":
-            df = read_csv(uploaded_file)
-            metadata_df = extract_metadata_from_dataframe(
-                df, src_nm, table_nm
-            )
-            table_info_df = generate_sys_config_table_info_fn(
-                filename
-            )
-        elif ext == ".xlsx":
-            df = read_excel(uploaded_file)
-            metadata_df = extract_metadata_from_dataframe(
-                df, src_nm, table_nm
-            )
-            table_info_df = generate_sys_config_table_info_fn(
-                filename
-            )
-        elif ext == ".zip":
-            metadata_df, table_info_df = process_uploaded_zip(
-                uploaded_file, src_nm, table_nm,
-                generate_sys_config_table_info_fn
-            )
+        streamed = (
+            ext in [".csv"] + COLUMNAR_EXTENSIONS
+            and upload_size(uploaded_file) >= STREAM_THRESHOLD_BYTES
+        )
+        key = cache_key(uploaded_file, _profiling_params(ext, streamed, sample))
+        tables = profile_cache.get(key)
+        if tables is None:
+            tables = profile_upload(uploaded_file, ext, streamed, sample)
+            profile_cache.put(key, tables)
         else:
-            raise ValueError("Unsupported file type.")
-        return metadata_df, table_info_df
+            logger.info(f"Profile cache hit for {filename}")
+        metadata_df, table_info_df = render_tables(
+            tables, src_nm, table_nm, generate_sys_config_table_info_fn
+        )
+        result = (metadata_df, table_info_df)
+        if return_report:
+            result += (confidence_report(tables),)
+        if return_stats:
+            result += (render_field_stats(tables, src_nm, table_nm),)
+        return result
     except Exception as e:
         logger.error(f"Error extracting from uploaded file: {e}")
         raise
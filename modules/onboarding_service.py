@@ -70,12 +70,16 @@ def get_pre_proc_info(src_nm, dataset_nm):
 
 
 @log_function
-def generate_sql_scripts(df_metadata_df, src_nm, dataset_nm, table_nm, df_dataset_info, df_pre_proc_info, df_table_info):
-    land_sql_script = sql_generator.generate_create_table_script(df_metadata_df, 'land', src_nm, dataset_nm)
-    stage_sql_script = sql_generator.generate_create_table_script(df_metadata_df, 'stage', src_nm, dataset_nm)
+def generate_sql_scripts(df_metadata_df, src_nm, dataset_nm, table_nm, df_dataset_info, df_pre_proc_info, df_table_info, df_field_stats=None, dialect=None):
+    land_sql_script = sql_generator.generate_create_table_script(
+        df_metadata_df, 'land', src_nm, dataset_nm, dialect, df_field_stats
+    )
+    stage_sql_script = sql_generator.generate_create_table_script(
+        df_metadata_df, 'stage', src_nm, dataset_nm, dialect, df_field_stats
+    )
     rds_sql_script = sql_generator.generate_insert_statements(
         src_nm, dataset_nm, table_nm,
-        df_dataset_info, df_pre_proc_info, df_table_info, df_metadata_df
+        df_dataset_info, df_pre_proc_info, df_table_info, df_metadata_df, df_field_stats
     )
     return land_sql_script, stage_sql_script, rds_sql_script
 
@@ -108,3 +112,31 @@ def git_push_scripts(scripts, src_nm, dataset_nm):
 @log_function
 def insert_into_rds(rds_sql_script):
     return db.insert_statements_into_postgres(rds_sql_script)
+
+
+@log_function
+def load_into_rds(src_nm, dataset_nm, table_nm, df_dataset_info, df_pre_proc_info, df_table_info, df_metadata_df, df_field_stats=None, method=None):
+    """
+    Write the sys_config frames straight to RDS in one transaction (COPY or
+    execute_values, see db.load_dataframes) instead of running the
+    generated script, which stays the reviewed record of the change.
+    Configured tables are synced set-based through a staging table (see
+    sql_generator.sync_statements).
+    """
+    plan = sql_generator.plan_sys_config_writes(
+        src_nm, dataset_nm, table_nm, df_dataset_info, df_pre_proc_info, df_table_info, df_metadata_df
+    )
+    steps = []
+    for table_name, inserts, updates, where_keys in plan:
+        if updates.empty:
+            pass
+        elif sql_generator.UPSERT_STYLE == "update":
+            steps.append(sql_generator.create_update_statement(table_name, updates, where_keys))
+        else:
+            setup, apply = sql_generator.sync_statements(table_name, list(updates.columns), where_keys)
+            steps += setup + [(sql_generator.staging_table_name(table_name), updates)] + apply
+        steps.append((table_name, inserts))
+    if df_field_stats is not None and not df_field_stats.empty:
+        steps += sql_generator.field_stats_deletes(df_field_stats)
+        steps.append((sql_generator.FIELD_STATS_TABLE, df_field_stats))
+    return db.load_dataframes(steps, method)
@@ -0,0 +1,152 @@
+"""
+Content-addressed cache for profiling results.
+
+Entries are keyed by a streaming SHA-256 of the uploaded bytes plus the
+profiling parameters, so re-uploads and Streamlit reruns of the same file
+skip the profiling pass. An in-memory LRU tier is always used; an on-disk
+tier is added when a cache directory is configured.
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from modules.config import config
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of cached profiles changes so stale disk entries miss.
+CACHE_VERSION = 1
+
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+def file_digest(file):
+    """Return the SHA-256 hex digest of a file-like object, restoring its position."""
+    position = file.tell()
+    file.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: file.read(READ_CHUNK_BYTES), b""):
+        digest.update(block)
+    file.seek(position)
+    return digest.hexdigest()
+
+
+def cache_key(file, params):
+    """Combine the content digest of file with the profiling parameters."""
+    payload = json.dumps(
+        {"version": CACHE_VERSION, "content": file_digest(file), "params": params},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ProfileCache:
+    """
+    Thread-safe LRU cache with an optional on-disk tier.
+    Values are deep-copied on the way in and out so callers cannot mutate
+    cached state.
+    """
+
+    def __init__(self, max_entries=32, disk_dir=None, max_disk_entries=256):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, value)
+        return copy.deepcopy(value)
+
+    def put(self, key, value):
+        """Store value under key in memory and, if configured, on disk."""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._store(key, value)
+        self._write_disk(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable profile cache entry {path}: {e}")
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except Exception as e:
+            logger.warning(f"Could not write profile cache entry {path}: {e}")
+
+    def _prune_disk(self):
+        paths = [
+            os.path.join(self.disk_dir, name)
+            for name in os.listdir(self.disk_dir) if name.endswith(".pkl")
+        ]
+        if len(paths) <= self.max_disk_entries:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_CACHE_CONFIG = config.get('profile_cache', {})
+
+# Process-wide cache shared by every Streamlit session.
+profile_cache = ProfileCache(
+    max_entries=_CACHE_CONFIG.get('max_entries', 32),
+    disk_dir=_CACHE_CONFIG.get('disk_dir') or None,
+    max_disk_entries=_CACHE_CONFIG.get('max_disk_entries', 256),
+)
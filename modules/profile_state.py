@@ -0,0 +1,117 @@
+"""
+Stored per-table profile state for incremental re-profiling.
+
+When a table is re-onboarded with a new file, the new rows are profiled on
+their own and merged into the state saved for the table (counts, max
+lengths, type lattice states and HyperLogLog sketches, see
+ProfileAccumulator.to_state), so the cost is proportional to the new data
+rather than the full history. Each state records the content digests of
+the batches merged into it, so re-running the same upload (as Streamlit
+reruns do) does not count its rows twice. Exact key checks are not stored,
+so keys found after a merge are probable. The most recently used states
+(profile_state.max_tables) are kept in memory and, when profile_state.dir
+is configured, every state is kept on disk as one file per table.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from modules.config import config
+from modules.profiler import ProfileAccumulator
+
+logger = logging.getLogger(__name__)
+
+
+def batch_digest(df):
+    """SHA-256 hex digest of a batch's column names and values."""
+    digest = hashlib.sha256("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _state_name(src_nm, table_nm):
+    return re.sub(r"[^\w.-]+", "_", f"{src_nm}__{table_nm}".strip())
+
+
+class ProfileStateStore:
+    """
+    Thread-safe map from (src_nm, table_nm) to a saved ProfileAccumulator
+    state, holding at most max_tables states in memory (least recently used
+    first out).
+    """
+
+    def __init__(self, state_dir=None, max_tables=64):
+        self.state_dir = state_dir
+        self.max_tables = max_tables
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.state_dir, f"{name}.pkl")
+
+    def get(self, src_nm, table_nm):
+        """Return the stored ProfileAccumulator for a table, or None."""
+        name = _state_name(src_nm, table_nm)
+        with self._lock:
+            state = self._states.get(name)
+            if state is not None:
+                self._states.move_to_end(name)
+        if state is None and self.state_dir:
+            try:
+                with open(self._path(name), "rb") as f:
+                    state = pickle.load(f)
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable profile state for {name}: {e}")
+                return None
+        return None if state is None else ProfileAccumulator.from_state(state)
+
+    def put(self, src_nm, table_nm, accumulator):
+        """Save the state of accumulator as the table's profile so far."""
+        name = _state_name(src_nm, table_nm)
+        state = accumulator.to_state()
+        with self._lock:
+            self._states[name] = state
+            self._states.move_to_end(name)
+            while len(self._states) > self.max_tables:
+                evicted, _ = self._states.popitem(last=False)
+                if not self.state_dir:
+                    logger.info(f"Dropped the in-memory profile state of {evicted}")
+        if not self.state_dir:
+            return
+        path = self._path(name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write profile state {path}: {e}")
+
+    def delete(self, src_nm, table_nm):
+        """Forget a table's state, e.g. before a full re-profile."""
+        name = _state_name(src_nm, table_nm)
+        with self._lock:
+            self._states.pop(name, None)
+        if self.state_dir:
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+
+
+_STATE_CONFIG = config.get('profile_state', {})
+
+# Process-wide store shared by every Streamlit session.
+profile_state_store = ProfileStateStore(
+    _STATE_CONFIG.get('dir') or None, _STATE_CONFIG.get('max_tables', 64)
+)
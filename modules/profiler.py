@@ -0,0 +1,459 @@
+"""
+Columnar profiling engine for Data Onboarding Framework.
+
+Computes sized type, max length, null count and uniqueness for every column
+of a DataFrame in batched passes over blocks of columns instead of one
+Series pipeline per column. The same accumulator is fed one chunk at a time when a
+file is streamed, so peak memory is bounded by the chunk size.
+"""
+import logging
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from modules.column_stats import COLUMN_STATS, STATS_COLUMNS, ColumnStats
+from modules.config import config
+from modules.logging_setup import log_function
+from modules.sketches import HyperLogLog, hash_values
+from modules.type_inference import TypeState, arrow_text, classify_block
+
+logger = logging.getLogger(__name__)
+
+PROFILE_COLUMNS = [
+    "field_nm", "row_count", "null_count", "max_length", "max_bytes", "datatype_nm",
+    "distinct_count", "is_unique"
+]
+
+# Upper bound on the number of cells flattened into a single vectorized pass.
+BLOCK_CELLS = 4_000_000
+
+HLL_PRECISION = 14
+
+# Memory for the value hashes that confirm sketched key candidates exactly;
+# candidates left over when it runs out are only probable keys.
+KEY_CHECK_BYTES = int(config.get('profiling', {}).get('key_check_mb', 256) * 1024 * 1024)
+
+KEY_DETECTION_EXACT = "exact"
+KEY_DETECTION_APPROXIMATE = "approximate"
+
+FLAG_KEYS = ("all_bool", "all_int", "all_dec", "int_digits", "scale")
+
+
+def _column_blocks(n_cols, n_rows, block_cells=BLOCK_CELLS):
+    """Yield (start, stop) column ranges whose cell count fits in one block."""
+    width = max(1, block_cells // max(n_rows, 1))
+    for start in range(0, n_cols, width):
+        yield start, min(start + width, n_cols)
+
+
+def _block_stats(block):
+    """
+    Flatten a block of columns into one Arrow string array (column-major)
+    and compute per-column stats with one kernel call per statistic.
+    """
+    n_rows, n_cols = block.shape
+    shape = (n_rows, n_cols)
+    columns = [arrow_text(block.iloc[:, idx]) for idx in range(n_cols)]
+    flat = pa.chunked_array(columns, type=pa.large_string())
+    present = flat.is_valid().to_numpy()
+    text = pc.fill_null(flat, "")
+
+    lengths = pc.utf8_length(text).to_numpy()
+    stats = classify_block(text, present, shape, lengths)
+    lengths = lengths.reshape(shape, order="F")
+    # Redshift sizes VARCHAR in bytes, so the UTF-8 width is kept as well.
+    byte_lengths = pc.binary_length(text).to_numpy().reshape(shape, order="F")
+    present = present.reshape(shape, order="F")
+    stats.update({
+        "text": columns,
+        "present": present,
+        "non_null": present.sum(axis=0),
+        "max_length": lengths.max(axis=0) if n_rows else np.zeros(n_cols, dtype=int),
+        "max_bytes": byte_lengths.max(axis=0) if n_rows else np.zeros(n_cols, dtype=int),
+    })
+    return stats
+
+
+class ProfileAccumulator:
+    """
+    Running profile state for a fixed set of columns.
+    Feed chunks with update() and read the profile with result().
+    """
+
+    def __init__(
+        self, columns, sketch_precision=None, block_cells=BLOCK_CELLS, column_stats=None,
+        key_check_bytes=None
+    ):
+        """
+        sketch_precision enables one HyperLogLog per column (None disables
+        distinct counting); it may also be an int or a callable returning a
+        fresh sketch. column_stats (profiling.column_stats by default) also
+        gathers min/max, frequent values and histograms (see
+        modules.column_stats). With sketches, the value hashes of key
+        candidates are kept, up to key_check_bytes (profiling.key_check_mb
+        by default, 0 to skip), so is_unique can confirm them exactly.
+        """
+        self.columns = list(columns)
+        n_cols = len(self.columns)
+        self.block_cells = block_cells
+        self.row_count = 0
+        self.null_count = np.zeros(n_cols, dtype=np.int64)
+        self.max_length = np.zeros(n_cols, dtype=np.int64)
+        self.max_bytes = np.zeros(n_cols, dtype=np.int64)
+        self.types = [TypeState() for _ in range(n_cols)]
+        # Digests of the batches merged into this state (see
+        # modules.profile_state.batch_digest), so a batch is merged once.
+        self.batches = []
+        if sketch_precision is None or callable(sketch_precision):
+            self._new_sketch = sketch_precision
+        else:
+            self._new_sketch = partial(HyperLogLog, sketch_precision)
+        self.sketches = (
+            None if self._new_sketch is None
+            else [self._new_sketch() for _ in range(n_cols)]
+        )
+        self.key_check_bytes = (
+            0 if self.sketches is None
+            else KEY_CHECK_BYTES if key_check_bytes is None else key_check_bytes
+        )
+        # Per column, the sorted distinct hashes of each chunk while it is
+        # still a key candidate, else None.
+        self.key_hashes = [[] if self.key_check_bytes else None for _ in range(n_cols)]
+        self.key_check_overflow = False
+        self._key_bytes = 0
+        if column_stats is None:
+            column_stats = COLUMN_STATS
+        self.stats = [ColumnStats() for _ in range(n_cols)] if column_stats else None
+
+    def add_columns(self, columns):
+        """
+        Start tracking columns first seen in a later chunk (e.g. new JSON
+        fields). Every row folded in so far counts as null for them.
+        """
+        known = set(self.columns)
+        new = [col for col in columns if col not in known]
+        if not new:
+            return
+        self.columns.extend(new)
+        self.null_count = np.concatenate(
+            [self.null_count, np.full(len(new), self.row_count, dtype=np.int64)]
+        )
+        self.max_length = np.concatenate(
+            [self.max_length, np.zeros(len(new), dtype=np.int64)]
+        )
+        self.max_bytes = np.concatenate([self.max_bytes, np.zeros(len(new), dtype=np.int64)])
+        self.types.extend(TypeState() for _ in new)
+        # Rows already seen are nulls for the new columns.
+        self.key_hashes.extend(
+            [] if self.key_check_bytes and not self.row_count else None for _ in new
+        )
+        if self.sketches is not None:
+            self.sketches.extend(self._new_sketch() for _ in new)
+        if self.stats is not None:
+            self.stats.extend(ColumnStats() for _ in new)
+
+    def update(self, chunk):
+        """Fold one chunk with the same columns into the running state."""
+        n_rows = len(chunk)
+        for start, stop in _column_blocks(len(self.columns), n_rows, self.block_cells):
+            block = chunk.iloc[:, start:stop]
+            stats = _block_stats(block)
+            self.null_count[start:stop] += n_rows - stats["non_null"]
+            np.maximum(
+                self.max_length[start:stop], stats["max_length"],
+                out=self.max_length[start:stop]
+            )
+            np.maximum(
+                self.max_bytes[start:stop], stats["max_bytes"], out=self.max_bytes[start:stop]
+            )
+            for offset in range(stop - start):
+                idx = start + offset
+                if stats["non_null"][offset] == 0:
+                    continue
+
+                # The non-null values are selected at most once per column,
+                # however many passes ask for them.
+                cached = []
+
+                def _values(offset=offset, cached=cached):
+                    if not cached:
+                        col_data = block.iloc[:, offset]
+                        if stats["non_null"][offset] < n_rows:
+                            col_data = col_data[stats["present"][:, offset]]
+                        cached.append(col_data)
+                    return cached[0]
+
+                self.types[idx].observe(
+                    *(stats[key][offset] for key in FLAG_KEYS), _values
+                )
+                if self.sketches is not None:
+                    hashes = hash_values(_values())
+                    self.sketches[idx].add_hashes(hashes)
+                    self._track_key(idx, hashes)
+                if self.stats is not None:
+                    # The Arrow text of _block_stats, so nothing is converted twice.
+                    self.stats[idx].update(pc.drop_null(stats["text"][offset]), self.types[idx])
+        self.row_count += n_rows
+
+    def _key_hash_bytes(self):
+        return sum(part.nbytes for parts in self.key_hashes if parts for part in parts)
+
+    def _drop_key(self, idx):
+        if self.key_hashes[idx]:
+            self._key_bytes -= sum(part.nbytes for part in self.key_hashes[idx])
+        self.key_hashes[idx] = None
+
+    def _track_key(self, idx, hashes):
+        """Keep a chunk's hashes while the column can still be a key."""
+        parts = self.key_hashes[idx]
+        if parts is None:
+            return
+        distinct = np.unique(hashes)
+        if self.null_count[idx] or len(distinct) < len(hashes):
+            self._drop_key(idx)
+            return
+        if self._key_bytes + distinct.nbytes > self.key_check_bytes:
+            self._overflow_key_check()
+            return
+        parts.append(distinct)
+        self._key_bytes += distinct.nbytes
+
+    def _overflow_key_check(self):
+        if not self.key_check_overflow:
+            logger.warning(
+                f"Key check exceeded {self.key_check_bytes} bytes; remaining candidates are only probable keys"
+            )
+        self.key_check_overflow = True
+        self.key_hashes = [None] * len(self.columns)
+        self._key_bytes = 0
+
+    def merge(self, other):
+        """
+        Fold in an accumulator profiled from other rows of the same table,
+        e.g. a newly arrived file. Columns missing on either side count as
+        null for that side's rows. Both sides need sketches of the same
+        precision, or neither.
+        """
+        if (self.sketches is None) != (other.sketches is None):
+            raise ValueError("Cannot merge profiles with and without distinct sketches")
+        if (self.stats is None) != (other.stats is None):
+            raise ValueError("Cannot merge profiles with and without column statistics")
+        self.add_columns(other.columns)
+        index = {col: idx for idx, col in enumerate(self.columns)}
+        positions = np.array([index[col] for col in other.columns], dtype=np.int64)
+        self.null_count += other.row_count
+        if len(positions):
+            self.null_count[positions] += other.null_count - other.row_count
+            np.maximum.at(self.max_length, positions, other.max_length)
+            np.maximum.at(self.max_bytes, positions, other.max_bytes)
+        covered = set(positions.tolist())
+        for pos in range(len(self.columns)):
+            if pos not in covered and other.row_count:
+                self._drop_key(pos)
+        if other.key_check_overflow:
+            self._overflow_key_check()
+        if other.row_count and not other.key_check_bytes:
+            # Rows without kept hashes (e.g. a restored state) leave only
+            # the sketch estimate for every column.
+            self.key_check_bytes = 0
+            self.key_hashes = [None] * len(self.columns)
+        for idx, pos in enumerate(positions):
+            if self.key_hashes[pos] is not None:
+                theirs = other.key_hashes[idx]
+                self.key_hashes[pos] = None if theirs is None else self.key_hashes[pos] + theirs
+            self.types[pos].merge(other.types[idx])
+            if self.sketches is not None:
+                self.sketches[pos].merge(other.sketches[idx])
+            if self.stats is not None:
+                self.stats[pos].merge(other.stats[idx])
+        self.row_count += other.row_count
+        self.batches += [batch for batch in other.batches if batch not in self.batches]
+        self._key_bytes = self._key_hash_bytes()
+        if self.key_check_bytes and self._key_bytes > self.key_check_bytes:
+            self._overflow_key_check()
+        return self
+
+    def to_state(self):
+        """
+        Compact plain-data snapshot (column names, counts, type lattice
+        states, compressed sketches and column statistics) that from_state
+        restores. The key check hashes grow with every row, so they are not
+        kept: keys of a restored state are only probable (see is_unique).
+        """
+        return {
+            "columns": list(self.columns),
+            "row_count": int(self.row_count),
+            "null_count": self.null_count.tolist(),
+            "max_length": self.max_length.tolist(),
+            "max_bytes": self.max_bytes.tolist(),
+            "types": [state.to_state() for state in self.types],
+            "sketches": (
+                None if self.sketches is None
+                else [sketch.to_bytes() for sketch in self.sketches]
+            ),
+            "stats": None if self.stats is None else [stats.to_state() for stats in self.stats],
+            "batches": list(self.batches),
+        }
+
+    @classmethod
+    def from_state(cls, state, block_cells=BLOCK_CELLS):
+        sketches = state["sketches"]
+        if sketches is None:
+            precision = None
+        else:
+            precision = HyperLogLog.from_bytes(sketches[0]).precision if sketches else HLL_PRECISION
+        stats = state.get("stats")
+        accumulator = cls(
+            state["columns"], precision, block_cells, stats is not None, key_check_bytes=0
+        )
+        accumulator.row_count = state["row_count"]
+        accumulator.null_count = np.array(state["null_count"], dtype=np.int64)
+        accumulator.max_length = np.array(state["max_length"], dtype=np.int64)
+        # States saved before byte widths were kept assume the UTF-8 worst case.
+        accumulator.max_bytes = np.array(
+            state.get("max_bytes", accumulator.max_length * 4), dtype=np.int64
+        )
+        accumulator.types = [TypeState.from_state(item) for item in state["types"]]
+        if sketches:
+            accumulator.sketches = [HyperLogLog.from_bytes(data) for data in sketches]
+        if stats is not None:
+            accumulator.stats = [ColumnStats.from_state(item) for item in stats]
+        accumulator.batches = list(state.get("batches", []))
+        return accumulator
+
+    def distinct_counts(self):
+        """Estimated distinct non-null values per column, or None without sketches."""
+        if self.sketches is None:
+            return None
+        return np.array([sketch.estimate() for sketch in self.sketches], dtype=np.int64)
+
+    def is_unique(self):
+        """
+        Uniqueness for sketched input. The sketches only rule columns out: a
+        column stays a candidate when it has no nulls and its estimate is
+        within three standard errors of the row count. Candidates are then
+        confirmed exactly from their kept hashes; a candidate whose hashes
+        were not kept (key_check_bytes exceeded) is only a probable key and
+        is not reported as unique. With key_check_bytes=0 (set for restored
+        states) the candidates are returned as probable keys, for the caller
+        to confirm or accept.
+        """
+        if self.sketches is None:
+            return np.zeros(len(self.columns), dtype=bool)
+        unique = []
+        probable = []
+        for idx, (nulls, sketch) in enumerate(zip(self.null_count, self.sketches)):
+            floor = self.row_count * (1 - 3 * sketch.relative_error)
+            candidate = self.row_count > 0 and nulls == 0 and sketch.estimate() >= floor
+            if candidate and self.key_check_bytes:
+                parts = self.key_hashes[idx]
+                if parts is None:
+                    probable.append(self.columns[idx])
+                    candidate = False
+                else:
+                    hashes = np.concatenate(parts) if parts else np.empty(0, np.uint64)
+                    candidate = len(hashes) == self.row_count and len(np.unique(hashes)) == len(hashes)
+            unique.append(candidate)
+        if probable and self.key_check_overflow:
+            logger.info(f"Probable keys not confirmed within the key check budget: {probable}")
+        return np.array(unique, dtype=bool)
+
+    def result(self, is_unique=None):
+        """
+        Return the profile frame, one row per column, with the STATS_COLUMNS
+        after PROFILE_COLUMNS when column statistics are gathered.
+        """
+        if is_unique is None:
+            is_unique = self.is_unique()
+        distinct = self.distinct_counts()
+        datatypes = [
+            state.datatype(length) for state, length in zip(self.types, self.max_length)
+        ]
+        profile = pd.DataFrame({
+            "field_nm": self.columns,
+            "row_count": self.row_count,
+            "null_count": self.null_count,
+            "max_length": self.max_length,
+            "max_bytes": self.max_bytes,
+            "datatype_nm": datatypes,
+            "distinct_count": distinct if distinct is not None else pd.NA,
+            "is_unique": is_unique,
+        }, columns=PROFILE_COLUMNS)
+        if self.stats is None:
+            return profile
+        summaries = pd.DataFrame([
+            stats.summary(datatype, state.datetime_format)
+            for stats, state, datatype in zip(self.stats, self.types, datatypes)
+        ], columns=STATS_COLUMNS[1:], index=profile.index)
+        profile["null_ratio"] = (
+            self.null_count / self.row_count if self.row_count else np.zeros(len(self.columns))
+        ).round(4)
+        if distinct is None:
+            # Without sketches, low-cardinality columns still have an exact count.
+            profile["distinct_count"] = pd.array(
+                [stats.distinct_count for stats in self.stats], dtype="Int64"
+            )
+        return pd.concat([profile, summaries], axis=1)
+
+
+@log_function
+def profile_dataframe(
+    df, block_cells=BLOCK_CELLS, key_detection=KEY_DETECTION_EXACT, key_error=0.01
+):
+    """
+    Profile every column of an in-memory DataFrame in batched passes.
+    Returns one row per column with the columns listed in PROFILE_COLUMNS.
+
+    key_detection="exact" checks every null-free column for duplicates.
+    key_detection="approximate" first estimates distinct counts with
+    HyperLogLog sketches sized for key_error and only runs the exact
+    duplicate check on the near-unique candidates.
+    """
+    logger.debug(f"Profiling DataFrame with shape {df.shape}")
+    approximate = key_detection == KEY_DETECTION_APPROXIMATE
+    accumulator = ProfileAccumulator(
+        df.columns,
+        sketch_precision=(lambda: HyperLogLog.for_error(key_error)) if approximate else None,
+        block_cells=block_cells, key_check_bytes=0
+    )
+    accumulator.update(df)
+    n_rows = len(df)
+    # A column can only be unique across all rows if it has no nulls,
+    # so the hash-based duplicate check is skipped for every other column.
+    candidates = (
+        accumulator.is_unique() if approximate
+        else (accumulator.null_count == 0) & (n_rows > 0)
+    )
+    # The column statistics already counted every value of the single
+    # chunk, which answers the exact check without hashing the column again.
+    is_unique = [
+        bool(candidate) and not (
+            accumulator.stats[idx].repeats if accumulator.stats is not None
+            else df.iloc[:, idx].duplicated().any()
+        )
+        for idx, candidate in enumerate(candidates)
+    ]
+    logger.debug(
+        f"Exact key check on {int(np.sum(candidates))} of {len(candidates)} columns"
+    )
+    return accumulator.result(np.array(is_unique, dtype=bool))
+
+
+@log_function
+def profile_chunks(chunks, sketch_precision=HLL_PRECISION):
+    """
+    Profile an iterable of DataFrame chunks with bounded memory.
+    Sketches rule key columns out; candidates are confirmed from hashed values.
+    """
+    accumulator = None
+    for chunk in chunks:
+        if accumulator is None:
+            accumulator = ProfileAccumulator(chunk.columns, sketch_precision)
+        accumulator.update(chunk)
+    if accumulator is None:
+        return pd.DataFrame(columns=PROFILE_COLUMNS)
+    logger.debug(f"Profiled {accumulator.row_count} rows from chunked input")
+    return accumulator.result()
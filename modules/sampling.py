@@ -0,0 +1,197 @@
+"""
+Sampled CSV profiling for Data Onboarding Framework.
+
+Instead of parsing every row, a seekable CSV is read as a few blocks: the
+head, the tail and blocks at random offsets in between, each trimmed to
+whole lines. Types and lengths are inferred from the sampled rows, and each
+column gets a confidence: the probability that the sample would have held a
+counter-example if at least sample_tolerance of the column's values broke
+the inferred type or length. Columns below sample_min_confidence, and
+columns unique within the sample (key candidates), are then re-profiled
+with a full streamed scan of just those columns.
+"""
+import io
+import logging
+
+import numpy as np
+import pandas as pd
+
+from modules.config import config
+from modules.logging_setup import log_function
+from modules.profiler import profile_dataframe
+
+logger = logging.getLogger(__name__)
+
+PROFILING_CONFIG = config.get('profiling', {})
+SAMPLE_UPLOADS = PROFILING_CONFIG.get('sample_uploads', False)
+SAMPLE_BLOCKS = PROFILING_CONFIG.get('sample_blocks', 32)
+SAMPLE_BLOCK_BYTES = int(PROFILING_CONFIG.get('sample_block_kb', 256) * 1024)
+SAMPLE_TOLERANCE = PROFILING_CONFIG.get('sample_tolerance', 0.001)
+SAMPLE_MIN_CONFIDENCE = PROFILING_CONFIG.get('sample_min_confidence', 0.95)
+SAMPLE_SEED = PROFILING_CONFIG.get('sample_seed', 0)
+
+# Encodings in which a newline byte always ends a line, so a block can be
+# cut at any newline. UTF-16 files are always scanned in full.
+SAMPLE_ENCODINGS = {"utf-8", "cp1252", "latin-1"}
+
+CONFIDENCE_REPORT_COLUMNS = ["file_name", "field_nm", "confidence", "full_scan"]
+
+
+def column_confidence(values, tolerance=SAMPLE_TOLERANCE):
+    """
+    Probability that values sampled non-null values include at least one
+    counter-example when a fraction tolerance of the column has one.
+    """
+    return 1 - (1 - tolerance) ** np.asarray(values, dtype=float)
+
+
+def block_offsets(size, block_bytes, blocks, seed=SAMPLE_SEED):
+    """
+    Start offsets of the sampled blocks: the head, the tail and blocks at
+    random offsets in between, sorted and without overlaps. Returns None
+    when the blocks would cover the whole file anyway.
+    """
+    if size <= block_bytes * blocks:
+        return None
+    last = size - block_bytes
+    rng = np.random.default_rng(seed)
+    starts = sorted({0, last, *rng.integers(block_bytes, last, max(blocks - 2, 0)).tolist()})
+    offsets = []
+    end = 0
+    for start in starts:
+        start = max(start, end)
+        if start >= size:
+            break
+        offsets.append(start)
+        end = start + block_bytes
+    return offsets
+
+
+def sample_blocks(file, size, csv_format, offsets, block_bytes):
+    """
+    Read the blocks at offsets and trim them to whole lines.
+    Returns (header line, body bytes) where the header is empty for files
+    without one.
+    """
+    newline = csv_format["newline"].encode("ascii")[-1:]
+    header = b""
+    body = []
+    for start in offsets:
+        file.seek(start)
+        block = file.read(block_bytes)
+        if start > 0:
+            # Drop the line the block starts in the middle of.
+            cut = block.find(newline)
+            if cut < 0:
+                continue
+            block = block[cut + 1:]
+        elif csv_format["header_rows"]:
+            cut = block.find(newline)
+            header, block = block[:cut + 1], block[cut + 1:]
+        if start + block_bytes < size:
+            block = block[:block.rfind(newline) + 1]
+        body.append(block)
+    return header, b"".join(body)
+
+
+def _parse_sample(header, body, csv_format):
+    """
+    Parse the sampled lines into string columns. A block that starts inside
+    a quoted multi-line value can yield malformed rows, which are skipped.
+    """
+    from modules.file_processor import ARROW_STRING, _column_names, _csv_options
+    df = pd.read_csv(
+        io.BytesIO(header + body), dtype=str, on_bad_lines="skip", **_csv_options(csv_format)
+    )
+    if not csv_format["header_rows"]:
+        df.columns = _column_names(len(df.columns))
+    return df.astype(ARROW_STRING)
+
+
+def sampled_columns(profile, min_confidence=SAMPLE_MIN_CONFIDENCE):
+    """Columns whose sampled inference is too weak to keep: low confidence or possible keys."""
+    mask = (profile["confidence"] < min_confidence) | profile["is_unique"]
+    return list(profile.loc[mask, "field_nm"])
+
+
+@log_function
+def profile_csv_sample(
+    file, size, csv_format, engine=None, blocks=None, block_bytes=None, seed=SAMPLE_SEED
+):
+    """
+    Profile a seekable CSV from a sample of blocks and re-scan ambiguous
+    columns in full. Returns (profile, key_columns); the profile has an
+    extra confidence column and a full_scan flag for the columns profiled
+    from every row (whose confidence is 1.0).
+    Returns None when the file is too small, or its encoding unsuitable,
+    for sampling to pay off; the caller then profiles it in full.
+    """
+    from modules.file_processor import profile_csv_stream
+    from modules.metadata import detect_key
+    blocks = blocks or SAMPLE_BLOCKS
+    block_bytes = block_bytes or SAMPLE_BLOCK_BYTES
+    offsets = block_offsets(size, block_bytes, blocks, seed)
+    if offsets is None or csv_format["encoding"] not in SAMPLE_ENCODINGS:
+        return None
+    position = file.tell()
+    header, body = sample_blocks(file, size, csv_format, offsets, block_bytes)
+    file.seek(position)
+    df = _parse_sample(header, body, csv_format)
+    if df.empty:
+        return None
+    profile = profile_dataframe(df)
+    non_null = profile["row_count"] - profile["null_count"]
+    profile["confidence"] = column_confidence(non_null)
+    profile["full_scan"] = False
+    # Row and null counts are extrapolated from the sampled bytes per row.
+    row_count = max(int(round((size - len(header)) * len(df) / max(len(body), 1))), len(df))
+    # The parser needs the names as written; the profile uses stripped names.
+    full_scan = sampled_columns(profile)
+    profile["field_nm"] = profile["field_nm"].astype(str).str.strip()
+    logger.info(
+        f"Sampled {len(df)} rows from {len(offsets)} blocks; "
+        f"re-scanning {len(full_scan)} of {len(profile)} columns in full"
+    )
+    if full_scan:
+        scanned = profile_csv_stream(
+            file, engine=engine, csv_format=csv_format, columns=full_scan
+        ).set_index("field_nm")
+        file.seek(position)
+        row_count = int(scanned["row_count"].iloc[0])
+    profile["null_count"] = (
+        profile["null_count"] / len(df) * row_count
+    ).round().astype("int64")
+    profile["row_count"] = row_count
+    profile["distinct_count"] = pd.NA
+    profile["is_unique"] = False
+    if full_scan:
+        rows = profile["field_nm"].isin(scanned.index)
+        for column in scanned.columns.drop("row_count"):
+            profile.loc[rows, column] = profile.loc[rows, "field_nm"].map(scanned[column])
+        profile.loc[rows, "confidence"] = 1.0
+        profile.loc[rows, "full_scan"] = True
+    profile["is_unique"] = profile["is_unique"].astype(bool)
+    return profile, detect_key(None, profile)
+
+
+def confidence_report(tables):
+    """
+    Per-column confidence for profiled tables: file_name, field_nm,
+    confidence and full_scan. Tables that were not sampled report every
+    column as fully scanned.
+    """
+    frames = []
+    for table in tables:
+        profile = table["profile"]
+        if profile.empty:
+            continue
+        sampled = "confidence" in profile
+        frames.append(pd.DataFrame({
+            "file_name": table["file_name"],
+            "field_nm": profile["field_nm"],
+            "confidence": profile["confidence"].astype(float) if sampled else 1.0,
+            "full_scan": profile["full_scan"].astype(bool) if sampled else True,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=CONFIDENCE_REPORT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
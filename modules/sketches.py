@@ -0,0 +1,93 @@
+"""
+Probabilistic sketches used by the profiling engine.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+_U64 = np.uint64
+
+
+def hash_values(values):
+    """Hash a Series of values to uint64 independently of its index."""
+    # categorize=False skips the factorize step, which only pays off for
+    # low-cardinality input and doubles the cost for key-like columns.
+    return pd.util.hash_array(values.to_numpy(dtype=object), categorize=False)
+
+
+def _bit_length(x):
+    """
+    Vectorized bit length of a uint64 array.
+    Values are shifted below 2**53 so the float64 conversion used by frexp is
+    exact; the dropped low bits cannot change the position of the top bit.
+    """
+    shift = 11
+    _, exponent = np.frexp((x >> _U64(shift)).astype(np.float64))
+    low = np.frexp((x & _U64((1 << shift) - 1)).astype(np.float64))[1]
+    return np.where(exponent > 0, exponent + shift, low)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch with 2**precision one-byte registers.
+    Relative standard error is roughly 1.04 / sqrt(2**precision).
+    """
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @classmethod
+    def for_error(cls, relative_error):
+        """Create a sketch with the smallest precision meeting a relative standard error."""
+        precision = int(np.ceil(2 * np.log2(1.04 / relative_error)))
+        return cls(min(max(precision, 4), 18))
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def add(self, values):
+        """Add every value of a Series (nulls should be dropped beforehand)."""
+        if len(values) == 0:
+            return
+        self.add_hashes(hash_values(values))
+
+    def add_hashes(self, hashes):
+        """Add precomputed uint64 hashes."""
+        p = self.precision
+        index = (hashes >> _U64(64 - p)).astype(np.int64)
+        remainder = hashes & _U64((1 << (64 - p)) - 1)
+        rank = (64 - p) - _bit_length(remainder) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        """Fold another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def to_bytes(self):
+        """Compressed registers; sparse sketches of small columns shrink to a few bytes."""
+        return bytes([self.precision]) + zlib.compress(self.registers.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        sketch = cls(data[0])
+        sketch.registers = np.frombuffer(zlib.decompress(data[1:]), dtype=np.uint8).copy()
+        return sketch
+
+    def estimate(self):
+        """Return the estimated number of distinct values added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
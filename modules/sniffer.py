@@ -0,0 +1,189 @@
+"""
+CSV format sniffing for Data Onboarding Framework.
+
+Detects the encoding (including byte order marks), delimiter, quote
+character, header row count and line endings of a delimited file from the
+first few KB of the upload, so the parser gets the right options on the
+first attempt and sys_config_table_info can be prefilled.
+"""
+import codecs
+import csv
+import io
+import logging
+import re
+from collections import Counter
+
+from modules.config import config
+
+logger = logging.getLogger(__name__)
+
+PROFILING_CONFIG = config.get('profiling', {})
+SNIFF_BYTES = PROFILING_CONFIG.get('sniff_bytes', 65536)
+
+DELIMITERS = [",", "\t", ";", "|"]
+# Lines of the prefix used to score delimiters and look for a header.
+SNIFF_LINES = 50
+
+# (byte order mark, codec for the parser, codec for the BOM-less prefix, code)
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8", "utf-8", "UTF-8-BOM"),
+    (codecs.BOM_UTF16_LE, "utf-16", "utf-16-le", "UTF-16LE"),
+    (codecs.BOM_UTF16_BE, "utf-16", "utf-16-be", "UTF-16BE"),
+]
+
+DELIMITER_CODES = {"\t": "\\t"}
+NEWLINE_CODES = {"\r\n": "CRLF", "\n": "LF", "\r": "CR"}
+
+DEFAULT_FORMAT = {
+    "delimiter": ",",
+    "quotechar": '"',
+    "encoding": "utf-8",
+    "encoding_cd": "UTF-8",
+    "header_rows": 1,
+    "newline": "\n",
+}
+
+_VALUE_PATTERN = re.compile(
+    r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?"
+    r"|\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}(?:[ T]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?"
+)
+
+
+def _decode(data, codec):
+    if codec.startswith("utf-16"):
+        data = data[:len(data) // 2 * 2]
+    return data.decode(codec, errors="replace")
+
+
+def _detect_encoding(prefix):
+    """Return (parser codec, encoding code, decoded text) for a byte prefix."""
+    for bom, codec, text_codec, code in BOMS:
+        if prefix.startswith(bom):
+            return codec, code, _decode(prefix[len(bom):], text_codec)
+    even_nuls = prefix[0::2].count(0)
+    odd_nuls = prefix[1::2].count(0)
+    if max(even_nuls, odd_nuls) > len(prefix) // 4:
+        # BOM-less UTF-16: ASCII text has a zero in every other byte.
+        codec, code = (
+            ("utf-16-be", "UTF-16BE") if even_nuls > odd_nuls else ("utf-16-le", "UTF-16LE")
+        )
+        return codec, code, _decode(prefix, codec)
+    try:
+        return "utf-8", "UTF-8", prefix.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the end of the prefix is not an error.
+        if e.start >= len(prefix) - 3:
+            return "utf-8", "UTF-8", prefix[:e.start].decode("utf-8")
+    try:
+        return "cp1252", "WINDOWS-1252", prefix.decode("cp1252")
+    except UnicodeDecodeError:
+        return "latin-1", "ISO-8859-1", prefix.decode("latin-1")
+
+
+def _detect_newline(text):
+    crlf = text.count("\r\n")
+    counts = {"\r\n": crlf, "\n": text.count("\n") - crlf, "\r": text.count("\r") - crlf}
+    newline, count = max(counts.items(), key=lambda item: item[1])
+    return newline if count else "\n"
+
+
+def _detect_quotechar(text, delimiter):
+    def _quoted(quote):
+        delim = re.escape(delimiter)
+        pattern = rf"(?:^|{delim}){quote}[^{quote}]*{quote}(?:{delim}|$)"
+        return len(re.findall(pattern, text, flags=re.MULTILINE))
+    return "'" if _quoted("'") > _quoted('"') else '"'
+
+
+def _rows(text, delimiter, quotechar):
+    try:
+        reader = csv.reader(io.StringIO(text), delimiter=delimiter, quotechar=quotechar)
+        return [row for _, row in zip(range(SNIFF_LINES), reader)]
+    except csv.Error:
+        return []
+
+
+def _detect_delimiter(text):
+    """
+    Pick the delimiter that splits the sampled lines into the most
+    consistent number of fields, preferring more fields on ties.
+    """
+    best, best_score = DEFAULT_FORMAT["delimiter"], (0, 0)
+    for delimiter in DELIMITERS:
+        rows = [row for row in _rows(text, delimiter, '"') if row]
+        if not rows:
+            continue
+        width, count = Counter(len(row) for row in rows).most_common(1)[0]
+        if width < 2:
+            continue
+        score = (count / len(rows), width)
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+def _looks_like_value(cell):
+    return bool(_VALUE_PATTERN.fullmatch(cell.strip()))
+
+
+def _detect_header_rows(rows):
+    """
+    A first row is data rather than a header when it has numeric or date
+    cells in the same columns as the rows below it; header names are
+    practically never numbers.
+    """
+    if len(rows) < 2:
+        return 1
+    first, body = rows[0], rows[1:]
+    value_columns = [
+        idx for idx in range(len(first))
+        if all(idx < len(row) and _looks_like_value(row[idx]) for row in body if row)
+    ]
+    if value_columns and all(_looks_like_value(first[idx]) for idx in value_columns):
+        return 0
+    return 1
+
+
+def sniff_bytes(prefix, truncated=True):
+    """
+    Detect the format of a delimited file from its first bytes.
+    truncated marks a prefix that stops mid-file, so its last line is
+    ignored. Returns a dict with delimiter, quotechar, encoding (a Python
+    codec), encoding_cd, header_rows and newline.
+    """
+    if not prefix:
+        return dict(DEFAULT_FORMAT)
+    encoding, encoding_cd, text = _detect_encoding(prefix)
+    newline = _detect_newline(text)
+    if truncated and newline in text:
+        text = text[:text.rindex(newline)]
+    delimiter = _detect_delimiter(text)
+    quotechar = _detect_quotechar(text, delimiter)
+    return {
+        "delimiter": delimiter,
+        "quotechar": quotechar,
+        "encoding": encoding,
+        "encoding_cd": encoding_cd,
+        "header_rows": _detect_header_rows(_rows(text, delimiter, quotechar)),
+        "newline": newline,
+    }
+
+
+def sniff_csv(file, prefix_bytes=SNIFF_BYTES):
+    """Sniff a file-like object from its first prefix_bytes, restoring its position."""
+    position = file.tell()
+    prefix = file.read(prefix_bytes + 1)
+    file.seek(position)
+    csv_format = sniff_bytes(prefix[:prefix_bytes], truncated=len(prefix) > prefix_bytes)
+    logger.debug(f"Sniffed CSV format: {csv_format}")
+    return csv_format
+
+
+def table_info_values(csv_format):
+    """The sys_config_table_info columns prefilled from a sniffed format."""
+    return {
+        "delmtr_cd": DELIMITER_CODES.get(csv_format["delimiter"], csv_format["delimiter"]),
+        "src_encod_cd": csv_format["encoding_cd"],
+        "file_hdr_cnt": csv_format["header_rows"],
+        "src_newln_chr_cd": NEWLINE_CODES[csv_format["newline"]],
+    }
@@ -1,52 +1,96 @@
 import pandas as pd
 from modules import db
 import streamlit as st
+from modules.config import config
+from modules.ddl import right_sized_type, savings_summary, storage_savings_report
+from modules.encoding import column_encodings
 from modules.logging_setup import log_function
+from modules.table_layout import layout_clause
+from modules.type_inference import infer_type
+
+SYNC_CONFIG = config.get('sys_config_sync', {})
+# How existing configuration is updated: "on_conflict" (INSERT ... ON
+# CONFLICT DO UPDATE, using the unique indexes of migration 005), "merge"
+# (one MERGE per config table, PostgreSQL 15+ only) or "update" (one UPDATE
+# per row).
+UPSERT_STYLE = SYNC_CONFIG.get('upsert_style', 'on_conflict')
+# What happens to stored fields missing from a re-onboarded table:
+# "deprecate" (set dprct_ind), "delete" or "keep".
+REMOVED_FIELDS = SYNC_CONFIG.get('removed_fields', 'deprecate')
+# Config tables whose rows can disappear on re-onboarding, with the columns
+# that identify the set a synced frame replaces.
+REMOVAL_SCOPES = {"app_mgmt.sys_config_table_field_info": ["src_nm", "src_table_nm"]}
 
 
 @log_function
 def infer_snowflake_type(col_data: pd.Series) -> str:
-    if col_data.empty:
-        return "VARCHAR(255)"
-
-    if col_data.str.isnumeric().all():
-        return "NUMBER(38,0)"
-
-    try:
-        if pd.to_datetime(col_data, errors='coerce').notna().all():
-            return "TIMESTAMP_NTZ"
-    except Exception:
-        pass
-
-    return "VARCHAR(255)"
+    """Infer a sized Snowflake type (BOOLEAN, NUMBER(p,s), DATE, TIMESTAMP_NTZ, VARCHAR(n))."""
+    return infer_type(col_data)
 
 
 @log_function
 def generate_create_table_script(
-    metadata_df: pd.DataFrame, schema_name: str, src_nm: str, dataset_nm: str
+    metadata_df: pd.DataFrame, schema_name: str, src_nm: str, dataset_nm: str,
+    dialect: str = None, field_stats: pd.DataFrame = None
 ) -> str:
+    """
+    CREATE TABLE script with column types right-sized for the dialect
+    (ddl.dialect by default, see modules.ddl), headed by an estimate of the
+    row width saved. The partition, sort and distribution key indicators
+    become the table's layout options (see modules.table_layout), and on
+    Redshift each column gets an ENCODE picked from its type and
+    field_stats (see modules.encoding), and VARCHAR columns are sized from
+    the byte lengths in field_stats.
+    """
     if metadata_df.empty:
         return "No metadata available to generate SQL."
 
     table_name = metadata_df.iloc[0]['src_table_nm']
     columns_sql = []
+    encodings = column_encodings(metadata_df, field_stats, dialect)
+    byte_lengths = {}
+    if field_stats is not None and "max_byte_len" in field_stats:
+        byte_lengths = {
+            (row["src_table_nm"], row["field_nm"]): row["max_byte_len"]
+            for _, row in field_stats.iterrows()
+        }
 
     for _, row in metadata_df.iterrows():
-        col_def = f"{row['field_nm']} {row['datatype_nm']}"
+        max_bytes = byte_lengths.get((row['src_table_nm'], row['field_nm']))
+        col_def = f"{row['field_nm']} {right_sized_type(row['datatype_nm'], dialect, max_bytes)}"
+        if row['field_nm'] in encodings:
+            col_def += f" ENCODE {encodings[row['field_nm']]}"
         if row['key_ind'] == "Y":
             col_def += " PRIMARY KEY"
         columns_sql.append(col_def)
 
     # build SQL script without backslash in f-string expression
     sep = ",\n"
+    options = layout_clause(metadata_df, dialect)
     sql_script = (
+        f"-- {savings_summary(storage_savings_report(metadata_df, dialect))}\n"
         f"CREATE TABLE {schema_name}.{src_nm}_{dataset_nm}_{table_name} (\n"
         + sep.join(columns_sql)
-        + "\n);"
+        + "\n)"
+        + (f"\n{options}" if options else "")
+        + ";"
     )
     return sql_script
 
 
+def sql_literal(value) -> str:
+    """A value as a PostgreSQL literal: NULL, a bare number or a quoted string."""
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return "NULL"
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
 @log_function
 def create_insert_statement(table_name: str, df: pd.DataFrame) -> str:
     if df.empty:
@@ -54,7 +98,7 @@ def create_insert_statement(table_name: str, df: pd.DataFrame) -> str:
 
     columns = ", ".join(df.columns)
     values = ",\n".join(
-        f"({', '.join(repr(v) if pd.notna(v) else 'NULL' for v in row)})"
+        f"({', '.join(sql_literal(v) for v in row)})"
         for row in df.itertuples(index=False, name=None)
     )
     return f"INSERT INTO {table_name} ({columns}) VALUES\n{values};"
@@ -71,14 +115,8 @@ def create_update_statement(table_name: str, df: pd.DataFrame, where_keys: list)
         set_clauses = []
         where_clauses = []
 
-        # Handle value conversion
-        def format_val(val):
-            if pd.isna(val):
-                return "NULL"
-            return f"'{val}'" if isinstance(val, str) else str(val)
-
         for col in df.columns:
-            val_str = format_val(row[col])
+            val_str = sql_literal(row[col])
             if col in where_keys:
                 where_clauses.append(f"{col} = {val_str}")
             else:
@@ -94,64 +132,185 @@ def create_update_statement(table_name: str, df: pd.DataFrame, where_keys: list)
     return "\n".join(update_queries)
 
 
-@log_function
-def generate_insert_statements(
-    src_nm, dataset_nm, table_nm, df_dataset_info, df_pre_proc_info,
-    df_table_info, df_metadata_df
-) -> str:
-    insert_statements = []
-    update_statements = []
-
-    if db.check_existence(src_nm, dataset_nm, table_nm):
-        update_statements.append(
-            create_update_statement(
-                "app_mgmt.sys_config_dataset_info", df_dataset_info,
-                ["src_nm", "dataset_nm"]
-            )
-        )
-        update_statements.append(
-            create_update_statement(
-                "app_mgmt.sys_config_pre_proc_info", df_pre_proc_info,
-                ["src_nm", "dataset_nm"]
-            )
-        )
-        update_statements.append(
-            create_update_statement(
-                "app_mgmt.sys_config_table_info", df_table_info,
-                ["src_nm", "dataset_nm"]
-            )
-        )
-        update_statements.append(
-            create_update_statement(
-                "app_mgmt.sys_config_table_field_info", df_metadata_df,
-                ["src_nm", "src_table_nm", "field_posn_nbr"]
-            )
-        )
+def staging_table_name(table_name: str) -> str:
+    return f"tmp_{table_name.split('.')[-1]}"
 
-        st.session_state.rds_sql_script = "\n\n".join(update_statements)
 
-    else:
-        insert_statements.append(
-            create_insert_statement(
-                "app_mgmt.sys_config_dataset_info", df_dataset_info
-            )
+def sync_statements(table_name, columns, key_columns, style=None, removed=None):
+    """
+    The statements of a set-based sync of rows staged in a temp table:
+    (setup, apply). setup creates the staging table, which the caller then
+    fills; apply handles the stored rows missing from the staging table
+    (see REMOVAL_SCOPES), upserts the staged rows in one statement and
+    drops the staging table.
+    """
+    style = style or UPSERT_STYLE
+    removed = removed or REMOVED_FIELDS
+    staging = staging_table_name(table_name)
+    value_columns = [col for col in columns if col not in key_columns]
+    match = " AND ".join(f"t.{col} = s.{col}" for col in key_columns)
+    setup = [
+        f"DROP TABLE IF EXISTS {staging};",
+        f"CREATE TEMP TABLE {staging} (LIKE {table_name} INCLUDING DEFAULTS);",
+    ]
+    apply = []
+    scope = REMOVAL_SCOPES.get(table_name)
+    if scope and removed == "deprecate" and "dprct_ind" not in columns:
+        removed = "keep"
+    if scope and removed in ("deprecate", "delete"):
+        missing = (
+            f"WHERE ({', '.join(f't.{col}' for col in scope)}) IN "
+            f"(SELECT DISTINCT {', '.join(scope)} FROM {staging})\n"
+            f"AND NOT EXISTS (SELECT 1 FROM {staging} s WHERE {match})"
+        )
+        if removed == "deprecate":
+            apply.append(f"UPDATE {table_name} t SET dprct_ind = 'X'\n{missing};")
+        else:
+            apply.append(f"DELETE FROM {table_name} t\n{missing};")
+    column_list = ", ".join(columns)
+    if style == "on_conflict":
+        action = (
+            "DO UPDATE SET " + ", ".join(f"{col} = EXCLUDED.{col}" for col in value_columns)
+            if value_columns else "DO NOTHING"
         )
-        insert_statements.append(
-            create_insert_statement(
-                "app_mgmt.sys_config_pre_proc_info", df_pre_proc_info
-            )
+        apply.append(
+            f"INSERT INTO {table_name} ({column_list})\n"
+            f"SELECT {column_list} FROM {staging}\n"
+            f"ON CONFLICT ({', '.join(key_columns)}) {action};"
         )
-        insert_statements.append(
-            create_insert_statement(
-                "app_mgmt.sys_config_table_info", df_table_info
-            )
+    elif style == "merge":
+        matched = (
+            "WHEN MATCHED THEN UPDATE SET "
+            + ", ".join(f"{col} = s.{col}" for col in value_columns) + "\n"
+            if value_columns else ""
         )
-        insert_statements.append(
-            create_insert_statement(
-                "app_mgmt.sys_config_table_field_info", df_metadata_df
-            )
+        apply.append(
+            f"MERGE INTO {table_name} t\nUSING {staging} s ON {match}\n{matched}"
+            f"WHEN NOT MATCHED THEN INSERT ({column_list}) "
+            f"VALUES ({', '.join(f's.{col}' for col in columns)});"
         )
+    else:
+        raise ValueError(f"Unknown upsert style: {style}")
+    apply.append(f"DROP TABLE {staging};")
+    return setup, apply
+
+
+@log_function
+def create_upsert_statement(
+    table_name: str, df: pd.DataFrame, key_columns: list, style: str = None, removed: str = None
+) -> str:
+    """
+    Sync df into table_name in a fixed number of statements, whatever its
+    width: stage the rows in a temp table, then one INSERT ... ON CONFLICT
+    or MERGE (sys_config_sync.upsert_style). With the "update" style this
+    is the per-row create_update_statement.
+    """
+    if (style or UPSERT_STYLE) == "update":
+        return create_update_statement(table_name, df, key_columns)
+    if df.empty:
+        return f"-- No data to sync into {table_name}"
+    setup, apply = sync_statements(table_name, list(df.columns), key_columns, style, removed)
+    return "\n".join(setup + [create_insert_statement(staging_table_name(table_name), df)] + apply)
 
-        st.session_state.rds_sql_script = "\n\n".join(insert_statements)
 
+FIELD_STATS_TABLE = "app_mgmt.sys_config_table_field_stats"
+
+
+def field_stats_deletes(df_field_stats: pd.DataFrame) -> list:
+    """DELETE statements clearing the stored statistics of every table in df_field_stats."""
+    tables = df_field_stats[["src_nm", "src_table_nm"]].drop_duplicates()
+    return [
+        f"DELETE FROM {FIELD_STATS_TABLE} "
+        f"WHERE src_nm = {sql_literal(src)} AND src_table_nm = {sql_literal(table)};"
+        for src, table in tables.itertuples(index=False, name=None)
+    ]
+
+
+@log_function
+def create_field_stats_statement(df_field_stats: pd.DataFrame) -> str:
+    """Replace the stored column statistics of every table in df_field_stats."""
+    if df_field_stats is None or df_field_stats.empty:
+        return "-- No column statistics to store"
+    return "\n".join(field_stats_deletes(df_field_stats) + [
+        create_insert_statement(FIELD_STATS_TABLE, df_field_stats)
+    ])
+
+
+def _table_keys(src_nm, dataset_nm, table_nm, df_metadata_df):
+    """The (src_nm, dataset_nm, src_table_nm) of every table being onboarded."""
+    if df_metadata_df.empty or "src_table_nm" not in df_metadata_df.columns:
+        return [(src_nm, dataset_nm, table_nm)]
+    return [(src_nm, dataset_nm, table) for table in df_metadata_df["src_table_nm"].unique()]
+
+
+def _split_configured(df, present):
+    """
+    Split df into the rows of tables not configured yet and the rest.
+    present is the set of configured src_table_nm values, or a bool for
+    config tables keyed by source and dataset only.
+    """
+    if isinstance(present, bool) or "src_table_nm" not in df.columns:
+        return (df.iloc[:0], df) if present else (df, df.iloc[:0])
+    configured = df["src_table_nm"].isin(present)
+    return df[~configured], df[configured]
+
+
+@log_function
+def plan_sys_config_writes(
+    src_nm, dataset_nm, table_nm, df_dataset_info, df_pre_proc_info,
+    df_table_info, df_metadata_df
+) -> list:
+    """
+    Decide, from one batched existence check (db.check_existence_many),
+    which rows of each sys_config frame are new and which update existing
+    configuration. Returns (table_name, inserts, updates, where_keys)
+    tuples in write order.
+    """
+    presence = db.check_existence_many(_table_keys(src_nm, dataset_nm, table_nm, df_metadata_df))
+
+    def _present(check):
+        return set(presence.loc[presence[check].astype(bool), "src_table_nm"])
+
+    writes = [
+        ("app_mgmt.sys_config_dataset_info", df_dataset_info,
+         ["src_nm", "dataset_nm"], bool(presence["dataset_info"].any())),
+        ("app_mgmt.sys_config_pre_proc_info", df_pre_proc_info,
+         ["src_nm", "dataset_nm"], bool(presence["pre_proc_info"].any())),
+        ("app_mgmt.sys_config_table_info", df_table_info,
+         ["src_nm", "dataset_nm", "src_table_nm"], _present("table_info")),
+        ("app_mgmt.sys_config_table_field_info", df_metadata_df,
+         ["src_nm", "src_table_nm", "field_nm"], _present("field_info")),
+    ]
+    return [
+        (table_name, *_split_configured(df, present), where_keys)
+        for table_name, df, where_keys, present in writes
+    ]
+
+
+@log_function
+def generate_insert_statements(
+    src_nm, dataset_nm, table_nm, df_dataset_info, df_pre_proc_info,
+    df_table_info, df_metadata_df, df_field_stats=None
+) -> str:
+    """
+    INSERT or set-based upsert statements for every sys_config table,
+    chosen per config table and per onboarded table (see
+    plan_sys_config_writes).
+    This is the script kept for review; db.load_dataframes writes the
+    same rows directly.
+    """
+    plan = plan_sys_config_writes(
+        src_nm, dataset_nm, table_nm, df_dataset_info, df_pre_proc_info,
+        df_table_info, df_metadata_df
+    )
+    statements = []
+    for table_name, inserts, updates, where_keys in plan:
+        if not updates.empty:
+            statements.append(create_upsert_statement(table_name, updates, where_keys))
+        if not inserts.empty or updates.empty:
+            statements.append(create_insert_statement(table_name, inserts))
+    if df_field_stats is not None:
+        statements.append(create_field_stats_statement(df_field_stats))
+
+    st.session_state.rds_sql_script = "\n\n".join(statements)
     return st.session_state.rds_sql_script
@@ -0,0 +1,146 @@
+"""
+Partition, sort and distribution key recommendations for Data Onboarding Framework.
+
+Picks the physical layout of a warehouse table from its column profile:
+- the sort key (Snowflake clustering key) is a date or timestamp column
+  whose values arrive clustered (it only grows in file order, or each
+  value comes in few runs), else an increasing sequence, else none: a
+  high-cardinality key buys little pruning for its reclustering cost;
+- the partition column is the temporal sort key;
+- the distribution key is a join-friendly column whose values spread
+  evenly: the single-column table key if there is one, otherwise the
+  null-free, low-skew column whose most frequent value is rarest.
+layout_clause turns the indicator fields of a table's field metadata into
+the table options of its CREATE TABLE statement.
+"""
+import json
+import logging
+
+import pandas as pd
+
+from modules.config import config
+from modules.ddl import DDL_DIALECT, DIALECT_REDSHIFT, parse_type
+
+logger = logging.getLogger(__name__)
+
+DDL_CONFIG = config.get('ddl', {})
+# Largest share of rows the most frequent value may hold in a distribution key.
+DIST_MAX_SKEW = DDL_CONFIG.get('dist_max_skew', 0.05)
+# Fewest distinct values (when known) a distribution key needs to spread rows.
+DIST_MIN_DISTINCT = DDL_CONFIG.get('dist_min_distinct', 1000)
+# Most runs per distinct value a temporal column may arrive in and still be
+# clustered enough to partition on; unordered dates would scatter every load.
+PARTITION_MAX_RUNS = DDL_CONFIG.get('partition_max_runs_per_value', 2.0)
+
+TEMPORAL_TYPES = {"DATE", "TIMESTAMP_NTZ", "TIMESTAMP_TZ", "TIMESTAMP"}
+# Types that make poor distribution keys even when evenly spread.
+NON_DIST_TYPES = TEMPORAL_TYPES | {"BOOLEAN", "FLOAT", "VARIANT", "BINARY"}
+
+
+def _top_share(row):
+    """Share of the non-null rows held by the most frequent value (0 when none repeats)."""
+    top_values = row.get("top_values")
+    non_null = row["row_count"] - row["null_count"]
+    if not isinstance(top_values, str) or not non_null:
+        return None
+    top_values = json.loads(top_values)
+    return top_values[0][1] / non_null if top_values else 0.0
+
+
+def _monotonic(row):
+    return bool(row.get("monotonic", False))
+
+
+def _clustered(row):
+    """Whether a column's values arrive in order or in few runs per distinct value."""
+    if _monotonic(row):
+        return True
+    run_length = row.get("avg_run_length")
+    distinct = row.get("distinct_count")
+    if pd.isna(run_length) or pd.isna(distinct) or not run_length or not distinct:
+        return False
+    runs = (row["row_count"] - row["null_count"]) / run_length
+    return runs / distinct <= PARTITION_MAX_RUNS
+
+
+def _sort_key(profile, key_columns):
+    temporal = [
+        row for _, row in profile.iterrows()
+        if parse_type(row["datatype_nm"])[0] in TEMPORAL_TYPES and _clustered(row)
+    ]
+    if temporal:
+        # Growing load timestamps first, then the most complete column.
+        best = min(temporal, key=lambda row: (not _monotonic(row), row["null_count"]))
+        return best["field_nm"], True
+    sequences = [
+        row["field_nm"] for _, row in profile.iterrows()
+        if _monotonic(row) and row["null_count"] == 0
+    ]
+    if sequences:
+        return sequences[0], False
+    return None, False
+
+
+def _dist_key(profile, key_columns):
+    if len(key_columns) == 1:
+        return key_columns[0]
+    candidates = []
+    for _, row in profile.iterrows():
+        if row["null_count"] or parse_type(row["datatype_nm"])[0] in NON_DIST_TYPES:
+            continue
+        share = _top_share(row)
+        distinct = row.get("distinct_count")
+        if share is None or share > DIST_MAX_SKEW:
+            continue
+        if pd.notna(distinct) and distinct < DIST_MIN_DISTINCT:
+            continue
+        candidates.append((share, row["field_nm"]))
+    return min(candidates)[1] if candidates else None
+
+
+def recommend_layout(profile, key_columns=()):
+    """
+    Recommend the layout of a profiled table. Returns a dict with
+    partition, sort_key and dist_key, each a list of at most one column.
+    """
+    if profile.empty:
+        return {"partition": [], "sort_key": [], "dist_key": []}
+    sort_key, temporal = _sort_key(profile, list(key_columns))
+    dist_key = _dist_key(profile, list(key_columns))
+    layout = {
+        "partition": [sort_key] if temporal else [],
+        "sort_key": [sort_key] if sort_key else [],
+        "dist_key": [dist_key] if dist_key else [],
+    }
+    logger.debug(f"Recommended layout: {layout}")
+    return layout
+
+
+def _flagged(metadata_df, column):
+    if column not in metadata_df.columns:
+        return []
+    return list(metadata_df.loc[metadata_df[column] == "X", "field_nm"])
+
+
+def layout_clause(metadata_df, dialect=None):
+    """
+    Table options for the layout flagged in metadata_df: DISTKEY/SORTKEY on
+    Redshift, CLUSTER BY on Snowflake (which has no distribution key).
+    Snowflake never clusters on a unique key column unless it is also the
+    partition. Empty when nothing is flagged.
+    """
+    partition = _flagged(metadata_df, "partitn_ind")
+    sort_key = _flagged(metadata_df, "sort_key_ind")
+    dist_key = _flagged(metadata_df, "dist_key_ind")
+    if (dialect or DDL_DIALECT) == DIALECT_REDSHIFT:
+        # Redshift has no table partitions; the sort key prunes blocks instead.
+        sort_key = list(dict.fromkeys(partition + sort_key))
+        options = []
+        if dist_key:
+            options.append(f"DISTSTYLE KEY DISTKEY ({dist_key[0]})")
+        if sort_key:
+            options.append(f"SORTKEY ({', '.join(sort_key)})")
+        return " ".join(options)
+    unique = set(_flagged(metadata_df, "key_ind"))
+    cluster_by = list(dict.fromkeys(partition + [col for col in sort_key if col not in unique]))
+    return f"CLUSTER BY ({', '.join(cluster_by)})" if cluster_by else ""
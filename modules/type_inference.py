@@ -0,0 +1,229 @@
+"""
+Vectorized type inference for Data Onboarding Framework.
+
+Values are classified against a small type lattice with Arrow regex kernels
+and NumPy reductions over whole blocks of cells. Each column keeps a TypeState that
+narrows its candidate types chunk by chunk and tracks the sizing facts
+(integer digits, decimal scale, datetime format) needed to render a sized
+Snowflake type.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+BOOLEAN = 1
+INTEGER = 2
+DECIMAL = 4
+DATE = 8
+TIMESTAMP = 16
+ALL_CANDIDATES = BOOLEAN | INTEGER | DECIMAL | DATE | TIMESTAMP
+
+MAX_PRECISION = 38
+DEFAULT_VARCHAR = "VARCHAR(255)"
+
+BOOLEAN_TOKENS = ["true", "false", "t", "f", "yes", "no", "y", "n"]
+
+# Leading zeros are rejected so identifiers such as "00123" stay VARCHAR
+# instead of losing their padding in a numeric column. Integers are the
+# decimals without a point, so only this one pattern is matched per cell.
+DECIMAL_PATTERN = r"[+-]?(?:(?:0|[1-9][0-9]*)(?:\.[0-9]*)?|\.[0-9]+)"
+
+DATE_FORMATS = [
+    "%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%d/%m/%Y", "%d-%m-%Y", "%m-%d-%Y",
+    "%d.%m.%Y", "%d-%b-%Y", "%d %b %Y",
+]
+TIMESTAMP_FORMATS = [
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%d %H:%M", "%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+]
+DATETIME_FORMATS = DATE_FORMATS + TIMESTAMP_FORMATS
+
+# Number of leading values used to detect a datetime format.
+FORMAT_SAMPLE_ROWS = 200
+
+
+def arrow_text(values):
+    """Convert a Series to an Arrow large_string array, keeping nulls as nulls."""
+    try:
+        array = pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        array = pa.array(values.map(str, na_action="ignore"), from_pandas=True)
+    if array.type != pa.large_string():
+        array = array.cast(pa.large_string())
+    return array
+
+
+def classify_block(text, present, shape, lengths=None):
+    """
+    Classify a flattened (column-major) block of cells in one vectorized pass.
+    text is an Arrow string array holding every cell ("" for nulls) and
+    present marks the non-null cells; lengths, the cells' character counts,
+    is computed when not given. Returns per-column arrays: all_bool,
+    all_int, all_dec, int_digits and scale (the latter two over cells that
+    parse as decimals).
+    """
+    # The tokens are ASCII, so the cheaper ASCII lowering matches the same cells.
+    is_bool = pc.is_in(pc.ascii_lower(text), value_set=pa.array(BOOLEAN_TOKENS)).to_numpy()
+    is_dec = pc.match_substring_regex(text, f"^(?:{DECIMAL_PATTERN})$").to_numpy()
+
+    if lengths is None:
+        lengths = pc.utf8_length(text).to_numpy()
+    signed = pc.or_(pc.starts_with(text, "+"), pc.starts_with(text, "-")).to_numpy()
+    dot = pc.find_substring(text, ".").to_numpy()
+    has_dot = dot >= 0
+    is_int = is_dec & ~has_dot
+    int_digits = np.where(has_dot, dot, lengths) - signed
+    scale = np.where(has_dot, lengths - dot - 1, 0)
+    int_digits = np.where(is_dec, int_digits, 0)
+    scale = np.where(is_dec, scale, 0)
+
+    absent = ~present
+
+    def _all(flags):
+        return (flags | absent).reshape(shape, order="F").all(axis=0)
+
+    def _max(values):
+        values = values.reshape(shape, order="F")
+        return values.max(axis=0) if shape[0] else np.zeros(shape[1], dtype=int)
+
+    return {
+        "all_bool": _all(is_bool),
+        "all_int": _all(is_int),
+        "all_dec": _all(is_dec),
+        "int_digits": _max(int_digits),
+        "scale": _max(scale),
+    }
+
+
+def _parses(values, fmt):
+    return bool(pd.to_datetime(values, format=fmt, errors="coerce").notna().all())
+
+
+def detect_datetime_formats(values):
+    """Yield, in preference order, the datetime formats that parse a sample of values."""
+    sample = values.iloc[:FORMAT_SAMPLE_ROWS].astype(str)
+    # Every supported format starts with a digit and has a bounded width,
+    # which rules out most text columns before any parse is attempted.
+    if not (sample.str.len().between(6, 32).all() and sample.str.match(r"[0-9]").all()):
+        return
+    for fmt in DATETIME_FORMATS:
+        if _parses(sample, fmt):
+            yield fmt
+
+
+class TypeState:
+    """Candidate types and sizing facts for one column, narrowed chunk by chunk."""
+
+    __slots__ = ("candidates", "int_digits", "scale", "datetime_format", "observed")
+
+    def __init__(self):
+        self.candidates = ALL_CANDIDATES
+        self.int_digits = 0
+        self.scale = 0
+        self.datetime_format = None
+        self.observed = False
+
+    def observe(self, all_bool, all_int, all_dec, int_digits, scale, get_values):
+        """
+        Narrow the candidates with one chunk of non-null values of the column.
+        The flags and digit counts come from classify_block; get_values returns
+        the chunk's non-null values and is only called when a datetime format
+        still has to be detected or validated.
+        """
+        self.observed = True
+        if not all_bool:
+            self.candidates &= ~BOOLEAN
+        if not all_int:
+            self.candidates &= ~INTEGER
+        if not all_dec:
+            self.candidates &= ~DECIMAL
+        self.int_digits = max(self.int_digits, int(int_digits))
+        self.scale = max(self.scale, int(scale))
+        if self.candidates & (BOOLEAN | DECIMAL):
+            # Numeric and boolean values never parse with a datetime format,
+            # and dropping the candidate keeps later chunks from reviving it.
+            self.candidates &= ~(DATE | TIMESTAMP)
+        elif self.candidates & (DATE | TIMESTAMP):
+            self._observe_datetime(get_values())
+
+    def _observe_datetime(self, values):
+        if self.datetime_format is not None:
+            if not _parses(values, self.datetime_format):
+                self.candidates &= ~(DATE | TIMESTAMP)
+            return
+        # Detect the format once on a sample, then validate the full chunk
+        # with that fixed format instead of per-element format guessing.
+        for fmt in detect_datetime_formats(values):
+            if _parses(values, fmt):
+                self.datetime_format = fmt
+                self.candidates &= ~(TIMESTAMP if fmt in DATE_FORMATS else DATE)
+                return
+        self.candidates &= ~(DATE | TIMESTAMP)
+
+    def merge(self, other):
+        """
+        Fold in the state of the same column profiled from other rows.
+        Two different datetime formats cannot describe one column, so they
+        rule out the datetime candidates.
+        """
+        if not other.observed:
+            return self
+        if not self.observed:
+            self.candidates = other.candidates
+            self.datetime_format = other.datetime_format
+        else:
+            self.candidates &= other.candidates
+            if None not in (self.datetime_format, other.datetime_format) \
+                    and self.datetime_format != other.datetime_format:
+                self.candidates &= ~(DATE | TIMESTAMP)
+            self.datetime_format = self.datetime_format or other.datetime_format
+        self.int_digits = max(self.int_digits, other.int_digits)
+        self.scale = max(self.scale, other.scale)
+        self.observed = True
+        return self
+
+    def to_state(self):
+        """Plain-data snapshot of the state, as stored by modules.profile_state."""
+        return [self.candidates, self.int_digits, self.scale, self.datetime_format, self.observed]
+
+    @classmethod
+    def from_state(cls, state):
+        type_state = cls()
+        (type_state.candidates, type_state.int_digits, type_state.scale,
+         type_state.datetime_format, type_state.observed) = state
+        return type_state
+
+    def datatype(self, max_length):
+        """Render the most specific surviving candidate as a sized type."""
+        if not self.observed:
+            return DEFAULT_VARCHAR
+        if self.candidates & BOOLEAN:
+            return "BOOLEAN"
+        if self.candidates & INTEGER and self.int_digits <= MAX_PRECISION:
+            return f"NUMBER({max(self.int_digits, 1)},0)"
+        if self.candidates & DECIMAL and self.int_digits + self.scale <= MAX_PRECISION:
+            precision = max(self.int_digits + self.scale, 1)
+            return f"NUMBER({precision},{self.scale})"
+        if self.candidates & DATE:
+            return "DATE"
+        if self.candidates & TIMESTAMP:
+            return "TIMESTAMP_NTZ"
+        return f"VARCHAR({max(int(max_length), 1)})"
+
+
+def infer_type(values):
+    """Infer the sized type of a single Series of values."""
+    values = values.dropna()
+    if values.empty:
+        return DEFAULT_VARCHAR
+    text = pa.chunked_array([arrow_text(values)])
+    present = np.ones(len(values), dtype=bool)
+    flags = classify_block(text, present, (len(values), 1))
+    state = TypeState()
+    state.observe(*(flags[key][0] for key in (
+        "all_bool", "all_int", "all_dec", "int_digits", "scale"
+    )), lambda: values)
+    return state.datatype(pc.max(pc.utf8_length(text)).as_py())
@@ -25,21 +25,23 @@ search_term = st.text_input("Search for datasets", "")
 def get_datasets(search):
     conn = get_postgres_connection()
     cursor = conn.cursor()
-    if search:
-        cursor.execute("""
-            SELECT * FROM sys_config_datasets 
-            WHERE dataset_name ILIKE %s 
-            OR source_system ILIKE %s 
-            OR description ILIKE %s
-            ORDER BY dataset_name;
-        """, (f'%{search}%', f'%{search}%', f'%{search}%'))
-    else:
-        cursor.execute("SELECT * FROM sys_config_datasets ORDER BY dataset_name;")
-    
-    columns = [desc[0] for desc in cursor.description]
-    datasets = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    try:
+        if search:
+            cursor.execute("""
+                SELECT * FROM sys_config_datasets 
+                WHERE dataset_name ILIKE %s 
+                OR source_system ILIKE %s 
+                OR description ILIKE %s
+                ORDER BY dataset_name;
+            """, (f'%{search}%', f'%{search}%', f'%{search}%'))
+        else:
+            cursor.execute("SELECT * FROM sys_config_datasets ORDER BY dataset_name;")
+
+        columns = [desc[0] for desc in cursor.description]
+        datasets = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
     
     return pd.DataFrame(datasets, columns=columns)
 
@@ -47,16 +49,18 @@ def get_datasets(search):
 def get_fields(dataset_name):
     conn = get_postgres_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT * FROM sys_config_fields 
-        WHERE dataset_name = %s
-        ORDER BY field_name;
-    """, (dataset_name,))
-    
-    columns = [desc[0] for desc in cursor.description]
-    fields = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    try:
+        cursor.execute("""
+            SELECT * FROM sys_config_fields 
+            WHERE dataset_name = %s
+            ORDER BY field_name;
+        """, (dataset_name,))
+
+        columns = [desc[0] for desc in cursor.description]
+        fields = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
     
     return pd.DataFrame(fields, columns=columns)
 
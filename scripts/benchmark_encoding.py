@@ -0,0 +1,71 @@
+"""
+Benchmark the Redshift column encodings picked for generated DDL. Profiles
+a file (or a synthetic CSV), then estimates the compressed size of a sample
+of its rows under every encoding and compares the picks against leaving
+every column RAW or encoding every column ZSTD.
+
+Usage:
+    python scripts/benchmark_encoding.py                     # synthetic CSV
+    python scripts/benchmark_encoding.py --sample 50000 path/to/file.csv
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+
+def write_synthetic_csv(rows, directory, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {
+        "event_id": np.arange(rows),
+        "event_dt": (np.datetime64('2024-01-01') + np.arange(rows) * 365 // rows).astype(str),
+        "region": np.repeat(np.array(["EMEA", "APAC", "AMER"]), -(-rows // 3))[:rows],
+        "status": rng.choice(["NEW", "OPEN", "CLOSED", "VOID"], rows),
+        "amount": rng.integers(0, 100_000, rows) / 100,
+        "comment": np.char.add("comment ", rng.integers(0, 50_000, rows).astype(str)),
+    }
+    path = os.path.join(directory, f"synthetic_{rows}.csv")
+    pd.DataFrame(data).to_csv(path, index=False)
+    return path
+
+
+def benchmark(path, sample_rows):
+    from modules.encoding import encoding_benchmark
+    from modules.metadata import extract_from_uploaded_file
+
+    table_nm = os.path.basename(path)
+    with open(path, "rb") as f:
+        metadata_df, _, field_stats = extract_from_uploaded_file(
+            f, "bench", table_nm, lambda name: pd.DataFrame([{"file_patrn_txt": name}]),
+            return_stats=True
+        )
+    sample = pd.read_csv(path, dtype=str, keep_default_na=False, nrows=sample_rows)
+    sample = sample.rename(columns=str.strip).replace("", None)
+    return encoding_benchmark(sample, metadata_df, field_stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estimate compressed column sizes per encoding')
+    parser.add_argument('file', nargs='?', help='CSV to profile (default: synthetic)')
+    parser.add_argument('--rows', type=int, default=200_000, help='synthetic CSV rows')
+    parser.add_argument('--sample', type=int, default=100_000, help='rows used for the estimates')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file or write_synthetic_csv(args.rows, tmp)
+        report = benchmark(path, args.sample)
+    pd.set_option("display.width", 160)
+    print(report.to_string(index=False))
+    raw, zstd, picked = report["RAW"].sum(), report["ZSTD"].sum(), report["encoded_bytes"].sum()
+    print(f"\nRAW {raw:,} bytes | ZSTD everywhere {zstd:,} bytes ({100 * zstd / raw:.0f}%) | "
+          f"picked encodings {picked:,} bytes ({100 * picked / raw:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark the pyarrow and pandas parser engines end to end (parse plus
+metadata extraction). Each run happens in a fresh process so peak RSS is
+measured per engine rather than accumulated across runs.
+
+Usage:
+    python scripts/benchmark_parsers.py                      # sample files + synthetic CSV
+    python scripts/benchmark_parsers.py --rows 500000 path/to/file.csv
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+ENGINES = ["pandas", "pyarrow"]
+
+
+def _peak_rss_mb():
+    # Prefer the process high-water mark: ru_maxrss survives fork and exec,
+    # so a spawned child would report the parent's peak.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _run(path, engine, queue):
+    from modules.file_processor import profile_zip_members, read_csv, read_excel
+    from modules.metadata import extract_metadata_from_dataframe
+
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".zip":
+        results = profile_zip_members(path, max_workers=1, engine=engine)
+        columns = sum(len(result["profile"]) for result in results)
+    else:
+        with open(path, "rb") as f:
+            df = read_csv(f, engine=engine) if ext == ".csv" else read_excel(f, engine=engine)
+        columns = len(extract_metadata_from_dataframe(df, "src", os.path.basename(path)))
+    queue.put((time.perf_counter() - start, _peak_rss_mb() - baseline, columns))
+
+
+def measure(path, engine):
+    """Return (seconds, peak RSS growth in MB, profiled columns) in a fresh process."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run, args=(path, engine, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def write_synthetic_csv(rows, cols, directory, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(cols):
+        kind = i % 3
+        if kind == 0:
+            data[f"col_{i}"] = rng.permutation(rows)
+        elif kind == 1:
+            data[f"col_{i}"] = (np.datetime64('2020-01-01') + rng.integers(0, 2000, rows)).astype(str)
+        else:
+            data[f"col_{i}"] = np.char.add('val_', rng.integers(0, 5000, rows).astype(str))
+    path = os.path.join(directory, f"synthetic_{rows}x{cols}.csv")
+    pd.DataFrame(data).to_csv(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CSV/Excel parser engines')
+    parser.add_argument('files', nargs='*', help='files to parse (default: Sample_Files)')
+    parser.add_argument('--rows', type=int, default=200_000, help='synthetic CSV rows (0 to skip)')
+    parser.add_argument('--cols', type=int, default=30)
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(ROOT, 'Sample_Files', '*')))
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.rows:
+            files.append(write_synthetic_csv(args.rows, args.cols, tmp))
+        print(f"{'file':40} {'engine':8} {'seconds':>9} {'peak MB':>9} {'columns':>8}")
+        for path in files:
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            for engine in ENGINES:
+                seconds, peak_mb, columns = measure(path, engine)
+                name = f"{os.path.basename(path)} ({size_mb:.1f} MB)"
+                print(f"{name[:40]:40} {engine:8} {seconds:9.3f} {peak_mb:9.1f} {columns:8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark writing sys_config_table_field_info rows as the generated literal
+INSERT script against the direct-load paths (COPY FROM STDIN and
+execute_values). Without --dsn only the client side is measured (building
+the script or the COPY payload); with --dsn every path is also run against
+that database in a scratch schema, which is dropped afterwards.
+
+Usage:
+    python scripts/benchmark_sys_config_load.py                  # 10k field rows
+    python scripts/benchmark_sys_config_load.py --rows 50000 --dsn "host=... dbname=... user=..."
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from modules.db import copy_dataframe, insert_dataframe  # noqa: E402
+from modules.metadata import FIELD_INFO_COLUMNS  # noqa: E402
+from modules.sql_generator import create_insert_statement  # noqa: E402
+
+SCHEMA = "sys_config_load_bench"
+TABLE = f"{SCHEMA}.sys_config_table_field_info"
+
+
+def field_rows(rows, fields_per_table=200):
+    """rows synthetic field_info rows, with quotes in the descriptions."""
+    data = []
+    for idx in range(rows):
+        table, position = divmod(idx, fields_per_table)
+        data.append({
+            "src_nm": "bench", "src_table_nm": f"table_{table}", "field_nm": f"field_{position}",
+            "field_posn_nbr": position + 1, "datatype_nm": "VARCHAR(64)", "datatype_size_val": 64,
+            "datatype_scale_val": "", "key_ind": "X" if position == 0 else "",
+            "field_desc": f"Customer's \"{position}\" field, as loaded",
+        })
+    return pd.DataFrame(data).reindex(columns=FIELD_INFO_COLUMNS, fill_value="")
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def client_side(df):
+    seconds, script = _timed(lambda: create_insert_statement(TABLE, df))
+    buffer = io.StringIO()
+    copy_seconds, _ = _timed(lambda: df.to_csv(buffer, index=False, header=False, na_rep="\\N"))
+    return [
+        ("literal script (build)", seconds, len(script)),
+        ("COPY payload (build)", copy_seconds, len(buffer.getvalue())),
+    ]
+
+
+def server_side(df, dsn):
+    import psycopg2
+
+    conn = psycopg2.connect(dsn)
+    results = []
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+            columns = ", ".join(f"{col} TEXT" for col in df.columns)
+            cur.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} ({columns})")
+        conn.commit()
+        paths = [
+            ("literal script (execute)", lambda cur: cur.execute(create_insert_statement(TABLE, df))),
+            ("COPY FROM STDIN", lambda cur: copy_dataframe(cur, TABLE, df)),
+            ("execute_values", lambda cur: insert_dataframe(cur, TABLE, df)),
+        ]
+        for name, load in paths:
+            with conn.cursor() as cur:
+                cur.execute(f"TRUNCATE {TABLE}")
+                seconds, _ = _timed(lambda: (load(cur), conn.commit()))
+                cur.execute(f"SELECT count(*) FROM {TABLE}")
+                results.append((name, seconds, cur.fetchone()[0]))
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sys_config script vs direct load')
+    parser.add_argument('--rows', type=int, default=10_000, help='field_info rows')
+    parser.add_argument('--dsn', help='libpq connection string of a scratch database')
+    args = parser.parse_args()
+
+    df = field_rows(args.rows)
+    print(f"{'path':28} {'seconds':>9} {'bytes':>12}")
+    for name, seconds, size in client_side(df):
+        print(f"{name:28} {seconds:9.3f} {size:12,}")
+    if args.dsn:
+        print(f"\n{'path':28} {'seconds':>9} {'rows':>12}")
+        for name, seconds, rows in server_side(df, args.dsn):
+            print(f"{name:28} {seconds:9.3f} {rows:12,}")
+    else:
+        print("\nPass --dsn to time the loads against a database.")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,13 @@ import os
 import sys
 import argparse
 
-def get_secret(secret_name, region_name="us-east-1"):
-    """Retrieve database credentials from AWS Secrets Manager"""
-    session = boto3.session.Session()
-    client = session.client(service_name='secretsmanager', region_name=region_name)
-    response = client.get_secret_value(SecretId=secret_name)
-    return json.loads(response['SecretString'])
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.credentials import connect_with_secret, secret_cache  # noqa: E402
+
+def get_secret(secret_name, region_name="us-east-1", refresh=False):
+    """Retrieve database credentials from AWS Secrets Manager (cached, see modules.credentials)"""
+    return secret_cache.get(secret_name, region_name, refresh=refresh)
 
 def get_db_connection(env):
     """Get database connection for the specified environment"""
@@ -37,19 +38,17 @@ def get_db_connection(env):
     
     db_config = config['database']
     
-    # Get credentials from Secrets Manager
-    secret = get_secret(db_config['secret_name'], db_config['region'])
-    
-    # Create connection
-    conn = psycopg2.connect(
-        host=db_config['host'],
-        dbname=db_config['dbname'],
-        user=secret['username'],
-        password=secret['password'],
-        port=db_config['port']
-    )
+    def connect(secret):
+        return psycopg2.connect(
+            host=db_config['host'],
+            dbname=db_config['dbname'],
+            user=secret['username'],
+            password=secret['password'],
+            port=db_config['port']
+        )
     
-    return conn
+    # Credentials from Secrets Manager, refreshed once if rejected after a rotation
+    return connect_with_secret(db_config['secret_name'], db_config['region'], connect)
 
 def create_migrations_table_if_needed(cursor):
     """Create migrations tracking table if it doesn't exist"""
@@ -0,0 +1,129 @@
+import bz2
+import gzip
+import io
+import tarfile
+import zipfile
+
+import pandas as pd
+import pytest
+from modules.archives import ArchiveLimitError, ArchiveLimits, ReplayReader, walk
+from modules.file_processor import _is_table, process_uploaded_zip
+from modules.metadata import extract_from_uploaded_file
+
+
+def _upload(content, name):
+    upload = io.BytesIO(content)
+    upload.name = name
+    return upload
+
+
+def _tar_gz(members):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as archive:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buf.getvalue()
+
+
+def _zip(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buf.getvalue()
+
+
+def _table_info(filename):
+    return pd.DataFrame([{"file_patrn_txt": filename}])
+
+
+def test_compressed_csv_is_a_single_table():
+    upload = _upload(gzip.compress(b"id;name\n1;a\n2;b\n"), "orders.csv.gz")
+    metadata_df, table_info_df = extract_from_uploaded_file(upload, "src", "orders", _table_info)
+    assert list(metadata_df["field_nm"]) == ["id", "name"]
+    assert metadata_df.loc[0, "key_ind"] == "X"
+    assert table_info_df["file_patrn_txt"].iloc[0] == "orders.csv"
+
+
+def test_nested_archives_are_walked():
+    inner_zip = _zip({"b.csv": b"code\nX\nY\n", "skip.txt": b"ignored"})
+    upload = _upload(_tar_gz({
+        "feed/a.csv.bz2": bz2.compress(b"id,val\n1,x\n2,y\n"),
+        "feed/more.zip": inner_zip,
+    }), "feed.tgz")
+    metadata_df, table_info_df = extract_from_uploaded_file(upload, "src", "feed", _table_info)
+    assert list(metadata_df["src_table_nm"]) == ["a", "a", "b"]
+    assert list(table_info_df["file_patrn_txt"]) == ["a.csv", "b.csv"]
+
+
+def test_zip_of_gzipped_csvs():
+    archive = io.BytesIO(_zip({"a.csv.gz": gzip.compress(b"id\n1\n2\n"), "b.csv": b"x\n1\n"}))
+    _, _, report = process_uploaded_zip(
+        archive, "src", "tbl", _table_info, max_workers=1, return_report=True
+    )
+    assert list(report["member"]) == ["a.csv", "b.csv"]
+    assert list(report["row_count"]) == [2, 1]
+
+
+def test_failed_members_have_no_confidence():
+    archive = io.BytesIO(_zip({"a.csv.gz": b"not gzip", "b.csv": b"x\n1\n"}))
+    _, _, report = process_uploaded_zip(
+        archive, "src", "tbl", _table_info, max_workers=1, return_report=True
+    )
+    assert list(report["status"]) == ["error", "ok"]
+    assert pd.isna(report.loc[0, "min_confidence"]) and report.loc[1, "min_confidence"] == 1.0
+
+
+def test_limits_stop_decompression_bombs():
+    bomb = gzip.compress(b"a\n" + b"1\n" * 500_000)
+    parts = walk(io.BytesIO(bomb), "bomb.csv.gz", _is_table, ArchiveLimits(max_bytes=100_000))
+    with pytest.raises(ArchiveLimitError):
+        for _, stream, _ in parts:
+            stream.read()
+    nested = gzip.compress(gzip.compress(gzip.compress(b"a\n1\n")))
+    with pytest.raises(ArchiveLimitError):
+        list(walk(io.BytesIO(nested), "x.csv.gz.gz.gz", _is_table, ArchiveLimits(max_depth=1)))
+
+
+def test_zip_cap_counts_bytes_decompressed_across_members(monkeypatch):
+    from modules import file_processor
+
+    content = b"a\n" + b"1\n" * 30_000
+    members = {"a.csv.gz": gzip.compress(content), "b.csv.gz": gzip.compress(content)}
+    # Each member fits the cap alone; together they expand past it.
+    monkeypatch.setattr(file_processor, "ARCHIVE_MAX_BYTES", 100_000)
+    results = file_processor.profile_zip_members(io.BytesIO(_zip(members)), max_workers=1)
+    assert [result["status"] for result in results] == ["error", "error"]
+    monkeypatch.setattr(file_processor, "ARCHIVE_MAX_BYTES", 200_000)
+    results = file_processor.profile_zip_members(io.BytesIO(_zip(members)), max_workers=1)
+    assert [result["row_count"] for result in results] == [30_000, 30_000]
+
+
+def test_replay_reader_rewinds_within_buffer():
+    reader = ReplayReader(io.BytesIO(b"abcdefgh"), max_buffer=4)
+    assert reader.read(3) == b"abc"
+    reader.seek(0)
+    assert reader.read(8) == b"abcdefgh"
+    with pytest.raises(io.UnsupportedOperation):
+        reader.seek(0)
+
+
+@pytest.mark.parametrize("wrap", ["gz", "tar"])
+def test_members_over_the_stream_threshold_are_streamed(monkeypatch, wrap):
+    from modules import archives, metadata
+
+    # Measuring a member reads one byte past the threshold, then rewinds.
+    assert archives.REPLAY_BYTES > metadata.STREAM_THRESHOLD_BYTES
+    threshold = 1000
+    monkeypatch.setattr(metadata, "STREAM_THRESHOLD_BYTES", threshold)
+    monkeypatch.setattr(archives, "REPLAY_BYTES", threshold + archives.READ_CHUNK_BYTES)
+    content = b"id,val\n" + b"".join(b"%d,x\n" % i for i in range(200_000))
+    assert len(content) > archives.REPLAY_BYTES
+    if wrap == "gz":
+        upload = _upload(gzip.compress(content), "big.csv.gz")
+    else:
+        upload = _upload(_tar_gz({"big.csv": content}), "big.tgz")
+    metadata_df, _ = extract_from_uploaded_file(upload, "src", "big", _table_info)
+    assert list(metadata_df["field_nm"]) == ["id", "val"]
@@ -0,0 +1,74 @@
+import io
+import json
+
+import pandas as pd
+from modules.column_stats import FrequentItems
+from modules.metadata import extract_from_uploaded_file
+from modules.profiler import ProfileAccumulator, profile_chunks, profile_dataframe
+
+
+def test_min_max_follow_the_inferred_type():
+    df = pd.DataFrame({
+        'n': ['9', '10', '-2', None],
+        'd': ['31/12/2023', '01/02/2024', '15/01/2024', '02/01/2024'],
+        'txt': ['b', '10', 'a', '9'],
+    })
+    profile = profile_dataframe(df).set_index('field_nm')
+    assert (profile.loc['n', 'min_val'], profile.loc['n', 'max_val']) == ('-2', '10')
+    assert profile.loc['n', 'null_ratio'] == 0.25
+    assert (profile.loc['d', 'min_val'], profile.loc['d', 'max_val']) == ('31/12/2023', '01/02/2024')
+    assert (profile.loc['txt', 'min_val'], profile.loc['txt', 'max_val']) == ('10', 'b')
+
+
+def test_chunked_stats_match_single_pass():
+    df = pd.DataFrame({
+        'code': [f'C{i % 7}' for i in range(3000)],
+        'amount': [str(i % 500) for i in range(3000)],
+    })
+    whole = profile_dataframe(df).set_index('field_nm')
+    chunked = profile_chunks(df.iloc[i:i + 400] for i in range(0, 3000, 400)).set_index('field_nm')
+    for col in ['null_ratio', 'min_val', 'max_val']:
+        assert list(whole[col]) == list(chunked[col])
+    assert whole.loc['code', 'top_values'] == chunked.loc['code', 'top_values']
+    top = json.loads(whole.loc['code', 'top_values'])
+    assert top[0] == ['C0', 429] and len(top) == 7
+    bounds = json.loads(whole.loc['amount', 'histogram'])
+    assert len(bounds) == 11 and bounds[0] == '0' and bounds[-1] == '499'
+    assert [float(b) for b in bounds] == sorted(float(b) for b in bounds)
+    # Runs spanning chunk boundaries are counted once.
+    runs = pd.DataFrame({'flag': ['Y'] * 1000 + ['N'] * 2000, 'code': df['code']})
+    whole = profile_dataframe(runs).set_index('field_nm')
+    chunked = profile_chunks(runs.iloc[i:i + 400] for i in range(0, 3000, 400)).set_index('field_nm')
+    assert whole.loc['flag', 'avg_run_length'] == chunked.loc['flag', 'avg_run_length'] == 1500
+    assert whole.loc['code', 'avg_run_length'] == chunked.loc['code', 'avg_run_length'] == 1
+
+
+def test_frequent_items_keeps_heavy_hitters():
+    items = FrequentItems(capacity=3)
+    items.add_counts(['a', 'b', 'c', 'd', 'e'], [50, 20, 2, 1, 1])
+    items.add_counts(['a', 'f'], [10, 30])
+    assert [value for value, _ in items.top(3)] == ['a', 'f', 'b']
+
+
+def test_upload_returns_field_stats():
+    upload = io.BytesIO(b'id,status\n1,OPEN\n2,OPEN\n3,CLOSED\n')
+    upload.name = 'orders.csv'
+    _, _, stats = extract_from_uploaded_file(
+        upload, 'src', 'orders', lambda name: pd.DataFrame([{'file_patrn_txt': name}]),
+        return_stats=True
+    )
+    assert list(stats['field_nm']) == ['id', 'status']
+    assert list(stats['src_table_nm']) == ['orders', 'orders']
+    assert json.loads(stats.loc[1, 'top_values']) == [['OPEN', 2]]
+
+
+def test_key_check_reuses_value_counts():
+    df = pd.DataFrame({
+        'id': [str(i) for i in range(500)],
+        'dup': [str(i) for i in range(499)] + ['7'],
+    })
+    with_stats = profile_dataframe(df).set_index('field_nm')
+    assert with_stats['is_unique'].to_dict() == {'id': True, 'dup': False}
+    accumulator = ProfileAccumulator(df.columns)
+    accumulator.update(df)
+    assert [stats.repeats for stats in accumulator.stats] == [False, True]
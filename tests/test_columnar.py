@@ -0,0 +1,98 @@
+import datetime
+import decimal
+import io
+import json
+
+import pyarrow as pa
+import pyarrow.orc as orc
+import pyarrow.parquet as pq
+from modules.columnar import avro_snowflake_type, profile_columnar
+from modules.metadata import extract_from_uploaded_file
+
+
+def _table():
+    return pa.table({
+        "id": pa.array([1, 2, 3], type=pa.int32()),
+        "name": ["a", None, "ccc"],
+        "amount": pa.array([decimal.Decimal("1.25"), None, decimal.Decimal("10.50")],
+                           type=pa.decimal128(9, 2)),
+        "created": [datetime.datetime(2024, 1, 1)] * 3,
+    })
+
+
+def _parquet_bytes():
+    buf = io.BytesIO()
+    pq.write_table(_table(), buf)
+    buf.seek(0)
+    return buf
+
+
+def _avro_long(value):
+    value = (value << 1) ^ (value >> 63)
+    out = bytearray()
+    while value & ~0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _avro_bytes(schema, blocks):
+    """A minimal uncompressed Avro container whose blocks hold opaque payloads."""
+    sync = b"\x00" * 16
+    schema_json = json.dumps(schema).encode()
+    header = b"Obj\x01" + _avro_long(1) + _avro_long(11) + b"avro.schema" \
+        + _avro_long(len(schema_json)) + schema_json + _avro_long(0) + sync
+    body = b"".join(
+        _avro_long(count) + _avro_long(len(payload)) + payload + sync
+        for count, payload in blocks
+    )
+    return io.BytesIO(header + body)
+
+
+def test_parquet_schema_only_profile():
+    profile, key_columns = profile_columnar(_parquet_bytes(), ".parquet", False, "schema")
+    assert list(profile["datatype_nm"]) == ["NUMBER(10,0)", "VARCHAR", "NUMBER(9,2)", "TIMESTAMP_NTZ"]
+    assert list(profile["null_count"]) == [0, 1, 1, 0]
+    assert profile["row_count"].iloc[0] == 3
+    assert key_columns == ()
+
+
+def test_full_profile_keeps_declared_types_and_sizes_strings():
+    profile, key_columns = profile_columnar(_parquet_bytes(), ".parquet", False, "full")
+    assert list(profile["datatype_nm"]) == ["NUMBER(10,0)", "VARCHAR(3)", "NUMBER(9,2)", "TIMESTAMP_NTZ"]
+    assert key_columns == ("id",)
+    streamed, _ = profile_columnar(_parquet_bytes(), ".parquet", True, "full")
+    assert list(streamed["datatype_nm"]) == list(profile["datatype_nm"])
+
+
+def test_orc_and_avro_schemas():
+    buf = io.BytesIO()
+    orc.write_table(_table().drop(["amount"]), buf)
+    buf.seek(0)
+    profile, _ = profile_columnar(buf, ".orc", False, "schema")
+    assert list(profile["datatype_nm"]) == ["NUMBER(10,0)", "VARCHAR", "TIMESTAMP_NTZ"]
+    assert profile["row_count"].iloc[0] == 3
+
+    schema = {"type": "record", "name": "r", "fields": [
+        {"name": "id", "type": "long"},
+        {"name": "day", "type": ["null", {"type": "int", "logicalType": "date"}]},
+        {"name": "price", "type": {"type": "bytes", "logicalType": "decimal",
+                                   "precision": 12, "scale": 4}},
+    ]}
+    avro = _avro_bytes(schema, [(2, b"\x01" * 7), (3, b"\x02" * 40)])
+    profile, _ = profile_columnar(avro, ".avro", False, "schema")
+    assert list(profile["datatype_nm"]) == ["NUMBER(19,0)", "DATE", "NUMBER(12,4)"]
+    assert profile["row_count"].iloc[0] == 5
+    assert avro_snowflake_type(["null", "string", "long"]) == "VARIANT"
+
+
+def test_parquet_upload_renders_field_info():
+    upload = _parquet_bytes()
+    upload.name = "orders.parquet"
+    metadata_df, table_info_df = extract_from_uploaded_file(
+        upload, "src", "orders.parquet", lambda name: pa.table({"f": [name]}).to_pandas()
+    )
+    assert list(metadata_df["field_nm"]) == ["id", "name", "amount", "created"]
+    assert list(metadata_df["src_table_nm"].unique()) == ["orders"]
+    assert table_info_df["f"].iloc[0] == "orders.parquet"
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import psycopg2
+import pytest
+from modules.credentials import SecretCache, connect_with_secret
+
+
+class FakeSecrets:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.password = "first"
+
+    def __call__(self, secret_name, region_name):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {"username": "app", "password": self.password}
+
+
+def test_secrets_are_cached_until_the_ttl():
+    secrets = FakeSecrets()
+    cache = SecretCache(secrets, ttl=0.05, min_refresh=0)
+    first = cache.get("db", "us-east-1")
+    first["password"] = "changed by caller"
+    assert cache.get("db", "us-east-1")["password"] == "first"
+    assert secrets.calls == 1
+    cache.get("db", "eu-west-1")
+    assert secrets.calls == 2
+    time.sleep(0.06)
+    cache.get("db", "us-east-1")
+    assert secrets.calls == 3
+
+
+def test_concurrent_misses_share_one_fetch():
+    secrets = FakeSecrets(delay=0.1)
+    cache = SecretCache(secrets)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("db"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert secrets.calls == 1 and len(results) == 8
+
+
+def test_rejected_credentials_refresh_once_and_retry():
+    secrets = FakeSecrets()
+    cache = SecretCache(secrets, min_refresh=0)
+    cache.get("db")
+    secrets.password = "rotated"
+    attempts = []
+
+    def connect(secret):
+        attempts.append(secret["password"])
+        if secret["password"] != "rotated":
+            raise psycopg2.OperationalError('FATAL:  password authentication failed for user "app"')
+        return "connection"
+
+    assert connect_with_secret("db", None, connect, cache) == "connection"
+    assert attempts == ["first", "rotated"] and secrets.calls == 2
+
+    def unreachable(secret):
+        raise psycopg2.OperationalError("could not connect to server: Connection refused")
+
+    with pytest.raises(psycopg2.OperationalError):
+        connect_with_secret("db", None, unreachable, cache)
+    assert secrets.calls == 2
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+from modules.db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.healthy = True
+        self.status = TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def execute(self, query):
+                if not conn.healthy:
+                    raise RuntimeError("server closed the connection unexpectedly")
+
+        return Cursor()
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def _pool(**kwargs):
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    return ConnectionPool(connect, **kwargs), opened
+
+
+def test_connections_are_reused_and_rolled_back():
+    pool, opened = _pool(maxconn=2)
+    conn = pool.checkout()
+    conn.status = TRANSACTION_STATUS_INTRANS
+    conn.close()
+    assert conn.closed and opened[0].rollbacks == 1 and not opened[0].closed
+    with pool.connection() as raw:
+        assert raw is opened[0]
+    assert len(opened) == 1
+    assert pool.metrics()["checkouts"] == 2 and pool.metrics()["idle"] == 1
+
+
+def test_saturated_pool_waits_then_times_out():
+    pool, _ = _pool(maxconn=1, timeout=0.2)
+    held = pool.getconn()
+    threading.Timer(0.05, pool.putconn, [held]).start()
+    assert pool.getconn() is held
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    metrics = pool.metrics()
+    assert metrics["saturation"] == 1.0 and metrics["waited_checkouts"] == 1
+    assert metrics["timeouts"] == 1 and metrics["max_wait_ms"] >= 40
+
+
+def test_unhealthy_and_idle_connections_are_replaced():
+    pool, opened = _pool(minconn=1, maxconn=3, check_after=0)
+    first = pool.getconn()
+    pool.putconn(first)
+    first.healthy = False
+    assert pool.getconn() is opened[1] and first.closed
+    assert pool.metrics()["failed_health_checks"] == 1
+
+    pool, opened = _pool(minconn=1, maxconn=3, max_idle=0.05)
+    conns = [pool.getconn() for _ in range(3)]
+    for conn in conns:
+        pool.putconn(conn)
+    time.sleep(0.06)
+    pool.getconn()
+    # Idle connections beyond minconn are closed; the newest is reused.
+    assert [conn.closed for conn in opened] == [1, 1, 0]
+    assert pool.metrics()["size"] == 1
+
+
+def test_broken_connection_is_not_returned_to_the_pool():
+    pool, opened = _pool()
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.closed = 2
+            raise RuntimeError("connection lost")
+    assert pool.metrics()["size"] == 0
+    assert pool.getconn() is opened[1]
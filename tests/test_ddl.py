@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+from modules.metadata import extract_field_stats_from_profile, extract_metadata_from_dataframe
+from modules.profiler import profile_dataframe
+from modules.sql_generator import generate_create_table_script
+from modules.ddl import (
+    parse_type, right_sized_type, storage_savings_report, type_size_scale, varchar_length
+)
+
+
+@pytest.mark.parametrize("datatype, dialect, expected", [
+    ("VARCHAR(13)", "snowflake", "VARCHAR(32)"),
+    ("VARCHAR(100)", "redshift", "VARCHAR(128)"),
+    ("VARCHAR(255)", "redshift", "VARCHAR(255)"),
+    ("NUMBER(3,0)", "redshift", "SMALLINT"),
+    ("NUMBER(8,0)", "redshift", "INTEGER"),
+    ("NUMBER(12,0)", "redshift", "BIGINT"),
+    ("NUMBER(19,0)", "redshift", "DECIMAL(20,0)"),
+    ("NUMBER(7,2)", "redshift", "DECIMAL(8,2)"),
+    ("NUMBER(7,2)", "snowflake", "NUMBER(8,2)"),
+    ("NUMBER(38,0)", "snowflake", "NUMBER(38,0)"),
+    ("TIMESTAMP_NTZ", "redshift", "TIMESTAMP"),
+    ("DATE", "snowflake", "DATE"),
+    # Unsized strings, e.g. from a schema-only columnar profile.
+    ("VARCHAR", "redshift", "VARCHAR(65535)"),
+    ("VARCHAR", "snowflake", "VARCHAR(16777216)"),
+])
+def test_right_sized_type(datatype, dialect, expected):
+    assert right_sized_type(datatype, dialect) == expected
+
+
+def test_size_and_scale_values():
+    assert parse_type("NUMBER(10, 2)") == ("NUMBER", 10, 2)
+    assert type_size_scale("NUMBER(10,2)") == (10, 2)
+    assert type_size_scale("NUMBER(4,0)") == (4, 0)
+    assert type_size_scale("VARCHAR(40)") == (40, "")
+    assert type_size_scale("DATE") == ("", "")
+    assert varchar_length(1, round_to=16) == 16
+
+
+def test_storage_savings_report():
+    metadata = pd.DataFrame({
+        "field_nm": ["id", "code", "amount"],
+        "datatype_nm": ["NUMBER(5,0)", "VARCHAR(3)", "NUMBER(6,2)"],
+    })
+    report = storage_savings_report(metadata, "redshift")
+    assert list(report["ddl_type"]) == ["INTEGER", "VARCHAR(16)", "DECIMAL(7,2)"]
+    assert list(report["ddl_bytes"]) == [4, 20, 8]
+    assert (report["baseline_bytes"] == 259).all()
+
+
+def test_redshift_varchar_is_sized_in_bytes():
+    df = pd.DataFrame({"name": ["東京都千代田区丸の内一丁目", "abc"]})
+    profile = profile_dataframe(df)
+    assert profile.loc[0, "max_length"] == 13
+    assert profile.loc[0, "max_bytes"] == 39
+    metadata = extract_metadata_from_dataframe(df, "src", "places")
+    stats = extract_field_stats_from_profile(profile, "src", "places")
+    redshift = generate_create_table_script(metadata, "land", "src", "ds", "redshift", stats)
+    assert "name VARCHAR(64)" in redshift
+    snowflake = generate_create_table_script(metadata, "land", "src", "ds", "snowflake", stats)
+    assert "name VARCHAR(32)" in snowflake
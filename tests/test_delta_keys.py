@@ -0,0 +1,72 @@
+import pandas as pd
+from modules.delta_keys import name_tokens
+from modules.metadata import extract_metadata_from_dataframe
+from modules.profiler import profile_chunks
+
+
+def _delta_keys(df):
+    result = extract_metadata_from_dataframe(df, 'src', 'events.csv')
+    return list(result.loc[result['delta_key_ind'] == 'X', 'field_nm'])
+
+
+def test_name_tokens():
+    assert name_tokens('lastModifiedTS') == ['last', 'modified', 'ts']
+    assert name_tokens('UPD_DT') == ['upd', 'dt']
+
+
+def test_update_timestamp_wins_over_growing_columns():
+    rows = 200
+    df = pd.DataFrame({
+        'event_id': [str(i) for i in range(rows)],
+        'event_dt': [f'2024-01-{i // 10 + 1:02d}' for i in range(rows)],
+        'updated_at': [f'2024-03-{(i * 7) % 28 + 1:02d} 10:00:00' for i in range(rows)],
+        'status': ['OPEN'] * rows,
+    })
+    # event_id is also the table key, so it keeps delta_key_ind.
+    assert _delta_keys(df) == ['event_id', 'updated_at']
+    assert _delta_keys(df.drop(columns=['updated_at'])) == ['event_id', 'event_dt']
+    # A growing unique sequence is the fallback; ref is only flagged as the key.
+    seq = pd.DataFrame({
+        'ref': [str((i * 37) % rows) for i in range(rows)],
+        'seq': [str(i * 3) for i in range(rows)],
+        'qty': ['1', '2'] * (rows // 2),
+    })
+    assert _delta_keys(seq) == ['ref', 'seq']
+
+
+def test_update_timestamp_wins_over_earlier_creation_timestamp():
+    rows = 200
+    df = pd.DataFrame({
+        'id': [str(i) for i in range(rows)],
+        'created_at': [f'2024-01-{i // 10 + 1:02d} 09:00:00' for i in range(rows)],
+        'updated_at': [f'2024-03-{(i * 7) % 28 + 1:02d} 10:00:00' for i in range(rows)],
+    })
+    assert _delta_keys(df) == ['id', 'updated_at']
+    assert _delta_keys(df.drop(columns=['updated_at'])) == ['id', 'created_at']
+
+
+def test_streamed_chunks_detect_monotonic_timestamps():
+    df = pd.DataFrame({
+        'ts': [f'2024-01-01 00:{i // 60:02d}:{i % 60:02d}' for i in range(3000)],
+        'v': [str(i % 5) for i in range(3000)],
+    })
+    profile = profile_chunks(df.iloc[i:i + 500] for i in range(0, 3000, 500)).set_index('field_nm')
+    assert profile.loc['ts', 'monotonic'] and not profile.loc['v', 'monotonic']
+    shuffled = pd.concat([df.iloc[1500:], df.iloc[:1500]])
+    profile = profile_chunks(shuffled.iloc[i:i + 500] for i in range(0, 3000, 500)).set_index('field_nm')
+    assert not profile.loc['ts', 'monotonic']
+
+
+def test_growing_update_timestamp_is_preferred():
+    rows = 200
+    df = pd.DataFrame({
+        'status': ['OPEN', 'CLOSED'] * (rows // 2),
+        'event_dt': [f'2024-01-{i // 10 + 1:02d}' for i in range(rows)],
+        # Named like a timestamp but not a watermark.
+        'last_login_dt': [f'2024-02-{(i * 7) % 28 + 1:02d}' for i in range(rows)],
+        'load_type_dt': ['2024-02-01', '2024-02-15', '2024-02-08', '2024-02-22'] * (rows // 4),
+    })
+    assert _delta_keys(df) == ['event_dt']
+    df['etl_dt'] = [f'2024-03-{(i * 7) % 28 + 1:02d}' for i in range(rows)]
+    df['modified_at'] = [f'2024-04-{i // 10 + 1:02d} 08:00:00' for i in range(rows)]
+    assert _delta_keys(df) == ['modified_at']
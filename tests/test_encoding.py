@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+from modules.encoding import encoding_benchmark, estimate_encoded_bytes, recommend_encoding
+from modules.metadata import extract_metadata_from_dataframe
+from modules.sql_generator import generate_create_table_script
+
+
+@pytest.mark.parametrize("ddl_type, distinct, run_length, sort_key, expected", [
+    ("DATE", 10, 1.0, True, "RAW"),
+    ("VARCHAR(16)", 3, 40.0, False, "RUNLENGTH"),
+    ("INTEGER", 5000, 1.0, False, "AZ64"),
+    ("TIMESTAMP", None, None, False, "AZ64"),
+    ("VARCHAR(16)", 12, 1.2, False, "BYTEDICT"),
+    ("VARCHAR(64)", 5000, 1.0, False, "ZSTD"),
+    ("DOUBLE PRECISION", 5000, 1.0, False, "ZSTD"),
+])
+def test_recommend_encoding(ddl_type, distinct, run_length, sort_key, expected):
+    assert recommend_encoding(ddl_type, distinct, run_length, sort_key) == expected
+
+
+def test_estimates_favour_the_matching_encoding():
+    runs = pd.Series(["ACTIVE"] * 500 + ["CLOSED"] * 500)
+    assert estimate_encoded_bytes(runs, "VARCHAR(16)", "RUNLENGTH") < 30
+    codes = pd.Series([f"CODE_{i % 12}" for i in range(1000)])
+    assert estimate_encoded_bytes(codes, "VARCHAR(16)", "BYTEDICT") < \
+        estimate_encoded_bytes(codes, "VARCHAR(16)", "RAW") / 5
+    ids = pd.Series([str(i) for i in range(1000)])
+    assert estimate_encoded_bytes(ids, "INTEGER", "AZ64") < estimate_encoded_bytes(ids, "INTEGER", "RAW") / 10
+    assert estimate_encoded_bytes(ids, "VARCHAR(8)", "AZ64") is None
+
+
+def test_encodings_in_redshift_ddl_only():
+    rows = 2000
+    df = pd.DataFrame({
+        "order_id": [str(i) for i in range(rows)],
+        "order_dt": [f"2024-01-{i // 100 + 1:02d}" for i in range(rows)],
+        "status": ["OPEN"] * (rows // 2) + ["CLOSED"] * (rows // 2),
+        "note": [f"note {i * 7919 % 1013}" for i in range(rows)],
+    })
+    metadata = extract_metadata_from_dataframe(df, "src", "orders")
+    stats = pd.DataFrame({
+        "src_table_nm": "orders", "field_nm": df.columns,
+        "distinct_cnt": [rows, 20, 2, 1013], "avg_run_len": [1.0, 100.0, 1000.0, 1.0],
+    })
+    redshift = generate_create_table_script(metadata, "land", "src", "ds", "redshift", stats)
+    assert "order_id INTEGER ENCODE AZ64" in redshift
+    assert "order_dt DATE ENCODE RAW" in redshift
+    assert "status VARCHAR(16) ENCODE RUNLENGTH" in redshift
+    assert "note VARCHAR(16) ENCODE ZSTD" in redshift
+    snowflake = generate_create_table_script(metadata, "land", "src", "ds", "snowflake", stats)
+    assert "ENCODE" not in snowflake
+
+    report = encoding_benchmark(df, metadata, stats).set_index("field_nm")
+    assert (report["encoded_bytes"] <= report["RAW"]).all()
+    assert report.loc["status", "encoded_bytes"] < report.loc["status", "ZSTD"]
@@ -0,0 +1,123 @@
+import io
+import zipfile
+
+import openpyxl
+import pandas as pd
+from modules.file_processor import (
+    process_uploaded_zip, profile_csv_stream, profile_excel_sheets, read_csv, read_excel
+)
+from modules.metadata import extract_from_uploaded_file
+
+
+def _zip_bytes(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        for name, content in members.items():
+            z.writestr(name, content)
+    buf.seek(0)
+    return buf
+
+
+def _table_info(filename):
+    return pd.DataFrame([{"file_patrn_txt": filename}])
+
+
+def test_zip_members_are_processed_in_order_with_report():
+    archive = _zip_bytes({
+        "b.csv": "id,val\n1,x\n2,y\n",
+        "a.csv": "code\nA\nB\nC\n",
+        "broken.xlsx": "not a workbook",
+        "notes.txt": "ignored",
+    })
+    metadata_df, table_info_df, report = process_uploaded_zip(
+        archive, "src", "tbl", _table_info, max_workers=2, return_report=True
+    )
+    assert list(metadata_df["src_table_nm"]) == ["b", "b", "a"]
+    assert list(table_info_df["file_patrn_txt"]) == ["b.csv", "a.csv"]
+    assert list(report["member"]) == ["b.csv", "a.csv", "broken.xlsx"]
+    assert list(report["status"]) == ["ok", "ok", "error"]
+    assert report.loc[1, "row_count"] == 3
+
+
+def test_single_worker_matches_pool():
+    members = {"t1.csv": "id\n1\n2\n", "t2.csv": "name\nx\nx\n"}
+    serial = process_uploaded_zip(_zip_bytes(members), "src", "tbl", _table_info, max_workers=1)
+    pooled = process_uploaded_zip(_zip_bytes(members), "src", "tbl", _table_info, max_workers=2)
+    pd.testing.assert_frame_equal(serial[0], pooled[0])
+    pd.testing.assert_frame_equal(serial[1], pooled[1])
+
+
+def test_parser_engines_agree():
+    content = b"id,name,amount\n1,a,1.5\n2,,NA\n3,c,2.25\n"
+    arrow_df = read_csv(io.BytesIO(content), engine="pyarrow")
+    pandas_df = read_csv(io.BytesIO(content), engine="pandas")
+    assert all(dtype == pd.StringDtype("pyarrow") for dtype in arrow_df.dtypes)
+    assert arrow_df.isna().equals(pandas_df.isna())
+    assert arrow_df.astype(object).where(arrow_df.notna(), None).values.tolist() == [
+        ["1", "a", "1.5"], ["2", None, None], ["3", "c", "2.25"]
+    ]
+    arrow_profile = profile_csv_stream(io.BytesIO(content), chunk_rows=2, engine="pyarrow")
+    pandas_profile = profile_csv_stream(io.BytesIO(content), chunk_rows=2, engine="pandas")
+    pd.testing.assert_frame_equal(arrow_profile, pandas_profile)
+
+
+def test_pyarrow_engine_falls_back_on_short_rows():
+    df = read_csv(io.BytesIO(b"a,b\n1,2\n3\n"), engine="pyarrow")
+    assert df["b"].isna().tolist() == [False, True]
+
+
+def test_streamed_pyarrow_engine_reads_multiline_values():
+    # Enough rows that Arrow's 1 MB blocks split quoted values.
+    content = b"id,note\n" + b"".join(b'%d,"a,b\nc"\n' % i for i in range(300_000))
+    arrow_profile = profile_csv_stream(io.BytesIO(content), engine="pyarrow")
+    pandas_profile = profile_csv_stream(io.BytesIO(content), engine="pandas")
+    assert int(arrow_profile["row_count"].iloc[0]) == 300_000
+    pd.testing.assert_frame_equal(arrow_profile, pandas_profile)
+
+
+def test_streamed_pyarrow_engine_falls_back_on_short_rows():
+    content = b"a,b\n1,2\n3\n4,5\n"
+    arrow_profile = profile_csv_stream(io.BytesIO(content), chunk_rows=2, engine="pyarrow")
+    pandas_profile = profile_csv_stream(io.BytesIO(content), chunk_rows=2, engine="pandas")
+    pd.testing.assert_frame_equal(arrow_profile, pandas_profile)
+    assert arrow_profile.set_index("field_nm").loc["b", "null_count"] == 1
+
+
+def _workbook_bytes(sheets):
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        worksheet = workbook.create_sheet(title)
+        for row in rows:
+            worksheet.append(row)
+    buf = io.BytesIO()
+    workbook.save(buf)
+    buf.seek(0)
+    return buf
+
+
+def test_excel_sheets_are_streamed_with_row_cap():
+    book = _workbook_bytes({
+        "Orders": [["id", "amount", "shipped"], [1, 2.5, True], [2, 3.0, None], [3, 4.0, False]],
+        "Empty": [],
+    })
+    df = read_excel(book, sample_rows=2)
+    assert list(df.columns) == ["id", "amount", "shipped"]
+    assert df.astype(object).where(df.notna(), None).values.tolist() == [
+        ["1", "2.5", "True"], ["2", "3", None]
+    ]
+    results = profile_excel_sheets(book, max_workers=1)
+    assert [result["sheet"] for result in results] == ["Orders", "Empty"]
+    assert [result["row_count"] for result in results] == [3, 0]
+
+
+def test_every_sheet_becomes_a_table():
+    book = _workbook_bytes({
+        "Sales Q1": [["id", "region"], [1, "EU"], [2, "US"]],
+        "Blank": [],
+        "Regions": [["region"], ["EU"], ["US"]],
+    })
+    book.name = "book.xlsx"
+    metadata_df, table_info_df = extract_from_uploaded_file(book, "src", "sales.xlsx", _table_info)
+    assert list(metadata_df["src_table_nm"]) == ["sales_Sales_Q1", "sales_Sales_Q1", "sales_Regions"]
+    assert list(table_info_df["file_patrn_txt"]) == ["sales_Sales_Q1.xlsx", "sales_Regions.xlsx"]
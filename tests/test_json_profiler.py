@@ -0,0 +1,44 @@
+import io
+import json
+
+import pandas as pd
+from modules.json_profiler import profile_json
+from modules.metadata import extract_from_uploaded_file
+
+
+def _ndjson(records):
+    return io.BytesIO(b"".join(json.dumps(record).encode() + b"\n" for record in records))
+
+
+def test_nested_fields_are_flattened_across_chunks():
+    records = [
+        {"id": i, "user": {"name": f"u{i % 3}", "tags": ["a"] * (i % 2)}, "ok": i % 2 == 0,
+         **({"late": 1.5} if i > 3 else {})}
+        for i in range(10)
+    ]
+    profile = profile_json(_ndjson(records), chunk_rows=3).set_index("field_nm")
+    assert list(profile.index) == ["id", "ok", "user.name", "user.tags", "late"]
+    assert list(profile["datatype_nm"]) == [
+        "NUMBER(1,0)", "BOOLEAN", "VARCHAR(2)", "VARIANT", "NUMBER(2,1)"
+    ]
+    # Rows seen before a field first appears count as nulls.
+    assert profile.loc["late", "null_count"] == 4
+    assert bool(profile.loc["id", "is_unique"])
+
+
+def test_json_array_matches_ndjson():
+    records = [{"id": str(i), "x": {"y": i * 10}} for i in range(7)]
+    array = io.BytesIO(b"\xef\xbb\xbf  " + json.dumps(records, indent=2).encode())
+    pd.testing.assert_frame_equal(
+        profile_json(array, chunk_rows=2), profile_json(_ndjson(records), chunk_rows=2)
+    )
+
+
+def test_json_upload_renders_field_info():
+    upload = _ndjson([{"id": 1, "a": {"b": "x"}}, {"id": 2, "a": {"b": "y"}}])
+    upload.name = "events.ndjson"
+    metadata_df, _ = extract_from_uploaded_file(
+        upload, "src", "events", lambda name: pd.DataFrame([{"file_patrn_txt": name}])
+    )
+    assert list(metadata_df["field_nm"]) == ["id", "a.b"]
+    assert list(metadata_df["key_ind"]) == ["X", "X"]
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from modules.key_discovery import choose_key, discover_keys
+from modules.metadata import extract_metadata_from_dataframe
+
+
+def _fact_frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'store': np.repeat(np.arange(20), 50).astype(str),
+        'day': np.tile(np.arange(50), 20).astype(str),
+        'qty': rng.integers(0, 5, 1000).astype(str),
+    })
+
+
+def test_discovers_minimal_composite_key_from_sample():
+    keys = discover_keys(_fact_frame(), max_width=3, sample_rows=100)
+    assert keys == [('day', 'store')] or keys == [('store', 'day')]
+
+
+def test_sample_false_positive_is_rejected_on_full_data():
+    df = pd.DataFrame({'a': [str(i) for i in range(99)] + ['0'], 'b': ['x'] * 99 + ['y']})
+    # rows 0 and 99 collide on 'a' only outside a 10-row sample
+    assert discover_keys(df, max_width=1, sample_rows=10) == []
+    assert set(choose_key(discover_keys(df, max_width=2, sample_rows=10))) == {'a', 'b'}
+
+
+def test_composite_key_populates_key_and_delta_key_indicators():
+    result = extract_metadata_from_dataframe(_fact_frame(), 'src', 'sales.csv').set_index('field_nm')
+    assert result.loc['store', 'key_ind'] == 'X' and result.loc['day', 'key_ind'] == 'X'
+    assert result.loc['store', 'delta_key_ind'] == 'X' and result.loc['day', 'delta_key_ind'] == 'X'
+    assert result.loc['qty', 'key_ind'] == ''
@@ -27,3 +27,11 @@ def test_primary_key_detection():
     result = extract_metadata_from_dataframe(df, 'src', 'table.csv')
     pk = result.loc[result['field_nm'] == 'id', 'key_ind'].iloc[0]
     assert pk == 'X'
+
+
+def test_size_and_scale_come_from_the_type():
+    df = pd.DataFrame({'amount': ['12.50', '3.125'], 'code': ['abc', 'de']})
+    result = extract_metadata_from_dataframe(df, 'src', 'table.csv').set_index('field_nm')
+    assert result.loc['amount', 'datatype_nm'] == 'NUMBER(5,3)'
+    assert (result.loc['amount', 'datatype_size_val'], result.loc['amount', 'datatype_scale_val']) == (5, 3)
+    assert (result.loc['code', 'datatype_size_val'], result.loc['code', 'datatype_scale_val']) == (3, '')
@@ -0,0 +1,46 @@
+import io
+
+import pandas as pd
+from modules import metadata
+from modules.profile_cache import ProfileCache, cache_key
+
+
+def _upload(content, name="sales.csv"):
+    buf = io.BytesIO(content)
+    buf.name = name
+    return buf
+
+
+def test_cache_key_depends_on_content_and_params():
+    a = cache_key(_upload(b"id\n1\n"), {"ext": ".csv"})
+    assert a == cache_key(_upload(b"id\n1\n"), {"ext": ".csv"})
+    assert a != cache_key(_upload(b"id\n2\n"), {"ext": ".csv"})
+    assert a != cache_key(_upload(b"id\n1\n"), {"ext": ".xlsx"})
+
+
+def test_lru_eviction_and_disk_tier(tmp_path):
+    cache = ProfileCache(max_entries=1, disk_dir=str(tmp_path))
+    cache.put("a", [1])
+    cache.put("b", [2])
+    assert list(cache._entries) == ["b"]
+    assert cache.get("a") == [1]  # promoted back from disk
+    assert ProfileCache(disk_dir=str(tmp_path)).get("b") == [2]
+
+
+def test_rerender_with_new_source_name_reuses_profile(monkeypatch):
+    monkeypatch.setattr(metadata, "profile_cache", ProfileCache())
+    calls = []
+    real_profile_upload = metadata.profile_upload
+
+    def counting_profile_upload(*args):
+        calls.append(args)
+        return real_profile_upload(*args)
+
+    monkeypatch.setattr(metadata, "profile_upload", counting_profile_upload)
+    content = b"id,name\n1,a\n2,b\n"
+    table_info = lambda f: pd.DataFrame([{"file_patrn_txt": f}])  # noqa: E731
+    first, _ = metadata.extract_from_uploaded_file(_upload(content), "src_a", "sales.csv", table_info)
+    second, _ = metadata.extract_from_uploaded_file(_upload(content), "src_b", "sales.csv", table_info)
+    assert len(calls) == 1
+    assert set(first["src_nm"]) == {"src_a"} and set(second["src_nm"]) == {"src_b"}
+    pd.testing.assert_frame_equal(first.drop(columns="src_nm"), second.drop(columns="src_nm"))
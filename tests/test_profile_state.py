@@ -0,0 +1,47 @@
+import pandas as pd
+from modules.metadata import profile_table_incremental
+from modules.profile_state import ProfileStateStore
+
+
+def test_incremental_profile_survives_restart(tmp_path):
+    first = pd.DataFrame({'id': ['1', '2', '3'], 'name': ['a', 'bb', None]})
+    second = pd.DataFrame({'id': ['4', '5'], 'name': ['cccc', 'd']})
+    profile_table_incremental(first, 'src', 'orders', ProfileStateStore(str(tmp_path)))
+    # A fresh store reads the state written by the first upload from disk.
+    profile, key_columns = profile_table_incremental(
+        second, 'src', 'orders', ProfileStateStore(str(tmp_path))
+    )
+    profile = profile.set_index('field_nm')
+    assert profile.loc['id', 'row_count'] == 5
+    assert profile.loc['name', 'null_count'] == 1
+    assert profile.loc['name', 'max_length'] == 4
+    assert key_columns == ('id',)
+
+
+def test_duplicate_across_files_is_not_a_key(tmp_path):
+    store = ProfileStateStore(str(tmp_path))
+    profile_table_incremental(pd.DataFrame({'id': ['1', '2']}), 'src', 't', store)
+    profile, key_columns = profile_table_incremental(pd.DataFrame({'id': ['2']}), 'src', 't', store)
+    assert not profile.loc[0, 'is_unique'] and key_columns == ()
+
+
+def test_rerunning_a_batch_does_not_count_it_twice(tmp_path):
+    store = ProfileStateStore(str(tmp_path))
+    batch = pd.DataFrame({'id': ['1', '2'], 'name': ['a', None]})
+    profile_table_incremental(batch.copy(), 'src', 't', store)
+    profile, key_columns = profile_table_incremental(batch.copy(), 'src', 't', store)
+    profile = profile.set_index('field_nm')
+    assert profile.loc['id', 'row_count'] == 2 and profile.loc['name', 'null_count'] == 1
+    assert key_columns == ('id',)
+    profile, _ = profile_table_incremental(pd.DataFrame({'id': ['3']}), 'src', 't', store)
+    assert profile.loc[0, 'row_count'] == 3
+
+
+def test_store_keeps_recent_states_in_memory():
+    store = ProfileStateStore(max_tables=2)
+    for table in ('a', 'b', 'c'):
+        profile_table_incremental(pd.DataFrame({'id': ['1', '2']}), 'src', table, store)
+    assert store.get('src', 'a') is None
+    assert store.get('src', 'c').row_count == 2
+    state = store._states['src__c']
+    assert 'key_check' not in state
@@ -0,0 +1,104 @@
+import pandas as pd
+from modules.profiler import ProfileAccumulator, profile_chunks, profile_dataframe
+
+
+def test_profile_counts_nulls_and_lengths():
+    df = pd.DataFrame({'id': ['1', '2', '3'], 'name': ['ab', None, 'abcd']})
+    profile = profile_dataframe(df).set_index('field_nm')
+    assert profile.loc['id', 'null_count'] == 0
+    assert profile.loc['name', 'null_count'] == 1
+    assert profile.loc['name', 'max_length'] == 4
+    assert bool(profile.loc['id', 'is_unique'])
+    assert not bool(profile.loc['name', 'is_unique'])
+
+
+def test_profile_is_independent_of_block_size():
+    df = pd.DataFrame({
+        'num': ['10', '20', '30', '40'],
+        'dt': ['2024-01-01', '2024-01-02', None, '2024-01-04'],
+        'txt': ['a', 'b', 'b', 'c'],
+    })
+    whole = profile_dataframe(df)
+    blocked = profile_dataframe(df, block_cells=1)
+    pd.testing.assert_frame_equal(whole, blocked)
+    assert list(whole['datatype_nm']) == ['NUMBER(2,0)', 'DATE', 'VARCHAR(1)']
+
+
+def test_chunked_profile_matches_in_memory_profile():
+    df = pd.DataFrame({
+        'id': [str(i) for i in range(1000)],
+        'code': ['A', 'B'] * 500,
+        'note': ['x' * (i % 7) if i % 5 else None for i in range(1000)],
+    })
+    whole = profile_dataframe(df)
+    streamed = profile_chunks(df.iloc[i:i + 128] for i in range(0, len(df), 128))
+    cols = ['field_nm', 'row_count', 'null_count', 'max_length', 'datatype_nm', 'is_unique']
+    pd.testing.assert_frame_equal(whole[cols], streamed[cols], check_dtype=False)
+
+
+def test_approximate_key_detection_confirms_candidates_exactly():
+    n = 5000
+    df = pd.DataFrame({
+        'id': [str(i) for i in range(n)],
+        # one duplicate: indistinguishable from unique by the sketch alone
+        'near_id': [str(i) for i in range(n - 1)] + ['0'],
+        'code': [str(i % 10) for i in range(n)],
+    })
+    profile = profile_dataframe(df, key_detection='approximate', key_error=0.01)
+    assert list(profile['is_unique']) == [True, False, False]
+    assert abs(profile.loc[0, 'distinct_count'] - n) < n * 0.05
+    assert profile.loc[2, 'distinct_count'] == 10
+
+
+def test_merged_state_matches_single_pass():
+    df = pd.DataFrame({
+        'id': [str(i) for i in range(2000)],
+        'amount': [f'{i % 50}.5' for i in range(2000)],
+        'day': ['2024-01-%02d' % (i % 28 + 1) for i in range(2000)],
+    })
+    whole = ProfileAccumulator(df.columns, 12)
+    whole.update(df)
+    old = ProfileAccumulator(df.columns, 12)
+    old.update(df.iloc[:1500])
+    new = ProfileAccumulator(['amount', 'id', 'extra'], 12)
+    new.update(df.iloc[1500:][['amount', 'id']].assign(extra='abc'))
+    merged = ProfileAccumulator.from_state(old.to_state()).merge(new).result()
+    expected = whole.result()
+    assert list(merged['field_nm']) == ['id', 'amount', 'day', 'extra']
+    # Histograms come from random samples, so only they may differ.
+    pd.testing.assert_frame_equal(merged.iloc[:2].drop(columns=['row_count', 'histogram']),
+                                  expected.iloc[:2].drop(columns=['row_count', 'histogram']))
+    day, extra = merged.iloc[2], merged.iloc[3]
+    assert day['datatype_nm'] == 'DATE' and day['null_count'] == 500
+    assert extra['null_count'] == 1500 and extra['max_length'] == 3
+
+
+def test_streamed_key_detection_confirms_candidates_exactly():
+    n = 20000
+    df = pd.DataFrame({
+        'id': [str(i) for i in range(n)],
+        # 1% duplicates, each in a different chunk from its original
+        'near_id': [str(i) for i in range(n - 200)] + [str(i) for i in range(200)],
+    })
+    chunks = [df.iloc[i:i + 1000] for i in range(0, n, 1000)]
+    profile = profile_chunks(iter(chunks))
+    assert list(profile['is_unique']) == [True, False]
+
+    state = ProfileAccumulator(df.columns, 12)
+    for chunk in chunks[:10]:
+        state.update(chunk)
+    rest = ProfileAccumulator(df.columns, 12)
+    for chunk in chunks[10:]:
+        rest.update(chunk)
+    restored = ProfileAccumulator.from_state(state.to_state())
+    assert list(state.merge(rest).result()['is_unique']) == [True, False]
+    # Stored states keep no key hashes, so merged keys are only probable.
+    assert restored.merge(rest).key_check_bytes == 0
+
+
+def test_key_check_over_budget_leaves_candidates_unconfirmed():
+    df = pd.DataFrame({'id': [str(i) for i in range(5000)]})
+    accumulator = ProfileAccumulator(df.columns, 12, key_check_bytes=1024)
+    accumulator.update(df)
+    assert accumulator.key_check_overflow
+    assert not accumulator.result().loc[0, 'is_unique']
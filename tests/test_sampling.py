@@ -0,0 +1,81 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+from modules.file_processor import process_uploaded_zip
+from modules.metadata import extract_from_uploaded_file
+from modules.sampling import block_offsets, column_confidence, profile_csv_sample
+from modules.sniffer import sniff_csv
+
+
+def _upload(content, name):
+    upload = io.BytesIO(content)
+    upload.name = name
+    return upload
+
+
+def _table_info(filename):
+    return pd.DataFrame([{"file_patrn_txt": filename}])
+
+
+def _csv(rows=20000):
+    lines = ["id,amount,status,note"]
+    for idx in range(rows):
+        # note is almost always empty, so the sample says little about it.
+        note = "late delivery" if idx % 5000 == 4999 else ""
+        lines.append(f"{idx},{idx % 997}.25,{'OPEN' if idx % 2 else 'CLOSED'},{note}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def test_block_offsets_cover_head_and_tail_without_overlap():
+    offsets = block_offsets(10_000, 100, 8, seed=1)
+    assert offsets[0] == 0 and offsets[-1] == 9_900
+    assert all(b - a >= 100 for a, b in zip(offsets, offsets[1:]))
+    assert block_offsets(500, 100, 8) is None
+
+
+def test_confidence_grows_with_sampled_values():
+    low, high = column_confidence([10, 5000], tolerance=0.001)
+    assert low < 0.05 and high > 0.99
+
+
+def test_sample_profile_rescans_keys_and_sparse_columns():
+    content = _csv()
+    upload = io.BytesIO(content)
+    profile, key_columns = profile_csv_sample(
+        upload, len(content), sniff_csv(upload), blocks=6, block_bytes=16384
+    )
+    profile = profile.set_index("field_nm")
+    assert key_columns == ("id",)
+    assert profile.loc["id", "full_scan"] and profile.loc["note", "full_scan"]
+    assert not profile.loc["status", "full_scan"]
+    assert profile.loc["status", "confidence"] >= 0.95
+    # The full scan sees every row, including the rare note values.
+    assert (profile["row_count"] == 20000).all()
+    assert profile.loc["note", "null_count"] == 20000 - 4
+    assert profile.loc["note", "datatype_nm"] == "VARCHAR(13)"
+    assert profile.loc["amount", "datatype_nm"].startswith("NUMBER")
+
+
+@pytest.mark.parametrize("mode", ["file", "zip"])
+def test_sampled_uploads_report_confidence(mode, monkeypatch):
+    monkeypatch.setattr("modules.sampling.SAMPLE_BLOCK_BYTES", 16384)
+    monkeypatch.setattr("modules.sampling.SAMPLE_BLOCKS", 6)
+    content = _csv()
+    if mode == "file":
+        metadata_df, _, report = extract_from_uploaded_file(
+            _upload(content, "orders.csv"), "src", "orders", _table_info,
+            sample=True, return_report=True
+        )
+        assert list(report["field_nm"]) == ["id", "amount", "status", "note"]
+        assert report.set_index("field_nm").loc["status", "confidence"] < 1.0
+    else:
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("orders.csv", content)
+        metadata_df, _, report = process_uploaded_zip(
+            buf, "src", "orders", _table_info, max_workers=1, return_report=True, sample=True
+        )
+        assert report.loc[0, "min_confidence"] < 1.0
+    assert list(metadata_df["key_ind"]) == ["X", "", "", ""]
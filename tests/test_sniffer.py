@@ -0,0 +1,53 @@
+import io
+
+import pandas as pd
+import pytest
+from modules.file_processor import profile_csv_stream, read_csv
+from modules.metadata import extract_from_uploaded_file
+from modules.sniffer import sniff_bytes
+
+
+@pytest.mark.parametrize("content, expected", [
+    (b"id;name;amt\r\n1;a;2.5\r\n2;b;3\r\n",
+     {"delimiter": ";", "encoding_cd": "UTF-8", "header_rows": 1, "newline": "\r\n"}),
+    ("﻿a\tb\n1\t2\n".encode("utf-8"),
+     {"delimiter": "\t", "encoding_cd": "UTF-8-BOM", "header_rows": 1}),
+    ("a|b\n1|2\n".encode("utf-16"),
+     {"delimiter": "|", "encoding": "utf-16", "encoding_cd": "UTF-16LE"}),
+    (b"1,x,2020-01-01\n2,y,2020-01-02\n3,z,2020-02-01\n",
+     {"delimiter": ",", "header_rows": 0}),
+    ("name,city\nJos\xe9,K\xf6ln\n".encode("cp1252"),
+     {"encoding": "cp1252", "encoding_cd": "WINDOWS-1252"}),
+    (b"a,b\n'x, y',2\n'z',3\n", {"quotechar": "'"}),
+])
+def test_sniff_bytes(content, expected):
+    sniffed = sniff_bytes(content, truncated=False)
+    assert {key: sniffed[key] for key in expected} == expected
+
+
+def test_truncated_prefix_ignores_partial_line():
+    assert sniff_bytes(b"a;b\n1;2\n3;4\n5", truncated=True)["delimiter"] == ";"
+
+
+@pytest.mark.parametrize("engine", ["pyarrow", "pandas"])
+def test_headerless_semicolon_file_is_parsed_and_streamed(engine):
+    content = "1;K\xf6ln\r\n2;Paris\r\n3;Rome\r\n".encode("cp1252")
+    df = read_csv(io.BytesIO(content), engine=engine)
+    assert list(df.columns) == ["column_1", "column_2"]
+    assert df["column_2"].tolist() == ["K\xf6ln", "Paris", "Rome"]
+    profile = profile_csv_stream(io.BytesIO(content), chunk_rows=2, engine=engine)
+    assert list(profile["field_nm"]) == ["column_1", "column_2"]
+    assert profile["row_count"].iloc[0] == 3
+
+
+def test_sniffed_format_prefills_table_info():
+    upload = io.BytesIO(b"id|name\r\n1|a\r\n2|b\r\n")
+    upload.name = "feed.csv"
+    _, table_info_df = extract_from_uploaded_file(
+        upload, "src", "feed.csv",
+        lambda name: pd.DataFrame([{"delmtr_cd": "", "src_encod_cd": "", "file_hdr_cnt": 1,
+                                    "src_newln_chr_cd": ""}])
+    )
+    assert table_info_df.iloc[0].to_dict() == {
+        "delmtr_cd": "|", "src_encod_cd": "UTF-8", "file_hdr_cnt": 1, "src_newln_chr_cd": "CRLF"
+    }
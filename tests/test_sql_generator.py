@@ -0,0 +1,210 @@
+import pandas as pd
+import pytest
+from modules import db
+from modules.sql_generator import generate_insert_statements
+
+
+def _frames(tables):
+    dataset = pd.DataFrame([{"src_nm": "src", "dataset_nm": "ds", "dataset_desc": "sales"}])
+    pre_proc = pd.DataFrame([{"src_nm": "src", "dataset_nm": "ds", "fmt_type_cd": "csv"}])
+    table_info = pd.DataFrame([
+        {"src_nm": "src", "dataset_nm": "ds", "src_table_nm": table, "file_patrn_txt": f"{table}.csv"}
+        for table in tables
+    ])
+    fields = pd.DataFrame([
+        {"src_nm": "src", "src_table_nm": table, "field_nm": "id", "field_posn_nbr": 1,
+         "datatype_nm": "NUMBER(5,0)"}
+        for table in tables
+    ])
+    return dataset, pre_proc, table_info, fields
+
+
+def test_insert_or_update_is_chosen_per_table_in_one_check(monkeypatch):
+    tables = [f"t{i}" for i in range(200)]
+    calls = []
+
+    def check_existence_many(keys):
+        calls.append(keys)
+        presence = pd.DataFrame(keys, columns=db.EXISTENCE_KEYS)
+        configured = presence["src_table_nm"].isin(["t0", "t1"])
+        presence["dataset_info"] = presence["pre_proc_info"] = True
+        presence["table_info"] = presence["field_info"] = configured
+        presence["exists"] = True
+        return presence
+
+    monkeypatch.setattr(db, "check_existence_many", check_existence_many)
+    script = generate_insert_statements("src", "ds", "sales.zip", *_frames(tables))
+    assert len(calls) == 1 and len(calls[0]) == 200
+    dataset_info = script.split("INSERT INTO app_mgmt.sys_config_dataset_info")
+    assert len(dataset_info) == 2 and dataset_info[1].startswith(" (src_nm, dataset_nm")
+    assert "FROM tmp_sys_config_dataset_info\nON CONFLICT (src_nm, dataset_nm) DO UPDATE" in script
+    assert "INSERT INTO tmp_sys_config_table_info (src_nm, dataset_nm, src_table_nm, file_patrn_txt) " \
+        "VALUES\n('src', 'ds', 't0', 't0.csv'),\n('src', 'ds', 't1', 't1.csv');" in script
+    inserted = script.split("INSERT INTO app_mgmt.sys_config_table_field_info")[-1]
+    assert "'t2'" in inserted and "'t0'" not in inserted
+    assert inserted.count("\n(") == 198
+
+
+def test_existence_query_checks_every_config_table():
+    query = db.existence_query()
+    assert query.count("EXISTS (") == 4 and "FROM (VALUES %s) AS k" in query
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement):
+        self.log.append(("execute", statement))
+
+    def copy_expert(self, sql, buffer):
+        self.log.append(("copy", sql, buffer.read()))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+    def commit(self):
+        self.log.append(("commit",))
+
+    def rollback(self):
+        self.log.append(("rollback",))
+
+    def close(self):
+        pass
+
+
+def test_direct_load_copies_new_rows_in_one_transaction(monkeypatch):
+    from modules.onboarding_service import load_into_rds
+
+    conn = FakeConnection()
+    monkeypatch.setattr(db, "check_db_connection", lambda: conn)
+
+    def check_existence_many(keys):
+        presence = pd.DataFrame(keys, columns=db.EXISTENCE_KEYS)
+        for check in db.EXISTENCE_CHECKS:
+            presence[check] = presence["src_table_nm"] == "t0"
+        return presence
+
+    monkeypatch.setattr(db, "check_existence_many", check_existence_many)
+    dataset, pre_proc, table_info, fields = _frames(["t0", "t1"])
+    fields.loc[1, "datatype_nm"] = "it's, \"quoted\""
+    fields["field_desc"] = [None, ""]
+    stats = pd.DataFrame([{"src_nm": "src", "src_table_nm": "t1", "field_nm": "id", "null_ratio": 0.5}])
+    # t0 is configured (and so is the dataset): its rows are staged and
+    # merged, t1's copied straight into the config tables.
+    assert load_into_rds("src", "ds", "sales.zip", dataset, pre_proc, table_info, fields, stats) == 7
+
+    kinds = [entry[0] for entry in conn.log]
+    merged = ["execute", "execute", "copy", "execute", "execute"]
+    assert kinds == merged * 3 + ["copy"] + merged + ["copy", "execute", "copy", "commit"]
+    assert conn.log[12][1].startswith("COPY tmp_sys_config_table_info")
+    assert conn.log[13][1].startswith("INSERT INTO app_mgmt.sys_config_table_info")
+    assert "ON CONFLICT (src_nm, dataset_nm, src_table_nm)" in conn.log[13][1]
+    assert conn.log[22][1].startswith("DELETE FROM app_mgmt.sys_config_table_field_stats")
+    sql, rows = conn.log[21][1], conn.log[21][2]
+    assert sql.startswith("COPY app_mgmt.sys_config_table_field_info (src_nm, src_table_nm, field_nm")
+    assert sql.endswith("FROM STDIN WITH (FORMAT csv, NULL '\\N')")
+    assert rows == "src,t1,id,1,\"it's, \"\"quoted\"\"\",\n"
+    assert conn.log[15][2] == "src,ds,t1,t1.csv\n"
+
+
+def test_direct_load_rolls_back_on_error(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(db, "check_db_connection", lambda: conn)
+    bad = pd.DataFrame({"a": [1]})
+    monkeypatch.setattr(db, "copy_dataframe", lambda *args: (_ for _ in ()).throw(RuntimeError("boom")))
+    with pytest.raises(Exception, match="boom"):
+        db.load_dataframes([("app_mgmt.t", bad)])
+    assert conn.log == [("rollback",)]
+
+
+def test_insert_literals_are_valid_sql():
+    from modules.sql_generator import create_insert_statement
+
+    df = pd.DataFrame({"desc": ["it's \"x\"", None], "n": [1, 2], "ratio": [0.5, float("nan")]})
+    assert create_insert_statement("t", df) == (
+        "INSERT INTO t (desc, n, ratio) VALUES\n('it''s \"x\"', 1, 0.5),\n(NULL, 2, NULL);"
+    )
+
+
+def test_upsert_is_a_fixed_number_of_statements_whatever_the_width():
+    from modules.sql_generator import create_upsert_statement
+
+    columns = {f"col_{i}": [i] for i in range(1000)}
+    df = pd.DataFrame({"src_nm": ["src"], "src_table_nm": ["t"], **columns})
+    script = create_upsert_statement("app_mgmt.t", df, ["src_nm", "src_table_nm"], style="merge")
+    assert script.count(";") == 5 and "UPDATE app_mgmt.t SET" not in script
+    assert "WHEN MATCHED THEN UPDATE SET col_0 = s.col_0, col_1 = s.col_1" in script
+
+
+def test_on_conflict_upsert():
+    from modules.sql_generator import sync_statements
+
+    setup, apply = sync_statements("app_mgmt.t", ["k", "a", "b"], ["k"], style="on_conflict")
+    assert setup[1] == "CREATE TEMP TABLE tmp_t (LIKE app_mgmt.t INCLUDING DEFAULTS);"
+    assert apply == [
+        "INSERT INTO app_mgmt.t (k, a, b)\nSELECT k, a, b FROM tmp_t\n"
+        "ON CONFLICT (k) DO UPDATE SET a = EXCLUDED.a, b = EXCLUDED.b;",
+        "DROP TABLE tmp_t;",
+    ]
+
+
+@pytest.mark.parametrize("removed, statement", [
+    ("deprecate", "UPDATE app_mgmt.sys_config_table_field_info t SET dprct_ind = 'X'"),
+    ("delete", "DELETE FROM app_mgmt.sys_config_table_field_info t"),
+])
+def test_removed_fields_are_handled_explicitly(removed, statement):
+    from modules.sql_generator import sync_statements
+
+    table = "app_mgmt.sys_config_table_field_info"
+    columns = ["src_nm", "src_table_nm", "field_nm", "field_posn_nbr", "dprct_ind"]
+    keys = ["src_nm", "src_table_nm", "field_nm"]
+    _, apply = sync_statements(table, columns, keys, style="merge", removed=removed)
+    assert apply[0] == (
+        f"{statement}\nWHERE (t.src_nm, t.src_table_nm) IN "
+        "(SELECT DISTINCT src_nm, src_table_nm FROM tmp_sys_config_table_field_info)\n"
+        "AND NOT EXISTS (SELECT 1 FROM tmp_sys_config_table_field_info s WHERE "
+        "t.src_nm = s.src_nm AND t.src_table_nm = s.src_table_nm AND t.field_nm = s.field_nm);"
+    )
+    _, kept = sync_statements(table, columns, keys, style="merge", removed="keep")
+    assert kept[0].startswith("MERGE INTO")
+
+
+def _configured(keys):
+    presence = pd.DataFrame(keys, columns=db.EXISTENCE_KEYS)
+    for check in db.EXISTENCE_CHECKS:
+        presence[check] = True
+    return presence
+
+
+def test_fields_are_matched_by_name_not_position(monkeypatch):
+    from modules import sql_generator
+
+    monkeypatch.setattr(db, "check_existence_many", _configured)
+    dataset, pre_proc, table_info, _ = _frames(["t0"])
+    # "code" was removed from the middle of the table, so "name" moved up.
+    fields = pd.DataFrame([
+        {"src_nm": "src", "src_table_nm": "t0", "field_nm": "id", "field_posn_nbr": 1, "datatype_nm": "INT"},
+        {"src_nm": "src", "src_table_nm": "t0", "field_nm": "name", "field_posn_nbr": 2,
+         "datatype_nm": "it's"},
+    ])
+    frames = (dataset, pre_proc, table_info, fields)
+    script = generate_insert_statements("src", "ds", "sales.zip", *frames)
+    assert "ON CONFLICT (src_nm, src_table_nm, field_nm) " \
+        "DO UPDATE SET field_posn_nbr = EXCLUDED.field_posn_nbr" in script
+
+    monkeypatch.setattr(sql_generator, "UPSERT_STYLE", "update")
+    script = generate_insert_statements("src", "ds", "sales.zip", *frames)
+    assert "UPDATE app_mgmt.sys_config_table_field_info SET field_posn_nbr = 2, datatype_nm = 'it''s' " \
+        "WHERE src_nm = 'src' AND src_table_nm = 't0' AND field_nm = 'name';" in script
@@ -0,0 +1,66 @@
+import pandas as pd
+from modules.metadata import extract_metadata_from_dataframe
+from modules.sql_generator import generate_create_table_script
+
+
+def _orders(rows=3000):
+    return pd.DataFrame({
+        "order_id": [str(idx) for idx in range(rows)],
+        "order_dt": [f"2024-01-{idx // 100 + 1:02d}" for idx in range(rows)],
+        "customer_id": [str((idx * 7919) % 2500) for idx in range(rows)],
+        "status": ["OPEN" if idx % 3 else "CLOSED" for idx in range(rows)],
+    })
+
+
+def _flags(metadata, column):
+    return list(metadata.loc[metadata[column] == "X", "field_nm"])
+
+
+def test_layout_indicators():
+    metadata = extract_metadata_from_dataframe(_orders(), "src", "orders")
+    assert _flags(metadata, "sort_key_ind") == ["order_dt"]
+    assert _flags(metadata, "partitn_ind") == ["order_dt"]
+    # The single-column key spreads rows evenly; status is too skewed.
+    assert _flags(metadata, "dist_key_ind") == ["order_id"]
+
+
+def test_skewed_columns_are_not_distribution_keys():
+    df = _orders().drop(columns=["order_id"])
+    metadata = extract_metadata_from_dataframe(df, "src", "orders")
+    assert _flags(metadata, "dist_key_ind") == ["customer_id"]
+    df["customer_id"] = ["42" if idx % 2 else str(idx) for idx in range(len(df))]
+    metadata = extract_metadata_from_dataframe(df, "src", "orders")
+    assert _flags(metadata, "dist_key_ind") == []
+
+
+def test_layout_in_ddl():
+    metadata = extract_metadata_from_dataframe(_orders(), "src", "orders")
+    redshift = generate_create_table_script(metadata, "land", "src", "ds", dialect="redshift")
+    assert redshift.endswith(")\nDISTSTYLE KEY DISTKEY (order_id) SORTKEY (order_dt);")
+    snowflake = generate_create_table_script(metadata, "land", "src", "ds", dialect="snowflake")
+    assert snowflake.endswith(")\nCLUSTER BY (order_dt);")
+
+
+def test_scattered_dates_are_not_partitions():
+    df = _orders()
+    # Dates in no particular order: every value is spread over many runs.
+    df["order_dt"] = [f"2024-01-{(idx * 7) % 30 + 1:02d}" for idx in range(len(df))]
+    metadata = extract_metadata_from_dataframe(df, "src", "orders")
+    assert _flags(metadata, "partitn_ind") == []
+    assert _flags(metadata, "sort_key_ind") == ["order_id"]
+    # Dates loaded in a few batches are still clustered enough.
+    df["order_dt"] = [f"2024-01-{(idx // 100) % 15 + 1:02d}" for idx in range(len(df))]
+    metadata = extract_metadata_from_dataframe(df, "src", "orders")
+    assert _flags(metadata, "partitn_ind") == ["order_dt"]
+
+
+def test_unique_key_alone_is_not_clustered():
+    df = _orders().drop(columns=["order_dt"])
+    metadata = extract_metadata_from_dataframe(df, "src", "orders")
+    snowflake = generate_create_table_script(metadata, "land", "src", "ds", dialect="snowflake")
+    assert "CLUSTER BY" not in snowflake
+    # An unordered key is not worth sorting on either.
+    df["order_id"] = [str((idx * 7919) % 3001) for idx in range(len(df))]
+    metadata = extract_metadata_from_dataframe(df, "src", "orders")
+    assert _flags(metadata, "key_ind") == ["order_id"]
+    assert _flags(metadata, "sort_key_ind") == []
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+from modules.profiler import ProfileAccumulator, profile_chunks
+from modules.type_inference import infer_type
+
+
+@pytest.mark.parametrize("values, expected", [
+    (['-1', '42', '+7'], 'NUMBER(2,0)'),
+    (['3.14', '-0.5', '10'], 'NUMBER(4,2)'),
+    (['true', 'False', 'Y'], 'BOOLEAN'),
+    (['2024-01-31', '2023-12-01'], 'DATE'),
+    (['31/01/2024', '01/02/2024'], 'DATE'),
+    (['2024-01-31 10:00:00', '2024-02-01 23:59:59'], 'TIMESTAMP_NTZ'),
+    (['00123', '00456'], 'VARCHAR(5)'),
+    (['abc', '1', '2024-01-01'], 'VARCHAR(10)'),
+    ([None, None], 'VARCHAR(255)'),
+])
+def test_infer_type(values, expected):
+    assert infer_type(pd.Series(values, dtype=object)) == expected
+
+
+def test_datetime_format_is_fixed_across_chunks():
+    first = pd.DataFrame({'d': ['01/02/2024', '03/04/2024']})
+    second = pd.DataFrame({'d': ['2024-05-06', '2024-07-08']})
+    profile = profile_chunks([first, second])
+    assert profile.loc[0, 'datatype_nm'] == 'VARCHAR(10)'
+
+
+def test_numbers_widen_across_chunks():
+    first = pd.DataFrame({'n': ['1', '2']})
+    second = pd.DataFrame({'n': ['12345', '1.25']})
+    profile = profile_chunks([first, second])
+    assert profile.loc[0, 'datatype_nm'] == 'NUMBER(7,2)'
+
+
+def test_merged_datetime_formats_must_agree():
+    first = ProfileAccumulator(['d'])
+    first.update(pd.DataFrame({'d': ['01/02/2024', '03/04/2024']}))
+    second = ProfileAccumulator(['d'])
+    second.update(pd.DataFrame({'d': ['2024-05-06', '2024-07-08']}))
+    assert first.merge(second).result().loc[0, 'datatype_nm'] == 'VARCHAR(10)'